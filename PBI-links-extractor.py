@@ -1,90 +1,274 @@
 # Input is JSON that we get from Power BI Studio VS Code extension
 ## Code is %cmd SET API_PATH= /groups/groupid/
 ## GET ./reports
+# Paste the JSON or upload the response files in the app; for tenant-wide exports run it from the command line:
+#   python PBI-links-extractor.py <json file or folder> --output powerbi_reports.csv (or .parquet) --fields name,webUrl,id
+# Files are parsed as a stream, one report at a time, so memory stays bounded whatever the export size.
 
 import streamlit as st
+from streamlit import runtime
 import pandas as pd
+import argparse
+import csv
+import io
 import json
+import os
 import re
+import tempfile
 
-st.title("Power BI Report Exporter (CSV)")
-st.write("Paste your JSON list of Power BI reports below. Download a CSV with Name & Web URL.")
+REQUIRED_COLUMNS = ['name', 'webUrl']
 
-# Text area for JSON input
-json_text = st.text_area("Paste JSON here", height=300)
+READ_CHUNK_SIZE = 1024 * 1024
+WRITE_BATCH_SIZE = 10000
+
+_TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+_VALUE_ARRAY = re.compile(r'"value"\s*:\s*\[')
+# Strings (skipped whole), a string left open at the end of the buffer, and brackets, for finding where a damaged
+# item ends
+_ITEM_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|"|[{}\[\]]')
+_DECODER = json.JSONDecoder()
+
+# Index just after the object/array starting at position, or None when the buffer ends first (also inside a string)
+def _item_end(buffer, position):
+    depth = 0
+    for match in _ITEM_TOKEN.finditer(buffer, position):
+        token = match.group()
+        if token == '"':
+            # The string continues in the next chunk; its brackets must not be counted
+            return None
+        if token in '{[':
+            depth += 1
+        elif token in '}]':
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    return None
+
+# Parse one item, fixing trailing commas when plain JSON fails. Returns (item, error message).
+def _parse_item(text):
+    try:
+        return json.loads(text), None
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(_TRAILING_COMMA.sub(r'\1', text)), None
+    except json.JSONDecodeError as e:
+        return None, f"{e.msg} in item starting {text[:80]!r}"
+
+# Yield the reports of a Power BI API response one by one, reading the stream in chunks.
+# Accepts {"value": [...]} or a bare [...]. Items with JSON errors (such as trailing commas) are repaired when
+# possible; the others are yielded as (None, error) so the caller can report them. Yields (item, error).
+def iter_value_items(stream, chunk_size=READ_CHUNK_SIZE):
+    buffer, eof = '', False
+
+    def read_more():
+        nonlocal buffer, eof
+        chunk = stream.read(chunk_size)
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode('utf-8-sig')
+        eof = not chunk
+        buffer += chunk
+
+    # Find the start of the items: the "value" array of an object, or a top-level array
+    position = None
+    while position is None:
+        read_more()
+        stripped = buffer.lstrip('﻿ \t\r\n')
+        if stripped.startswith('['):
+            position = len(buffer) - len(stripped) + 1
+        elif stripped.startswith('{'):
+            match = _VALUE_ARRAY.search(buffer)
+            if match:
+                position = match.end()
+            elif eof:
+                raise ValueError("JSON object doesn't contain expected 'value' array")
+        elif stripped or eof:
+            raise ValueError("Input is not a JSON object or array")
+
+    while True:
+        # Skip whitespace and separators between items
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            buffer, position = buffer[position:], 0
+            read_more()
+        if position >= len(buffer) or buffer[position] == ']':
+            return
 
-if st.button("Generate CSV"):
-    if not json_text.strip():
-        st.error("Please paste JSON data first!")
-    else:
         try:
-            # Try to clean common JSON issues
-            cleaned_json = json_text.strip()
-            
-            # Remove trailing commas before closing brackets/braces
-            cleaned_json = re.sub(r',(\s*[}\]])', r'\1', cleaned_json)
-            
-            # Parse the JSON
-            data = json.loads(cleaned_json)
-            
-            # Handle different JSON structures
-            if isinstance(data, dict):
-                # If it's a dict, look for a 'value' key (common in Power BI API responses)
-                if 'value' in data:
-                    data = data['value']
-                else:
-                    st.error("JSON object doesn't contain expected 'value' array")
-                    st.stop()
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(data)
-            
-            # Check if required columns exist
-            required_cols = ['name', 'webUrl']
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            
-            if missing_cols:
-                st.error(f"Missing required columns: {missing_cols}")
-                st.write("Available columns:", list(df.columns))
-                st.stop()
-            
-            # Select only the required columns
-            df_export = df[required_cols].copy()
-            
-            # Generate CSV
-            csv_data = df_export.to_csv(index=False)
-            
-            st.success(f"CSV generated successfully! Found {len(df_export)} reports.")
-            
-            # Download button
-            st.download_button(
-                label="Download CSV",
-                data=csv_data,
-                file_name="powerbi_reports.csv",
-                mime="text/csv"
-            )
-            
-            # Display preview
-            st.dataframe(df_export)
-            
-        except json.JSONDecodeError as e:
-            st.error(f"Failed to process JSON: {e}")
+            item, end = _DECODER.raw_decode(buffer, position)
+            yield item, None
+            position = end
+            continue
+        except json.JSONDecodeError:
+            pass
+
+        end = _item_end(buffer, position)
+        if end is None and not eof:
+            # Item continues in the next chunk
+            buffer, position = buffer[position:], 0
+            read_more()
+            continue
+        if end is None:
+            yield None, f"Unterminated item starting {buffer[position:position + 80]!r}"
+            return
+        yield _parse_item(buffer[position:end])
+        position = end
+
+        if position > chunk_size:
+            buffer, position = buffer[position:], 0
+
+# Rows with only the selected fields; missing fields are left empty
+def _select_fields(item, fields):
+    if not isinstance(item, dict):
+        return None
+    return {field: item.get(field) for field in fields}
+
+# JSON files of a path: the file itself, or every .json file of a folder
+def json_files(path):
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, file) for file in os.listdir(path) if file.lower().endswith('.json'))
+    return [path]
+
+# Writes rows in batches to CSV or Parquet (by file extension), so only one batch is held in memory
+class BatchWriter:
+    def __init__(self, path, columns):
+        self.path, self.columns = path, columns
+        self.batch, self.rows = [], 0
+        self._file = self._csv = self._parquet = None
+        if path.lower().endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            self._pa = pa
+            self._schema = pa.schema([(col, pa.string()) for col in columns])
+            self._parquet = pq.ParquetWriter(path, self._schema)
+        else:
+            self._file = open(path, 'w', newline='', encoding='utf-8')
+            self._csv = csv.DictWriter(self._file, fieldnames=columns)
+            self._csv.writeheader()
+
+    def write(self, row):
+        self.batch.append(row)
+        self.rows += 1
+        if len(self.batch) >= WRITE_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.batch:
+            return
+        if self._parquet is not None:
+            columns = {col: [None if row[col] is None else str(row[col]) for row in self.batch] for col in self.columns}
+            self._parquet.write_table(self._pa.table(columns, schema=self._schema))
+        else:
+            self._csv.writerows(self.batch)
+        self.batch = []
+
+    def close(self):
+        self.flush()
+        if self._parquet is not None:
+            self._parquet.close()
+        else:
+            self._file.close()
+
+# Stream every report of the given sources ((label, binary/text stream) pairs) into output_path.
+# Returns (reports written, errors).
+def export_reports(sources, output_path, fields=REQUIRED_COLUMNS, add_source=False):
+    columns = list(fields) + (['source_file'] if add_source else [])
+    writer = BatchWriter(output_path, columns)
+    errors = []
+    try:
+        for label, stream in sources:
+            try:
+                for item, error in iter_value_items(stream):
+                    row = _select_fields(item, fields)
+                    if row is None:
+                        errors.append(f"{label}: {error or 'item is not an object'}")
+                        continue
+                    if add_source:
+                        row['source_file'] = label
+                    writer.write(row)
+            except ValueError as e:
+                errors.append(f"{label}: {e}")
+    finally:
+        writer.close()
+    return writer.rows, errors
+
+def _open_files(paths):
+    for path in paths:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            yield os.path.basename(path), f
+
+def main():
+    st.title("Power BI Report Exporter (CSV)")
+    st.write("Paste your JSON list of Power BI reports below, or upload the JSON files. Download a CSV with Name & Web URL.")
+
+    # Text area for JSON input
+    json_text = st.text_area("Paste JSON here", height=300)
+    uploaded_files = st.file_uploader("Or upload JSON files", type="json", accept_multiple_files=True)
+
+    if st.button("Generate CSV"):
+        if not json_text.strip() and not uploaded_files:
+            st.error("Please paste JSON data or upload a file first!")
+            return
+
+        if uploaded_files:
+            sources = [(file.name, io.TextIOWrapper(file, encoding='utf-8-sig')) for file in uploaded_files]
+        else:
+            sources = [('pasted JSON', io.StringIO(json_text))]
+
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as tmp:
+            output_path = tmp.name
+        try:
+            count, errors = export_reports(sources, output_path, add_source=len(sources) > 1)
+            df_export = pd.read_csv(output_path, keep_default_na=False, na_values=[''])
+        finally:
+            os.remove(output_path)
+
+        for error in errors:
+            st.error(f"Skipped: {error}")
+        if count == 0:
+            st.error("No reports found. Please check your JSON format and try again.")
             st.write("**Tips to fix JSON issues:**")
-            st.write("1. Remove trailing commas before closing brackets")
-            st.write("2. Use double quotes (not single quotes)")
-            st.write("3. Escape special characters in URLs")
-            st.write("4. Ensure all brackets/braces are properly closed")
-            
-            # Show the problematic area
-            error_line = getattr(e, 'lineno', None)
-            error_col = getattr(e, 'colno', None)
-            if error_line and error_col:
-                st.write(f"**Error at line {error_line}, column {error_col}**")
-                lines = json_text.split('\n')
-                if error_line <= len(lines):
-                    st.code(lines[error_line-1])
-                    st.write("^" + " " * (error_col-1) + "Problem might be here")
-            
-        except Exception as e:
-            st.error(f"An error occurred: {e}")
-            st.write("Please check your JSON format and try again.")
+            st.write("1. Use double quotes (not single quotes)")
+            st.write("2. Escape special characters in URLs")
+            st.write("3. Ensure all brackets/braces are properly closed")
+            return
+
+        missing_cols = [col for col in REQUIRED_COLUMNS if df_export[col].isna().all()]
+        if missing_cols:
+            st.warning(f"No values found for: {missing_cols}")
+
+        st.success(f"CSV generated successfully! Found {count} reports.")
+
+        # Download button
+        st.download_button(
+            label="Download CSV",
+            data=df_export.to_csv(index=False),
+            file_name="powerbi_reports.csv",
+            mime="text/csv"
+        )
+
+        # Display preview
+        st.dataframe(df_export)
+
+def cli():
+    parser = argparse.ArgumentParser(description="Export Power BI report names and links from API responses")
+    parser.add_argument('input', help="JSON file, or a folder of JSON files")
+    parser.add_argument('--output', default='powerbi_reports.csv', help="Output .csv or .parquet")
+    parser.add_argument('--fields', default=','.join(REQUIRED_COLUMNS), help="Comma separated report fields")
+    args = parser.parse_args()
+
+    files = json_files(args.input)
+    fields = [field.strip() for field in args.fields.split(',') if field.strip()]
+    count, errors = export_reports(_open_files(files), args.output, fields, add_source=len(files) > 1)
+    for error in errors:
+        print(f"Skipped {error}")
+    print(f"{count} reports from {len(files)} file(s) saved to: {args.output}")
+
+if __name__ == "__main__":
+    if runtime.exists():
+        main()
+    else:
+        cli()
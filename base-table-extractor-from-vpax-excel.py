@@ -1,26 +1,26 @@
+import argparse
+import hashlib
 import json
 import zipfile
 import os
-import re
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from metadata_catalog import save_vpax_source_tables
+from sql_lineage import extract_m_tables
 
 def extract_source_tables_from_vpax(vpax_path):
     results = []
     file_name = os.path.basename(vpax_path)
 
-    extract_path = os.path.join("vpax_extracted_temp")
-    os.makedirs(extract_path, exist_ok=True)
-
+    # Read model.bim straight from the archive, nothing is extracted to disk
+    # (VertiPaq Analyzer / DAX Studio store it as Model.bim, so the entry name is matched case-insensitively)
     with zipfile.ZipFile(vpax_path, 'r') as zip_ref:
-        zip_ref.extractall(extract_path)
-
-    model_path = os.path.join(extract_path, "model.bim")
-    if not os.path.exists(model_path):
-        print(f"model.bim not found in {file_name}")
-        return results
-
-    with open(model_path, 'r', encoding='utf-8-sig') as f:
-        model_data = json.load(f)
+        model_entry = next((name for name in zip_ref.namelist() if name.lower() == 'model.bim'), None)
+        if model_entry is None:
+            print(f"model.bim not found in {file_name}")
+            return results
+        model_data = json.loads(zip_ref.read(model_entry).decode('utf-8-sig'))
 
     tables = model_data.get("model", {}).get("tables", [])
     for table in tables:
@@ -28,52 +28,146 @@ def extract_source_tables_from_vpax(vpax_path):
             source = partition.get('source', {})
             if source.get('type') == 'm':
                 expression = source.get('expression', '')
-
-                sql_candidates = extract_sql_strings(expression)
-
-                for sql in sql_candidates:
-                    found = re.findall(r'(?:FROM|JOIN|INNER\s+JOIN|LEFT\s+JOIN|RIGHT\s+JOIN|FULL\s+JOIN)\s+((?:[A-Z0-9_]+\.){1,2}[A-Z0-9_]+)', sql, re.IGNORECASE)
-                    unique_tables = sorted(set(found))
-
-                    for src_table in unique_tables:
-                        results.append({
-                            "vpax_file_name": file_name,
-                            "table_name": table['name'],
-                            "partition_name": partition.get("name", "unknown"),
-                            "source_table": src_table
-                        })
+                # Expressions are sometimes stored as a list of lines
+                if isinstance(expression, list):
+                    expression = '\n'.join(expression)
+
+                # Native SQL and navigation steps, memoised per unique expression
+                for src_table in extract_m_tables(expression):
+                    results.append({
+                        "vpax_file_name": file_name,
+                        "table_name": table['name'],
+                        "partition_name": partition.get("name", "unknown"),
+                        "source_table": src_table
+                    })
     return results
 
-def extract_sql_strings(expression):
-    quoted_strings = re.findall(r'"((?:[^"]|"")*)"', expression)
-
-    
-    sql_candidates = []
-    for s in quoted_strings:
-        clean = s.replace('""', '').replace('#(lf)', '\n').replace('#(tab)', '\t')
-        if re.match(r'^\s*(SELECT|WITH|--)', clean, re.IGNORECASE):
-            sql_candidates.append(clean)
-
-    return sql_candidates
-
-def process_all_vpax_in_directory():
+SUMMARY_COLUMNS = ["vpax_file_name", "table_name", "partition_name", "source_table"]
+
+# Incremental mode keeps these next to the VPAX files
+MANIFEST_FILE = "vpax_manifest.json"
+SUMMARY_STORE = "vpax_source_tables.parquet"
+
+# VPAX files are processed in parallel. A file that can't be read is reported and skipped, the others still count.
+# Returns the rows of the files read (in vpax_paths order) and the paths that failed.
+def _extract_all(vpax_paths, workers=None):
+    results, failed = {}, []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(extract_source_tables_from_vpax, vpax_path): vpax_path for vpax_path in vpax_paths}
+        for future in as_completed(futures):
+            vpax_path = futures[future]
+            try:
+                results[vpax_path] = future.result()
+                print(f"Processed: {os.path.basename(vpax_path)}")
+            except Exception as e:
+                failed.append(vpax_path)
+                print(f"Failed: {os.path.basename(vpax_path)}: {e}")
+    rows = [row for vpax_path in vpax_paths if vpax_path in results for row in results[vpax_path]]
+    return rows, sorted(failed)
+
+def _save_summary_excel(df, script_dir):
+    if df.empty:
+        print("No data found.")
+        return
+    output_excel = os.path.join(script_dir, "vpax_source_tables_summary.xlsx")
+    df.to_excel(output_excel, index=False)
+    print(f"\nExtracted source tables saved to: {output_excel}")
+
+# Replace the VPAX rows of the shared metadata catalog with df
+def _save_catalog(df, catalog):
+    rows = save_vpax_source_tables(df, path=catalog)
+    print(f"{rows} source tables saved to the metadata catalog: {catalog}")
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def process_all_vpax_in_directory(workers=None, catalog=None):
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    all_results = []
-
-    for file in os.listdir(script_dir):
-        if file.lower().endswith(".vpax"):
-            vpax_path = os.path.join(script_dir, file)
-            print(f"Processing: {file}")
-            file_results = extract_source_tables_from_vpax(vpax_path)
-            all_results.extend(file_results)
-
-    if all_results:
-        df = pd.DataFrame(all_results)
-        output_excel = os.path.join(script_dir, "vpax_source_tables_summary.xlsx")
-        df.to_excel(output_excel, index=False)
-        print(f"\nExtracted source tables saved to: {output_excel}")
+    vpax_paths = [os.path.join(script_dir, file) for file in os.listdir(script_dir) if file.lower().endswith(".vpax")]
+    all_results, failed = _extract_all(vpax_paths, workers)
+    if failed:
+        print(f"{len(failed)} VPAX files could not be read")
+
+    summary = pd.DataFrame(all_results, columns=SUMMARY_COLUMNS)
+    _save_summary_excel(summary, script_dir)
+    if catalog:
+        _save_catalog(summary, catalog)
+
+# Re-scan only new or changed VPAX files. The manifest keeps each file's size, modification time and sha256
+# (files with the same size and time are not hashed again); the Parquet store keeps the rows of every file,
+# so the summary workbook is regenerated without opening unchanged VPAX files.
+def process_changed_vpax_in_directory(workers=None, catalog=None):
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    manifest_path = os.path.join(script_dir, MANIFEST_FILE)
+    store_path = os.path.join(script_dir, SUMMARY_STORE)
+
+    manifest = {}
+    if os.path.exists(manifest_path) and os.path.exists(store_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        store = pd.read_parquet(store_path)
     else:
-        print("No data found.")
+        store = pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+    files = sorted(file for file in os.listdir(script_dir) if file.lower().endswith(".vpax"))
+    new_manifest, changed = {}, []
+    for file in files:
+        stat = os.stat(os.path.join(script_dir, file))
+        entry = {'size': stat.st_size, 'mtime': stat.st_mtime}
+        previous = manifest.get(file)
+        if previous and previous['size'] == entry['size'] and previous['mtime'] == entry['mtime']:
+            entry['sha256'] = previous['sha256']
+        else:
+            entry['sha256'] = _sha256(os.path.join(script_dir, file))
+        if not previous or previous['sha256'] != entry['sha256']:
+            changed.append(file)
+        new_manifest[file] = entry
+
+    removed = [file for file in manifest if file not in new_manifest]
+    print(f"{len(files)} VPAX files: {len(changed)} new or changed, {len(removed)} removed, "
+          f"{len(files) - len(changed)} unchanged")
+    if not changed and not removed and os.path.exists(os.path.join(script_dir, "vpax_source_tables_summary.xlsx")):
+        print("Summary is up to date.")
+        if catalog:
+            _save_catalog(store, catalog)
+        return
+
+    # Drop the rows of changed and removed files, then add the re-extracted ones
+    store = store[~store['vpax_file_name'].isin(changed + removed)]
+    new_rows, failed = _extract_all([os.path.join(script_dir, file) for file in changed], workers)
+    # Files that failed stay out of the manifest, so the next run tries them again
+    for vpax_path in failed:
+        del new_manifest[os.path.basename(vpax_path)]
+    if failed:
+        print(f"{len(failed)} VPAX files could not be read and will be retried on the next run")
+    store = pd.concat([store, pd.DataFrame(new_rows, columns=SUMMARY_COLUMNS)], ignore_index=True)
+    order = {file: position for position, file in enumerate(files)}
+    store = store.iloc[store['vpax_file_name'].map(order).argsort(kind='stable')].reset_index(drop=True)
+
+    store.astype(str).to_parquet(store_path, index=False)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(new_manifest, f, indent=2)
+
+    _save_summary_excel(store, script_dir)
+    if catalog:
+        _save_catalog(store, catalog)
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract the source tables of every VPAX file in the script folder")
+    parser.add_argument('--incremental', action='store_true',
+                        help=f"Only re-scan new or changed files ({MANIFEST_FILE} + {SUMMARY_STORE})")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--catalog', help="Also save the rows to this metadata catalog (metadata_catalog.py)")
+    args = parser.parse_args()
+
+    if args.incremental:
+        process_changed_vpax_in_directory(args.workers, args.catalog)
+    else:
+        process_all_vpax_in_directory(args.workers, args.catalog)
 
 if __name__ == "__main__":
-    process_all_vpax_in_directory()
+    main()
@@ -0,0 +1,66 @@
+# Benchmark for the lineage graph store
+# Builds a synthetic Cognos -> Power BI lineage graph (1M edges by default), saves it and times loading and queries
+# Usage: python benchmark_lineage_graph.py --edges 1000000
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from lineage_graph import LineageGraph
+
+# db tables -> FM data source items -> business layer items -> report items -> reports, and db tables -> PBI tables
+def generate_graph(edge_count):
+    rng = random.Random(0)
+    graph = LineageGraph()
+    db_tables = [f"db:table_{index:05d}" for index in range(max(edge_count // 200, 10))]
+    fm_items = []
+    while graph.pending_edge_count < edge_count:
+        table = rng.choice(db_tables)
+        subject = f"fm:Database Layer.{table[3:].upper()}"
+        item = f"{subject}.COLUMN_{rng.randrange(40)}"
+        business_item = f"fm:Business Layer.Subject {rng.randrange(2000)}.Item {rng.randrange(30)}"
+        graph.add_edge(table, item)
+        graph.add_edge(item, subject)
+        graph.add_edge(item, business_item)
+        fm_items.append(business_item)
+
+        report = f"rpt:Report {rng.randrange(5000)}"
+        report_item = f"{report}.Query1.{rng.choice(fm_items).rsplit('.', 1)[-1]}"
+        graph.add_edge(rng.choice(fm_items), report_item)
+        graph.add_edge(report_item, report)
+        graph.add_edge(table, f"pbi:Model {rng.randrange(300)}.{table[3:].title()}")
+    return graph
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the lineage graph store")
+    parser.add_argument('--edges', type=int, default=1000000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    graph = generate_graph(args.edges).freeze()
+    print(f"Built {len(graph.names)} nodes, {graph.edge_count} edges in {time.perf_counter() - start:.2f}s")
+
+    path = os.path.join(tempfile.mkdtemp(prefix='lineage_bench_'), 'lineage.graph')
+    start = time.perf_counter()
+    graph.save(path)
+    print(f"Saved {os.path.getsize(path) / 1e6:.1f} MB in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    graph = LineageGraph.load(path)
+    print(f"Loaded in {time.perf_counter() - start:.2f}s")
+
+    subject = next(name for name in graph.names if name.startswith('fm:Business Layer.'))
+    for label, query in [("upstream db tables", lambda: graph.upstream(subject, 'db:')),
+                         ("related PBI tables", lambda: graph.related_pbi_tables(subject)),
+                         ("downstream reports", lambda: graph.downstream(subject, 'rpt:'))]:
+        start = time.perf_counter()
+        result = query()
+        print(f"{label:<22} {len(result):>6} nodes in {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Benchmark for the Cognos / Power BI report reconciliation
+# Builds a synthetic Cognos inventory and a PBI inventory where most reports were migrated under a varied name
+# (case, separators, "Report"/"PBI" suffixes, typos, dropped words), times reconcile() and checks the links found:
+# recall (migrated reports linked to their Cognos report) and precision (links that are right, with the false links
+# made for Cognos reports that were never migrated).
+# Usage: python benchmark_report_reconciler.py --cognos 40000 --pbi 20000
+
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from report_reconciler import reconcile
+
+WORDS = ['Sales', 'Inventory', 'Backorder', 'Consumer', 'Commercial', 'Daily', 'Weekly', 'Monthly', 'Plant',
+         'Maintenance', 'Gross', 'Net', 'Brand', 'Region', 'Customer', 'Order', 'Shipment', 'Forecast', 'Budget',
+         'Actual', 'Variance', 'Tire', 'Retail', 'Fleet', 'Dealer', 'Claims', 'Warranty', 'Quality', 'Cost', 'Price']
+
+def _report_name(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(2, 4))] + [f"{rng.choice(WORDS)}{rng.randrange(10000)}"]
+    rng.shuffle(words)
+    return ' '.join(words)
+
+def _migrated_name(rng, name):
+    words = name.split()
+    variant = rng.randrange(5)
+    if variant == 0:
+        return '_'.join(words)
+    if variant == 1:
+        return name.upper() + ' - PBI'
+    if variant == 2:
+        position = rng.randrange(len(name))
+        return name[:position] + name[position + 1:] + ' Report'
+    if variant == 3 and len(words) > 2:
+        return ' '.join(words[:-2] + words[-1:])
+    return name.lower()
+
+def generate_inventories(cognos_count, pbi_count, seed=0):
+    rng = random.Random(seed)
+    cognos_names = [_report_name(rng) for _ in range(cognos_count)]
+    cognos = pd.DataFrame({'reportName': cognos_names,
+                           'originalPath': [f"/content/folder[@name='Folder {index % 500}']/report[@name='{name}']"
+                                            for index, name in enumerate(cognos_names)]})
+    migrated = rng.sample(range(cognos_count), min(pbi_count * 3 // 4, cognos_count))
+    pbi_names = [_migrated_name(rng, cognos_names[index]) for index in migrated]
+    pbi_names += [_report_name(rng) for _ in range(pbi_count - len(pbi_names))]
+    pbi = pd.DataFrame({'name': pbi_names, 'webUrl': [f"https://app.powerbi.com/reports/{index}"
+                                                       for index in range(len(pbi_names))]})
+    return cognos, pbi, dict(zip(pbi_names, (cognos_names[index] for index in migrated)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the report reconciliation")
+    parser.add_argument('--cognos', type=int, default=40000)
+    parser.add_argument('--pbi', type=int, default=20000)
+    args = parser.parse_args()
+
+    cognos, pbi, expected = generate_inventories(args.cognos, args.pbi)
+    start = time.perf_counter()
+    results = reconcile(cognos, pbi)
+    elapsed = time.perf_counter() - start
+
+    matched = results['Matched']
+    correct = int((matched['PBI Report'].map(expected) == matched['reportName']).sum())
+    never_migrated = int((~matched['reportName'].isin(set(expected.values()))).sum())
+    claimed_twice = int(matched['PBI webUrl'].duplicated().sum())
+    print(f"{len(cognos)} x {len(pbi)} reports reconciled in {elapsed:.2f}s")
+    print(f"{len(matched)} matches, {len(results['Unmatched Cognos'])} unmatched Cognos, "
+          f"{len(results['Unmatched PBI'])} unmatched PBI")
+    print(f"Recall: {correct} of {len(expected)} migrated reports linked to their Cognos report "
+          f"({correct / max(len(expected), 1):.1%})")
+    print(f"Precision: {correct} of {len(matched)} links correct ({correct / max(len(matched), 1):.1%}); "
+          f"{never_migrated} false links from Cognos reports never migrated, "
+          f"{claimed_twice} PBI reports linked more than once")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Benchmark for the business layer SQL alias rewriter (sql-query-formatter.py)
+# Builds a sqlQuery column like the FM extractor output (many query items sharing their query subject's SQL) and times
+# the previous single-regex rewrite against the tokenizer, per row and in batch mode with memoisation.
+# Usage: python benchmark_sql_alias_rewriter.py --rows 200000 --unique 2000
+
+import argparse
+import importlib.util
+import os
+import random
+import re
+import time
+
+import pandas as pd
+
+_spec = importlib.util.spec_from_file_location(
+    'sql_query_formatter', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sql-query-formatter.py'))
+formatter = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(formatter)
+
+# The previous rewrite: one regex for AS "alias" / AS 'alias'
+def legacy_process_sql_query(query):
+    return re.sub(r'(AS\s+)(["\'])(.+?)\2', lambda m: f"{m.group(1)}{m.group(2)}{m.group(3).replace('_', ' ')}{m.group(2)}",
+                  query, flags=re.IGNORECASE)
+
+def generate_queries(rows, unique):
+    rng = random.Random(0)
+    queries = []
+    for index in range(unique):
+        columns = [f'T.COL_{rng.randrange(100)}_{index} AS "Column_{position}_Name"' for position in range(rng.randint(3, 30))]
+        queries.append(f"SELECT {', '.join(columns)}, 'AS \"not_an_alias\"' AS status_text -- AS \"in_comment\"\n"
+                       f"FROM DW.FACT_{index} T WHERE T.CODE_1 = 'A_B'")
+    return pd.Series([queries[rng.randrange(unique)] for _ in range(rows)], name='sqlQuery')
+
+def timed(label, func, rows):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:7.3f}s  {rows / elapsed:>12,.0f} rows/s")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SQL alias rewriter")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--unique', type=int, default=2000, help="Distinct queries")
+    args = parser.parse_args()
+
+    queries = generate_queries(args.rows, args.unique)
+    print(f"{args.rows} queries ({args.unique} distinct), {queries.str.len().sum() / 1e6:.1f} MB\n")
+
+    legacy = timed("previous regex, per row", lambda: queries.map(legacy_process_sql_query), args.rows)
+    timed("tokenizer, per row", lambda: queries.map(formatter.process_sql_query.__wrapped__), args.rows)
+    formatter.process_sql_query.cache_clear()
+    result = timed("tokenizer, batch", lambda: formatter.process_sql_column(queries), args.rows)
+
+    sample = queries.iloc[0]
+    print(f"\nprevious regex: {legacy.iloc[0][sample.index(', ' + chr(39)):sample.index('FROM')].strip()}")
+    print(f"tokenizer:      {result.iloc[0][sample.index(', ' + chr(39)):sample.index('FROM')].strip()}")
+
+if __name__ == "__main__":
+    main()
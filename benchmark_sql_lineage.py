@@ -0,0 +1,121 @@
+# Benchmark for the SQL / M source-table lineage parser
+# Generates a large model.bim (many tables whose partitions share a smaller set of queries, as in real models) and
+# times the previous regex extraction against the tokenizer, with a cold and a warm expression cache
+# The parser is first checked against a few hand-written queries (CHECKS).
+# Usage: python benchmark_sql_lineage.py --partitions 20000 --unique 500 --repeat 3
+
+import argparse
+import json
+import random
+import re
+import time
+
+from sql_lineage import extract_m_tables, extract_tables
+
+QUERY_TEMPLATES = [
+    'SELECT s.ID, s.AMOUNT FROM {schema}.{table} s INNER JOIN {schema}.DIM_DATE d ON s.DATE_KEY = d.DATE_KEY',
+    'with base as (select * from {schema_lower}.{table_lower} where active = 1) select b.*, c.name from base b '
+    'left join "{schema}"."CUSTOMER" c on b.cust_id = c.id',
+    'SELECT * FROM (SELECT t.*, ROW_NUMBER() OVER (PARTITION BY t.ID ORDER BY t.TS) rn FROM [{schema}].[{table}] t) x '
+    'WHERE x.rn = 1 AND EXISTS (SELECT 1 FROM {schema}.AUDIT a WHERE a.ID = x.ID)',
+    '-- monthly extract\nSELECT EXTRACT(YEAR FROM o.ORDER_DATE) AS YR, SUM(o.QTY) FROM {schema}.{table} o, '
+    '{schema}.PRODUCT p WHERE o.PRODUCT_ID = p.ID GROUP BY EXTRACT(YEAR FROM o.ORDER_DATE)',
+    'SELECT * FROM ({schema}.{table} f JOIN {schema}.STORE s ON f.STORE_ID = s.ID) LEFT JOIN {schema}.REGION r '
+    'ON s.REGION_ID = r.ID',
+]
+
+# Manual checks: query -> expected tables
+CHECKS = [
+    ('SELECT * FROM (DW.A a JOIN DW.B b ON a.k = b.k) LEFT JOIN DW.C c ON b.j = c.j', ('DW.A', 'DW.B', 'DW.C')),
+    ('SELECT * FROM ((DW.A a JOIN DW.B b ON a.k = b.k) JOIN DW.D d ON 1 = 1), DW.E', ('DW.A', 'DW.B', 'DW.D', 'DW.E')),
+    ('SELECT * FROM (SELECT x FROM DW.A) t JOIN DW.B b ON t.x = b.x', ('DW.A', 'DW.B')),
+    ('WITH c AS (SELECT * FROM DW.A) SELECT EXTRACT(YEAR FROM c.D) FROM c, DW.B', ('DW.A', 'DW.B')),
+]
+
+# M expression around a query, in one of the forms found in Power BI models
+def m_expression(rng, sql, index):
+    encoded = sql.replace('"', '""').replace('\n', '#(lf)')
+    forms = [
+        f'let\n    Source = Sql.Database("server{index % 7}", "EDW", [Query="{encoded}"])\nin\n    Source',
+        f'let\n    Source = Sql.Database("server", "EDW"),\n    Query = Value.NativeQuery(Source, "{encoded}", null, '
+        f'[EnableFolding=true])\nin\n    Query',
+        f'let\n    Source = Sql.Database("server", "EDW"),\n    Nav = Source{{[Schema="DW",Item="T_{index}"]}}[Data]\n'
+        f'in\n    Nav',
+    ]
+    return rng.choice(forms)
+
+def generate_model(partitions, unique):
+    rng = random.Random(0)
+    expressions = []
+    for index in range(unique):
+        schema = rng.choice(['DW', 'STG', 'MART'])
+        table = f'FACT_{index:04d}'
+        sql = rng.choice(QUERY_TEMPLATES).format(schema=schema, table=table, schema_lower=schema.lower(),
+                                                  table_lower=table.lower())
+        expressions.append(m_expression(rng, sql, index))
+
+    tables = [{'name': f'Table {index}', 'partitions': [{'name': f'Table {index}', 'mode': 'import',
+                                                          'source': {'type': 'm', 'expression': rng.choice(expressions)}}]}
+              for index in range(partitions)]
+    return {'name': 'Benchmark', 'model': {'tables': tables}}
+
+# The previous extraction of the VPAX extractor: quoted strings starting with SELECT/WITH and one FROM/JOIN regex
+def legacy_extract(expression):
+    found = set()
+    for s in re.findall(r'"((?:[^"]|"")*)"', expression):
+        clean = s.replace('""', '').replace('#(lf)', '\n').replace('#(tab)', '\t')
+        if re.match(r'^\s*(SELECT|WITH|--)', clean, re.IGNORECASE):
+            found.update(re.findall(r'(?:FROM|JOIN|INNER\s+JOIN|LEFT\s+JOIN|RIGHT\s+JOIN|FULL\s+JOIN)\s+((?:[A-Z0-9_]+\.){1,2}[A-Z0-9_]+)',
+                                    clean, re.IGNORECASE))
+    return sorted(found)
+
+def time_pass(label, func, expressions, size_mb, repeat, before=None):
+    best, found = None, 0
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        found = sum(len(func(expression)) for expression in expressions)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<32} {best:7.3f}s  {len(expressions) / best:>10,.0f} partitions/s  {size_mb / best:7.1f} MB/s  "
+          f"{found:>7} table references")
+    return best
+
+def clear_caches():
+    extract_m_tables.cache_clear()
+    extract_tables.cache_clear()
+
+def run_checks():
+    for sql, expected in CHECKS:
+        found = extract_tables(sql)
+        if found != expected:
+            raise AssertionError(f"{sql!r}: expected {expected}, got {found}")
+    print(f"{len(CHECKS)} manual checks passed")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQL/M source-table lineage extraction")
+    parser.add_argument('--partitions', type=int, default=20000)
+    parser.add_argument('--unique', type=int, default=500, help="Distinct partition expressions")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    run_checks()
+    model_text = json.dumps(generate_model(args.partitions, args.unique))
+    size_mb = len(model_text) / 1e6
+    start = time.perf_counter()
+    model = json.loads(model_text)
+    print(f"model.bim with {args.partitions} partitions ({args.unique} distinct), {size_mb:.1f} MB, "
+          f"parsed in {time.perf_counter() - start:.2f}s\n")
+
+    expressions = [partition['source']['expression'] for table in model['model']['tables']
+                   for partition in table['partitions']]
+
+    time_pass("previous regex", legacy_extract, expressions, size_mb, args.repeat)
+    time_pass("tokenizer, no cache", extract_m_tables.__wrapped__, expressions, size_mb, args.repeat, clear_caches)
+    time_pass("tokenizer, cold cache", extract_m_tables, expressions, size_mb, args.repeat, clear_caches)
+    time_pass("tokenizer, warm cache", extract_m_tables, expressions, size_mb, args.repeat)
+    print(f"\n{extract_m_tables.cache_info()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# Benchmark for the PBIX standardisation accelerator
+# Builds a synthetic report Layout (200 visuals by default) and times the "Add new Header" rules, comparing the
+# compiled rule engine with the previous hard-coded loop that re-serialised each config after every rule
+# Usage: python benchmark_standardisation.py --visuals 200 --pages 10 --repeat 20
+
+import argparse
+import copy
+import json
+import random
+import time
+
+from powerbi_standardisation_accelerator import RULE_SETS, StandardisationRules
+
+VISUAL_TYPES = ['barChart', 'lineChart', 'tableEx', 'card', 'slicer', 'pieChart', 'textbox']
+
+# Visual used as a template for the generated report
+BAR_CHART_VISUAL = {
+    "x": 19,
+    "y": 255,
+    "z": 0,
+    "width": 407,
+    "height": 362,
+    "config": "{\"name\": \"ec2b436d7f5655cb2ed8\", \"layouts\": [{\"id\": 0, \"position\": {\"x\": 19, \"y\": 255, \"z\": 0, \"width\": 407, \"height\": 362, \"tabOrder\": 0}}], \"singleVisual\": {\"visualType\": \"barChart\", \"projections\": {\"Category\": [{\"queryRef\": \"Orders.Category\", \"active\": true}], \"Y\": [{\"queryRef\": \"Sum(Orders.Sales)\"}]}, \"prototypeQuery\": {\"Version\": 2, \"From\": [{\"Name\": \"o\", \"Entity\": \"Orders\", \"Type\": 0}], \"Select\": [{\"Column\": {\"Expression\": {\"SourceRef\": {\"Source\": \"o\"}}, \"Property\": \"Category\"}, \"Name\": \"Orders.Category\", \"NativeReferenceName\": \"Category\"}, {\"Aggregation\": {\"Expression\": {\"Column\": {\"Expression\": {\"SourceRef\": {\"Source\": \"o\"}}, \"Property\": \"Sales\"}}, \"Function\": 0}, \"Name\": \"Sum(Orders.Sales)\", \"NativeReferenceName\": \"Sales\"}], \"OrderBy\": [{\"Direction\": 2, \"Expression\": {\"Aggregation\": {\"Expression\": {\"Column\": {\"Expression\": {\"SourceRef\": {\"Source\": \"o\"}}, \"Property\": \"Sales\"}}, \"Function\": 0}}}]}, \"columnProperties\": {\"Sum(Orders.Sales)\": {\"displayName\": \"Sales\"}}, \"drillFilterOtherVisuals\": true, \"hasDefaultSort\": true, \"vcObjects\": {\"border\": [{\"properties\": {\"color\": {\"solid\": {\"color\": {\"expr\": {\"Literal\": {\"Value\": \"'#CCCCCC'\"}}}}}}}], \"title\": [{\"properties\": {\"fontFamily\": {\"expr\": {\"Literal\": {\"Value\": \"'Segoe UI'\"}}}, \"fontSize\": {\"expr\": {\"Literal\": {\"Value\": 16}}}}}]}}}",
+    "filters": "[]",
+    "query": "{\"Commands\":[{\"SemanticQueryDataShapeCommand\":{\"Query\":{\"Version\":2,\"From\":[{\"Name\":\"o\",\"Entity\":\"Orders\",\"Type\":0}],\"Select\":[{\"Column\":{\"Expression\":{\"SourceRef\":{\"Source\":\"o\"}},\"Property\":\"Category\"},\"Name\":\"Orders.Category\",\"NativeReferenceName\":\"Category\"},{\"Aggregation\":{\"Expression\":{\"Column\":{\"Expression\":{\"SourceRef\":{\"Source\":\"o\"}},\"Property\":\"Sales\"}},\"Function\":0},\"Name\":\"Sum(Orders.Sales)\",\"NativeReferenceName\":\"Sales\"}],\"OrderBy\":[{\"Direction\":2,\"Expression\":{\"Aggregation\":{\"Expression\":{\"Column\":{\"Expression\":{\"SourceRef\":{\"Source\":\"o\"}},\"Property\":\"Sales\"}},\"Function\":0}}}]},\"Binding\":{\"Primary\":{\"Groupings\":[{\"Projections\":[0,1]}]},\"DataReduction\":{\"DataVolume\":4,\"Primary\":{\"Window\":{\"Count\":1000}}},\"Version\":1},\"ExecutionMetricsKind\":1}}]}",
+    "dataTransforms": "{\"projectionOrdering\":{\"Category\":[0],\"Y\":[1]},\"projectionActiveItems\":{\"Category\":[{\"queryRef\":\"Orders.Category\",\"suppressConcat\":false}]},\"queryMetadata\":{\"Select\":[{\"Restatement\":\"Category\",\"Name\":\"Orders.Category\",\"Type\":2048},{\"Restatement\":\"Sales\",\"Name\":\"Sum(Orders.Sales)\",\"Type\":1}]},\"visualElements\":[{\"DataRoles\":[{\"Name\":\"Category\",\"Projection\":0,\"isActive\":true},{\"Name\":\"Y\",\"Projection\":1,\"isActive\":false}]}],\"selects\":[{\"displayName\":\"Category\",\"queryName\":\"Orders.Category\",\"roles\":{\"Category\":true},\"type\":{\"category\":null,\"underlyingType\":1},\"expr\":{\"Column\":{\"Expression\":{\"SourceRef\":{\"Entity\":\"Orders\"}},\"Property\":\"Category\"}}},{\"displayName\":\"Sales\",\"queryName\":\"Sum(Orders.Sales)\",\"roles\":{\"Y\":true},\"sort\":2,\"sortOrder\":0,\"type\":{\"category\":null,\"underlyingType\":259},\"expr\":{\"Aggregation\":{\"Expression\":{\"Column\":{\"Expression\":{\"SourceRef\":{\"Entity\":\"Orders\"}},\"Property\":\"Sales\"}},\"Function\":0}}}]}"
+}
+
+# Header visuals and first page positions of the "Add new Header" rules, for the previous hard-coded loop
+with open(RULE_SETS['Add new Header'], 'r', encoding='utf-8') as f:
+    ADD_HEADER_SPEC = json.load(f)
+HEADER_VISUALS = [action['visual'] for rule in ADD_HEADER_SPEC['rules'] if rule.get('scope') == 'page'
+                  for action in rule['actions']]
+FIRST_PAGE_POSITIONS = {rule['match']['visualType']: rule['actions'][0]['position']
+                        for rule in ADD_HEADER_SPEC['rules'] if 'visualType' in rule.get('match', {})}
+
+# A report Layout with visuals spread over pages, each with a title and a query-sized config
+def generate_layout(visual_count, page_count):
+    rng = random.Random(0)
+    template = json.loads(BAR_CHART_VISUAL['config'])
+    sections = [{'name': f'ReportSection{page}', 'ordinal': page, 'visualContainers': []} for page in range(page_count)]
+    for i in range(visual_count):
+        config = copy.deepcopy(template)
+        config['name'] = f'visual{i:05d}'
+        config['singleVisual']['visualType'] = rng.choice(VISUAL_TYPES)
+        config['singleVisual']['vcObjects']['title'][0]['properties']['fontFamily']['expr']['Literal']['Value'] = "'Arial'"
+        sections[i % page_count]['visualContainers'].append({
+            'x': rng.randint(0, 1000), 'y': rng.randint(0, 600), 'z': i, 'width': 300, 'height': 200,
+            'config': json.dumps(config), 'filters': '[]', 'query': BAR_CHART_VISUAL['query'],
+            'dataTransforms': BAR_CHART_VISUAL['dataTransforms']
+        })
+    return {'sections': sections}
+
+# The previous Layout loop: parse each config, then dump it again after the title rule and each chart type rule
+def legacy_add_header_layout(data):
+    for section in data['sections']:
+        section['visualContainers'].extend(HEADER_VISUALS)
+        for visual in section['visualContainers']:
+            config = json.loads(visual['config'])
+            try:
+                config['singleVisual']['vcObjects']['title'][0]['properties']['fontFamily']['expr']['Literal']['Value'] = "'Segoe UI'"
+                config['singleVisual']['vcObjects']['title'][0]['properties']['fontSize']['expr']['Literal']['Value'] = 16
+                visual['config'] = json.dumps(config)
+            except (KeyError, IndexError, TypeError):
+                pass
+            if section['ordinal'] == 0:
+                for visual_type in ('lineChart', 'tableEx', 'barChart'):
+                    if config.get('singleVisual', {}).get('visualType') == visual_type:
+                        visual.update(FIRST_PAGE_POSITIONS[visual_type])
+                        for layout in config['layouts']:
+                            layout['position'].update(FIRST_PAGE_POSITIONS[visual_type])
+                    visual['config'] = json.dumps(config)
+
+def time_it(label, func, layout, repeat):
+    best = None
+    for _ in range(repeat):
+        data = copy.deepcopy(layout)
+        start = time.perf_counter()
+        func(data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<40} best of {repeat}: {best * 1000:8.2f} ms")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Layout standardisation rules")
+    parser.add_argument('--visuals', type=int, default=200)
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    add_header_layout = StandardisationRules(ADD_HEADER_SPEC).apply
+    layout = generate_layout(args.visuals, args.pages)
+    print(f"Layout with {args.visuals} visuals on {args.pages} pages, {len(json.dumps(layout)) / 1e6:.1f} MB\n")
+
+    legacy = time_it("re-serialise after every rule", legacy_add_header_layout, layout, args.repeat)
+    current = time_it("compiled rules, dirty visuals only", add_header_layout, layout, args.repeat)
+    print(f"\nSpeed-up: {legacy / current:.1f}x")
+
+    # On an already standardised Layout no config changes, so nothing needs to be serialised again
+    data = copy.deepcopy(layout)
+    add_header_layout(data)
+    print("\nAlready standardised Layout:")
+    legacy = time_it("re-serialise after every rule", legacy_add_header_layout, data, args.repeat)
+    current = time_it("compiled rules, dirty visuals only", add_header_layout, data, args.repeat)
+    print(f"\nSpeed-up: {legacy / current:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Benchmark for the validation report input readers
+# Generates a large two-sheet workbook (Cognos & PBI) and times each reading backend
+# Usage: python benchmark_validation_reader.py --rows 500000 --cols 12
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import openpyxl
+import pandas as pd
+
+from validation_report import python_calamine, read_columns, read_table
+
+# Write a workbook with dimension, id and measure columns using openpyxl's write-only mode
+def generate_workbook(path, rows, cols):
+    header = ['Region', 'Brand', 'Plant_ID'] + [f'Measure_{i}' for i in range(cols - 3)]
+    regions = ['NA', 'EMEA', 'LA', 'AP']
+    brands = [f'BRAND {i}' for i in range(50)]
+
+    workbook = openpyxl.Workbook(write_only=True)
+    for sheet_name in ('Cognos', 'PBI'):
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append(header)
+        rng = random.Random(sheet_name)
+        for _ in range(rows):
+            sheet.append([rng.choice(regions), rng.choice(brands), rng.randint(1, 5000)] +
+                         [round(rng.uniform(-1000, 100000), 2) for _ in range(cols - 3)])
+    workbook.save(path)
+    return header
+
+def time_it(label, func):
+    start = time.perf_counter()
+    df = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<45} {elapsed:8.2f}s  {len(df):>9} rows x {len(df.columns)} cols")
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark validation report readers")
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--cols', type=int, default=12)
+    parser.add_argument('--keep', action='store_true', help="Keep the generated files")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='validation_bench_')
+    workbook_path = os.path.join(work_dir, 'validation_input.xlsx')
+
+    start = time.perf_counter()
+    header = generate_workbook(workbook_path, args.rows, args.cols)
+    print(f"Generated {workbook_path} ({args.rows} rows per sheet) in {time.perf_counter() - start:.2f}s")
+
+    usecols = header[:3] + header[3:5]
+    print(f"\nColumns: {read_columns(workbook_path, 'Cognos')}\n")
+
+    time_it("pandas read_excel (openpyxl, all columns)",
+            lambda: pd.read_excel(workbook_path, sheet_name='Cognos', engine='openpyxl'))
+    cognos_df = time_it("openpyxl read-only (all columns)",
+                        lambda: read_table(workbook_path, 'Cognos', engine='openpyxl-readonly'))
+    time_it("openpyxl read-only (5 columns)",
+            lambda: read_table(workbook_path, 'Cognos', usecols=usecols, engine='openpyxl-readonly'))
+    if python_calamine is not None:
+        time_it("calamine (all columns)", lambda: read_table(workbook_path, 'Cognos', engine='calamine'))
+        time_it("calamine (5 columns)", lambda: read_table(workbook_path, 'Cognos', usecols=usecols, engine='calamine'))
+    else:
+        print("calamine not installed, skipped (pip install python-calamine)")
+
+    csv_path = os.path.join(work_dir, 'Cognos.csv')
+    cognos_df.to_csv(csv_path, index=False)
+    time_it("CSV (5 columns)", lambda: read_table(csv_path, usecols=usecols))
+
+    try:
+        parquet_path = os.path.join(work_dir, 'Cognos.parquet')
+        cognos_df.to_parquet(parquet_path, index=False)
+        time_it("Parquet (5 columns)", lambda: read_table(parquet_path, usecols=usecols))
+    except ImportError:
+        print("pyarrow not installed, Parquet skipped")
+
+    if not args.keep:
+        for file in os.listdir(work_dir):
+            os.remove(os.path.join(work_dir, file))
+        os.rmdir(work_dir)
+
+if __name__ == "__main__":
+    main()
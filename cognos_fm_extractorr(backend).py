@@ -2,6 +2,8 @@ import streamlit as st
 import xml.etree.ElementTree as ET
 import pandas as pd
 
+from metadata_catalog import DEFAULT_CATALOG, save_fm_metadata
+
 def parse_xml(xml_file):
     namespaces = []
     tree = ET.parse(xml_file)
@@ -139,6 +141,14 @@ def parse_xml(xml_file):
 
     return namespaces
 
+# Name of the Framework Manager project (the <name> of the model root), or None when the file has none
+def project_name(xml_file):
+    xml_file.seek(0)
+    for _, element in ET.iterparse(xml_file, events=('end',)):
+        if element.tag == '{http://www.developer.cognos.com/schemas/bmt/60/12}name':
+            return element.text
+    return None
+
 def main():
     st.title("Cognos Backend Accelerator", help="Extract Metadata of Datasources from Framework Manager")
     
@@ -198,6 +208,14 @@ def main():
                 file_name='final_backend_data.csv',
                 mime='text/csv',
             )
+
+            # Save to the shared metadata catalog, keyed by the package (every FM project exports model.xml, so the
+            # file name can't tell projects apart); re-saving the same package replaces its rows
+            package = st.text_input("Package name", value=project_name(xml_file) or '')
+            catalog_path = st.text_input("Metadata catalog", value=DEFAULT_CATALOG)
+            if st.button("Save to metadata catalog", disabled=not package):
+                rows = save_fm_metadata(final_df, package, catalog_path)
+                st.success(f"{rows} query items saved to {catalog_path}")
         else:
             st.write("No query data found.")
 
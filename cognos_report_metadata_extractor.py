@@ -5,6 +5,8 @@ import regex as re
 import openai
 import pandas as pd
 
+from metadata_catalog import DEFAULT_CATALOG, save_report_metadata
+
 # def convert_to_dax_expression(expression):
 #     response = openai.Completion.create(
 #         model="gpt-3.5-turbo",
@@ -223,5 +225,11 @@ if uploaded_files:
         file_name='final_report_data.csv',
         mime='text/csv',
     )
+
+    # Save to the shared metadata catalog (re-saving a report replaces its rows)
+    catalog_path = st.text_input("Metadata catalog", value=DEFAULT_CATALOG)
+    if st.button("Save to metadata catalog"):
+        rows = save_report_metadata(final_columns_df, catalog_path)
+        st.success(f"{rows} report columns saved to {catalog_path}")
 else:
     print("Please upload one or more Cognos reports in txt format.")
@@ -0,0 +1,265 @@
+# Cognos query subject SQL (dbQuery/sql of the FM extractor output) to Power BI partition sources
+# Each query is translated to native SQL and wrapped in an M Value.NativeQuery expression:
+#   [Data source].TABLE               -> schema.TABLE (data source names mapped with --schema-map, else kept)
+#   other [bracket] identifiers       -> "double quoted"
+#   #prompt('p', 'type', 'default')#  -> @p bound to the M parameter p (parameters are listed with type and default)
+#   ?p?                               -> @p
+#   (the Value.NativeQuery parameter record is only bound for the sql connector; for the others prompts are kept
+#    and reported as warnings)
+#   AS "Column_Name"                  -> AS "Column Name" (output columns only: aliases in the outermost select list
+#                                        and their ORDER BY references; table and subquery aliases are kept)
+# Other macros (#sq($account...)#, #promptmany(...)#, ...) are kept and reported as warnings for manual review.
+# Queries are deduplicated by a hash of their normalised text (comments, whitespace and keyword case ignored) and
+# the translations are cached in a JSON file, so re-running over every query subject of a model only translates new SQL.
+# Usage: python cognos_sql_translator.py final_backend_data.csv --output cognos_sql_translation.csv
+#            [--connector teradata] [--schema-map "Prd NA_BI_VWS=NA_BI_VWS"] [--cache sql_translation_cache.json]
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from functools import lru_cache
+
+import pandas as pd
+
+from sql_lineage import EXPRESSION_CACHE_SIZE
+
+# Bump when the translation output changes, so cached translations are not reused
+TRANSLATOR_VERSION = 3
+DEFAULT_CACHE = 'sql_translation_cache.json'
+
+# M source step per connector; Server and Database are M parameters of the model
+CONNECTORS = {
+    'sql': 'Sql.Database(Server, Database)',
+    'teradata': 'Teradata.Database(Server, [HierarchicalNavigation = true])',
+    'oracle': 'Oracle.Database(Server, [HierarchicalNavigation = true])',
+}
+
+# Connectors whose Value.NativeQuery binds the parameter record to @name placeholders
+BIND_PARAMETERS = {'sql'}
+
+# Cognos prompt data types -> M types
+PROMPT_TYPES = {'string': 'text', 'token': 'text', 'integer': 'number', 'int': 'number', 'decimal': 'number',
+                'float': 'number', 'number': 'number', 'date': 'date', 'datetime': 'datetime',
+                'timestamp': 'datetime', 'time': 'time', 'boolean': 'logical'}
+
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>[Nn]?'(?:[^']|'')*(?:'|\Z))
+  | (?P<quoted>"(?:[^"]|"")*")
+  | (?P<bracket>\[(?:[^\]]|\]\])*\])
+  | (?P<word>[^\W\d][\w@#$]*)
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Macros: #...# (quoted strings inside may hold #) and ?prompt? references
+_MACRO = re.compile(r"#((?:[^#'\n]|'(?:[^']|'')*')*)#|\?([A-Za-z_][\w ]*)\?")
+_PROMPT = re.compile(r"^\s*prompt\s*\(\s*'((?:[^']|'')*)'(?:\s*,\s*'((?:[^']|'')*)')?(?:\s*,\s*'((?:[^']|'')*)')?",
+                     re.IGNORECASE)
+_PLAIN_IDENTIFIER = re.compile(r'[A-Za-z_][\w$]*')
+
+# Key of a query for deduplication: tokens without comments, whitespace collapsed, unquoted words upper-cased
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def normalise_sql(sql):
+    parts = []
+    for match in _TOKEN_PATTERN.finditer(sql):
+        kind = match.lastgroup
+        if kind in ('space', 'comment'):
+            continue
+        parts.append(match.group().upper() if kind == 'word' else match.group())
+    return ' '.join(parts)
+
+def sql_hash(sql, signature=''):
+    return hashlib.sha256(f"{signature}\0{normalise_sql(sql)}".encode('utf-8')).hexdigest()
+
+# M text literal
+def m_string(text):
+    return '"' + text.replace('"', '""').replace('\r', '#(cr)').replace('\n', '#(lf)').replace('\t', '#(tab)') + '"'
+
+# Underscores to spaces in the quoted column aliases of the outermost select list (AS "Net_Sales" -> AS "Net Sales"),
+# and in the ORDER BY references to them. Aliases inside subqueries and CTEs, table aliases after FROM and qualified
+# references (x."Net_Sales") are kept, as renaming them would break the references to them.
+def friendly_output_aliases(sql):
+    parts, renamed = [], {}
+    depth, clause, previous = 0, 'start', ''
+    for match in _TOKEN_PATTERN.finditer(sql):
+        kind, text = match.lastgroup, match.group()
+        if kind in ('space', 'comment'):
+            parts.append(text)
+            continue
+        upper = text.upper() if kind == 'word' else text
+        if text == '(':
+            depth += 1
+        elif text == ')':
+            depth -= 1
+        elif depth == 0 and kind == 'word':
+            if upper == 'SELECT' and clause == 'start':
+                clause = 'select'
+            elif upper == 'FROM' and clause == 'select':
+                clause = 'from'
+            elif upper == 'ORDER' and clause == 'from':
+                clause = 'order'
+        elif depth == 0 and kind == 'quoted':
+            if clause == 'select' and previous == 'AS' and '_' in text:
+                renamed[text] = text.replace('_', ' ')
+                text = renamed[text]
+            elif clause == 'order' and previous != '.' and text in renamed:
+                text = renamed[text]
+        parts.append(text)
+        previous = upper
+    return ''.join(parts)
+
+def _parameter_name(name):
+    name = re.sub(r'\W+', '_', name.strip()).strip('_')
+    return name if name and not name[0].isdigit() else f"p_{name}"
+
+class SqlTranslator:
+    def __init__(self, connector='sql', schema_map=None, friendly_aliases=True, cache_path=None):
+        if connector not in CONNECTORS:
+            raise ValueError(f"Unknown connector '{connector}'; choose from {sorted(CONNECTORS)}")
+        self.connector = connector
+        self.schema_map = {key.lower(): value for key, value in (schema_map or {}).items()}
+        self.friendly_aliases = friendly_aliases
+        self.cache_path = cache_path
+        self.signature = json.dumps([TRANSLATOR_VERSION, connector, sorted(self.schema_map.items()), friendly_aliases])
+        self.cache = {}
+        self.hits = self.misses = 0
+        self._dirty = False
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                self.cache = json.load(f)
+
+    def save(self):
+        if not self.cache_path or not self._dirty:
+            return
+        temp_path = f"{self.cache_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.cache, f)
+        os.replace(temp_path, self.cache_path)
+        self._dirty = False
+
+    # Macros to SQL parameters: returns (sql, parameters, warnings). Prompts are replaced by @name only for
+    # connectors that bind parameters; otherwise they are kept, still listed as parameters, with a warning.
+    def _rewrite_macros(self, sql):
+        parameters, warnings = {}, []
+        bind = self.connector in BIND_PARAMETERS
+
+        def replace(match):
+            if match.group(2) is not None:
+                name = _parameter_name(match.group(2))
+                parameters.setdefault(name, {'name': name, 'type': 'text', 'default': None})
+                return f"@{name}" if bind else match.group()
+            prompt = _PROMPT.match(match.group(1))
+            if not prompt:
+                warnings.append(f"Macro needs manual translation: {match.group()}")
+                return match.group()
+            name = _parameter_name(prompt.group(1).replace("''", "'"))
+            data_type = PROMPT_TYPES.get((prompt.group(2) or 'string').lower(), 'text')
+            default = prompt.group(3).replace("''", "'") if prompt.group(3) else None
+            parameters.setdefault(name, {'name': name, 'type': data_type, 'default': default})
+            return f"@{name}" if bind else match.group()
+
+        sql = _MACRO.sub(replace, sql)
+        if parameters and not bind:
+            warnings.append(f"Prompts need manual translation: the {self.connector} connector doesn't bind "
+                            f"Value.NativeQuery parameters ({', '.join(parameters)})")
+        return sql, list(parameters.values()), warnings
+
+    # [Data source].table -> schema.table, other bracket identifiers -> "double quoted"
+    def _rewrite_identifiers(self, sql):
+        parts = []
+        matches = list(_TOKEN_PATTERN.finditer(sql))
+        for index, match in enumerate(matches):
+            text = match.group()
+            if match.lastgroup == 'bracket':
+                name = text[1:-1].replace(']]', ']')
+                following = matches[index + 1].group() if index + 1 < len(matches) else ''
+                if following == '.':
+                    name = self.schema_map.get(name.lower(), name)
+                if not _PLAIN_IDENTIFIER.fullmatch(name):
+                    name = '"' + name.replace('"', '""') + '"'
+                text = name
+            parts.append(text)
+        return ''.join(parts)
+
+    def _m_expression(self, sql, parameters):
+        record = '[' + ', '.join(f"{parameter['name']} = {parameter['name']}" for parameter in parameters) + ']' \
+            if parameters and self.connector in BIND_PARAMETERS else 'null'
+        return (f"let\n"
+                f"    Source = {CONNECTORS[self.connector]},\n"
+                f"    Result = Value.NativeQuery(Source, {m_string(sql)}, {record}, [EnableFolding = true])\n"
+                f"in\n"
+                f"    Result")
+
+    def _translate(self, sql):
+        native_sql, parameters, warnings = self._rewrite_macros(sql.strip())
+        native_sql = self._rewrite_identifiers(native_sql)
+        if self.friendly_aliases:
+            native_sql = friendly_output_aliases(native_sql)
+        if re.search(r'\bX(?:MIN|MAX|SUM|COUNT|AVG)\s*\([^)]*\bfor\b', native_sql, re.IGNORECASE):
+            warnings.append("Cognos X-aggregate (XMIN/XSUM ... for ...) needs manual translation")
+        return {'nativeSql': native_sql, 'mExpression': self._m_expression(native_sql, parameters),
+                'parameters': parameters, 'warnings': warnings}
+
+    # Translation of one query, from the cache when the same normalised SQL was translated before
+    def translate(self, sql):
+        key = sql_hash(sql, self.signature)
+        translation = self.cache.get(key)
+        if translation is None:
+            self.misses += 1
+            translation = self.cache[key] = self._translate(sql)
+            self._dirty = True
+        else:
+            self.hits += 1
+        return translation
+
+# Translations of the query subjects of an FM extractor output (one row per namespace / table with SQL)
+def translate_fm_queries(fm_df, translator):
+    subjects = fm_df[['namespace', 'table', 'sqlQuery']].drop_duplicates()
+    subjects = subjects[subjects['sqlQuery'].map(lambda sql: isinstance(sql, str) and sql.strip() not in ('', 'N/A'))]
+    rows = []
+    for namespace, table, sql in subjects.itertuples(index=False):
+        translation = translator.translate(sql)
+        rows.append({'namespace': namespace, 'table': table, 'sqlQuery': sql,
+                     'nativeSql': translation['nativeSql'], 'mExpression': translation['mExpression'],
+                     'parameters': json.dumps(translation['parameters']) if translation['parameters'] else '',
+                     'warnings': '; '.join(translation['warnings'])})
+    translator.save()
+    return pd.DataFrame(rows, columns=['namespace', 'table', 'sqlQuery', 'nativeSql', 'mExpression', 'parameters',
+                                       'warnings'])
+
+# "Prd NA_BI_VWS=NA_BI_VWS,GDYR_BI_VWS=GDYR_BI_VWS" -> {'Prd NA_BI_VWS': 'NA_BI_VWS', ...}
+def parse_schema_map(text):
+    mapping = {}
+    for item in (text or '').split(','):
+        if '=' in item:
+            source, target = item.split('=', 1)
+            mapping[source.strip()] = target.strip()
+    return mapping
+
+def main():
+    parser = argparse.ArgumentParser(description="Translate Cognos query subject SQL to Power BI M partitions")
+    parser.add_argument('input', help="FM extractor output (final_backend_data.csv)")
+    parser.add_argument('--output', default='cognos_sql_translation.csv')
+    parser.add_argument('--connector', default='sql', choices=sorted(CONNECTORS))
+    parser.add_argument('--schema-map', help="Data source to schema names: 'Data source=schema,...'")
+    parser.add_argument('--keep-aliases', action='store_true', help="Don't rewrite underscores in quoted column aliases")
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help="Translation cache file ('' to disable)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    translator = SqlTranslator(args.connector, parse_schema_map(args.schema_map), not args.keep_aliases,
+                               args.cache or None)
+    fm_df = pd.read_csv(args.input, dtype=str, keep_default_na=False)
+    result = translate_fm_queries(fm_df, translator)
+    result.to_csv(args.output, index=False)
+
+    print(f"{len(result)} query subjects ({translator.misses} translated, {translator.hits} from cache), "
+          f"{(result['warnings'] != '').sum()} with warnings, saved to: {args.output} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ import xml.etree.ElementTree as ET
 import pandas as pd
 from io import StringIO
 
+from metadata_catalog import DEFAULT_CATALOG, save_effort_estimates
+
 def parse_xml(xml_content):
     root = ET.fromstring(xml_content)
     
@@ -137,3 +139,9 @@ if uploaded_files:
         file_name="cognos_reports_summary.csv",
         mime="text/csv"
     )
+
+    # Save to the shared metadata catalog (re-saving a report replaces its rows)
+    catalog_path = st.text_input("Metadata catalog", value=DEFAULT_CATALOG)
+    if st.button("Save to metadata catalog"):
+        rows = save_effort_estimates(combined_df, summary_df, catalog_path)
+        st.success(f"{rows} rows saved to {catalog_path}")
@@ -8,6 +8,8 @@ from sklearn.cluster import AgglomerativeClustering
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics import pairwise_distances
 
+from metadata_catalog import DEFAULT_CATALOG, save_report_inventory
+
 def extract_levels(search_path):
     pattern_double_quotes = re.compile(r'"([^"]*)"')
     pattern_single_quotes = re.compile(r"'([^']*)'")
@@ -156,5 +158,11 @@ def main():
             mime='text/csv'
         )
 
+        # Save to the shared metadata catalog (replaces the previously saved inventory)
+        catalog_path = st.text_input("Metadata catalog", value=DEFAULT_CATALOG)
+        if st.button("Save to metadata catalog"):
+            rows = save_report_inventory(extracted_df, catalog_path)
+            st.success(f"{rows} reports saved to {catalog_path}")
+
 if __name__ == "__main__":
     main()
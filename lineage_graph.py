@@ -0,0 +1,289 @@
+# Lineage graph from Cognos Framework Manager to Power BI
+# Ingests the FM extractor output (final_backend_data.csv), the report extractor output (final_report_data.csv) and
+# the VPAX extractor summary (vpax_source_tables_summary.xlsx) into one graph of column-level dependencies.
+# Node names carry a prefix:
+#   db:<table>                       database table (unqualified, lower case, so FM data sources and PBI schemas meet)
+#   fm:<namespace>.<query subject>[.<query item>]
+#   rpt:<report>[.<query>.<data item>]
+#   pbi:<model>.<table>
+# Edges point from a source to what depends on it: db table -> FM item -> FM query subject / report item -> report,
+# and db table -> PBI table. Node names are interned to integer ids and the edges are kept as forward and reverse
+# CSR arrays (offsets + targets), saved in one binary file that loads without parsing.
+# Usage: python lineage_graph.py build --fm final_backend_data.csv --report final_report_data.csv
+#            --vpax vpax_source_tables_summary.xlsx --output lineage.graph
+#        python lineage_graph.py query lineage.graph "fm:Business Layer.Brand" --pbi
+
+import argparse
+import re
+import struct
+import time
+
+import numpy as np
+import pandas as pd
+
+from sql_lineage import extract_tables
+
+FILE_MAGIC = b'LGRAPH1\n'
+_HEADER = struct.Struct('<QQQ')
+
+_COGNOS_REF = re.compile(r'\[((?:[^\]]|\]\])*)\]((?:\s*\.\s*\[(?:[^\]]|\]\])*\])+)')
+_COGNOS_PART = re.compile(r'\[((?:[^\]]|\]\])*)\]')
+
+# Cognos references in an expression: "[Business Layer].[Brand].[Brand Code] + 1" -> [['Business Layer', 'Brand', 'Brand Code']]
+def cognos_refs(expression):
+    if not isinstance(expression, str):
+        return []
+    return [[part.replace(']]', ']') for part in _COGNOS_PART.findall(match.group())]
+            for match in _COGNOS_REF.finditer(expression)]
+
+def _is_missing(value):
+    return not isinstance(value, str) or value in ('', 'N/A')
+
+def db_node(table):
+    return 'db:' + table.split('.')[-1].lower()
+
+class LineageGraph:
+    def __init__(self, names=None, forward=None, reverse=None):
+        self.names = names if names is not None else []
+        self._ids = None
+        self._sources, self._targets = [], []
+        empty = (np.zeros(len(self.names) + 1, dtype=np.uint32), np.zeros(0, dtype=np.uint32))
+        self.forward = forward if forward is not None else empty
+        self.reverse = reverse if reverse is not None else empty
+        # FM shortcuts (fm:<namespace>.<shortcut> -> fm:<target>), used to resolve report references
+        self.shortcuts = {}
+
+    @property
+    def ids(self):
+        if self._ids is None:
+            self._ids = {name: node for node, name in enumerate(self.names)}
+        return self._ids
+
+    # Interned id of a node name, added when new
+    def intern(self, name):
+        node = self.ids.get(name)
+        if node is None:
+            node = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return node
+
+    def add_edge(self, source, target):
+        self._sources.append(self.intern(source))
+        self._targets.append(self.intern(target))
+
+    @property
+    def edge_count(self):
+        return len(self.forward[1])
+
+    # Edges added since the last freeze (duplicates included)
+    @property
+    def pending_edge_count(self):
+        return len(self._sources)
+
+    # Merge the pending edges into the CSR arrays (duplicates dropped)
+    def freeze(self):
+        node_count = len(self.names)
+        sources = np.concatenate([np.repeat(np.arange(len(self.forward[0]) - 1, dtype=np.uint64),
+                                            np.diff(self.forward[0].astype(np.int64))),
+                                  np.asarray(self._sources, dtype=np.uint64)])
+        targets = np.concatenate([self.forward[1].astype(np.uint64), np.asarray(self._targets, dtype=np.uint64)])
+        keys = np.unique(sources * np.uint64(max(node_count, 1)) + targets)
+        sources = (keys // np.uint64(max(node_count, 1))).astype(np.uint32)
+        targets = (keys % np.uint64(max(node_count, 1))).astype(np.uint32)
+        self._sources, self._targets = [], []
+
+        self.forward = self._csr(sources, targets, node_count)
+        order = np.argsort(targets, kind='stable')
+        self.reverse = self._csr(targets[order], sources[order], node_count)
+        return self
+
+    @staticmethod
+    def _csr(sources, targets, node_count):
+        offsets = np.zeros(node_count + 1, dtype=np.uint32)
+        np.cumsum(np.bincount(sources, minlength=node_count), out=offsets[1:])
+        return offsets, targets
+
+    # ---------- Ingestion ----------
+
+    # FM extractor output: query subject SQL -> db tables, query item refobjs, shortcuts
+    def add_fm_metadata(self, fm_df):
+        sql_tables = {}
+        for row in fm_df.itertuples(index=False):
+            subject = f"fm:{row.namespace}.{row.table}"
+            if _is_missing(row.columnName):
+                # Shortcut rows: the expression holds the refobj of the target
+                for ref in cognos_refs(row.expression):
+                    target = 'fm:' + '.'.join(ref)
+                    self.shortcuts[subject] = target
+                    self.add_edge(target, subject)
+                continue
+
+            item = f"{subject}.{row.columnName}"
+            self.add_edge(item, subject)
+            if not _is_missing(row.sqlQuery):
+                if row.sqlQuery not in sql_tables:
+                    sql_tables[row.sqlQuery] = extract_tables(row.sqlQuery)
+                for table in sql_tables[row.sqlQuery]:
+                    self.add_edge(db_node(table), item)
+            for ref in cognos_refs(row.expression):
+                self.add_edge('fm:' + '.'.join(ref), item)
+        return self
+
+    # FM item a report reference resolves to, following shortcuts (None when it is not a shortcut)
+    def _resolve_shortcut(self, ref):
+        subject, resolved = 'fm:' + '.'.join(ref[:2]), None
+        for _ in range(10):
+            if subject not in self.shortcuts:
+                break
+            subject = self.shortcuts[subject]
+            resolved = f"{subject}.{'.'.join(ref[2:])}"
+        return resolved
+
+    # Report extractor output: data item expressions -> FM items (the Source column when no item is referenced)
+    def add_report_metadata(self, report_df):
+        sources = report_df['Source'] if 'Source' in report_df.columns else [None] * len(report_df)
+        for report_name, query_name, column_name, expression, source in zip(
+                report_df['Report Name'], report_df['Query Name'], report_df['Column Name'], report_df['Expression'],
+                sources):
+            report = f"rpt:{report_name}"
+            item = f"{report}.{query_name}.{column_name}"
+            self.add_edge(item, report)
+
+            refs = [ref for ref in cognos_refs(expression) if len(ref) >= 3]
+            for ref in refs:
+                fm_item = 'fm:' + '.'.join(ref)
+                self.add_edge(fm_item, item)
+                resolved = self._resolve_shortcut(ref)
+                if resolved:
+                    self.add_edge(resolved, fm_item)
+            if not refs and not _is_missing(source):
+                self.add_edge(f"fm:{source}", item)
+        return self
+
+    # VPAX extractor summary: db table -> PBI table (model = VPAX file name without extension)
+    def add_vpax_summary(self, vpax_df):
+        for row in vpax_df.itertuples(index=False):
+            model = re.sub(r'\.vpax$', '', str(row.vpax_file_name), flags=re.IGNORECASE)
+            self.add_edge(db_node(str(row.source_table)), f"pbi:{model}.{row.table_name}")
+        return self
+
+    # ---------- Queries ----------
+
+    def _walk(self, starts, csr):
+        offsets, targets = csr
+        seen = set(starts)
+        stack = list(starts)
+        while stack:
+            node = stack.pop()
+            for next_node in targets[offsets[node]:offsets[node + 1]].tolist():
+                if next_node not in seen:
+                    seen.add(next_node)
+                    stack.append(next_node)
+        return seen.difference(starts)
+
+    def _select(self, nodes, prefix):
+        names = (self.names[node] for node in nodes)
+        return sorted(name for name in names if prefix is None or name.startswith(prefix))
+
+    def _start_ids(self, name):
+        if name not in self.ids:
+            raise KeyError(f"Unknown lineage node: {name}")
+        return [self.ids[name]]
+
+    # Everything that depends on name (optionally only nodes whose name starts with prefix)
+    def downstream(self, name, prefix=None):
+        return self._select(self._walk(self._start_ids(name), self.forward), prefix)
+
+    # Everything name depends on
+    def upstream(self, name, prefix=None):
+        return self._select(self._walk(self._start_ids(name), self.reverse), prefix)
+
+    # PBI tables built on the same database tables as an FM query subject / item or a report
+    def related_pbi_tables(self, name):
+        db_tables = [self.ids[table] for table in self.upstream(name, 'db:')]
+        if name.startswith('db:'):
+            db_tables.append(self.ids[name])
+        return self._select(self._walk(db_tables, self.forward), 'pbi:')
+
+    # ---------- Persistence ----------
+
+    # Binary file: magic, node/edge counts and name blob size, then the NUL-separated UTF-8 names and the
+    # uint32 forward offsets, forward targets, reverse offsets and reverse targets
+    def save(self, path):
+        if self._sources:
+            self.freeze()
+        blob = '\0'.join(self.names).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(FILE_MAGIC)
+            f.write(_HEADER.pack(len(self.names), self.edge_count, len(blob)))
+            f.write(blob)
+            for array in (*self.forward, *self.reverse):
+                f.write(array.astype('<u4').tobytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(FILE_MAGIC):
+            raise ValueError(f"{path} is not a lineage graph file")
+        position = len(FILE_MAGIC)
+        node_count, edge_count, blob_size = _HEADER.unpack_from(data, position)
+        position += _HEADER.size
+        names = data[position:position + blob_size].decode('utf-8').split('\0') if node_count else []
+        position += blob_size
+
+        arrays = []
+        for size in (node_count + 1, edge_count, node_count + 1, edge_count):
+            arrays.append(np.frombuffer(data, dtype='<u4', count=size, offset=position))
+            position += size * 4
+        return cls(names, (arrays[0], arrays[1]), (arrays[2], arrays[3]))
+
+def build_graph(fm_path=None, report_path=None, vpax_path=None):
+    graph = LineageGraph()
+    if fm_path:
+        graph.add_fm_metadata(pd.read_csv(fm_path, dtype=str, keep_default_na=False))
+    if report_path:
+        graph.add_report_metadata(pd.read_csv(report_path, dtype=str, keep_default_na=False))
+    if vpax_path:
+        read = pd.read_csv if vpax_path.lower().endswith('.csv') else pd.read_excel
+        graph.add_vpax_summary(read(vpax_path, dtype=str))
+    return graph.freeze()
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the Cognos to Power BI lineage graph")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Build the graph from the extractor outputs")
+    build.add_argument('--fm', help="FM extractor CSV (final_backend_data.csv)")
+    build.add_argument('--report', help="Report extractor CSV (final_report_data.csv)")
+    build.add_argument('--vpax', help="VPAX extractor summary (xlsx or csv)")
+    build.add_argument('--output', default='lineage.graph')
+
+    query = commands.add_parser('query', help="Reachability query on a saved graph")
+    query.add_argument('graph')
+    query.add_argument('node', help='Node name, e.g. "fm:Business Layer.Brand" or "db:material"')
+    query.add_argument('--upstream', action='store_true', help="List what the node depends on instead")
+    query.add_argument('--prefix', help="Only list nodes with this prefix (fm:, rpt:, db:, pbi:)")
+    query.add_argument('--pbi', action='store_true', help="PBI tables built on the same database tables")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == 'build':
+        graph = build_graph(args.fm, args.report, args.vpax)
+        graph.save(args.output)
+        print(f"{len(graph.names)} nodes, {graph.edge_count} edges saved to {args.output} "
+              f"in {time.perf_counter() - start:.2f}s")
+        return
+
+    graph = LineageGraph.load(args.graph)
+    print(f"Loaded {len(graph.names)} nodes, {graph.edge_count} edges in {time.perf_counter() - start:.2f}s")
+    if args.pbi:
+        result = graph.related_pbi_tables(args.node)
+    elif args.upstream:
+        result = graph.upstream(args.node, args.prefix)
+    else:
+        result = graph.downstream(args.node, args.prefix)
+    print('\n'.join(result) if result else "No lineage found")
+
+if __name__ == "__main__":
+    main()
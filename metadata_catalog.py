@@ -0,0 +1,221 @@
+# Shared SQLite catalog of the accelerator outputs, for querying the whole migration estate in one place
+# The FM extractor, report metadata extractor, effort estimator, hierarchy builder and VPAX extractor can save their
+# results here (a "Save to metadata catalog" button in the apps, --catalog for the VPAX extractor). Re-saving the
+# same package / report / VPAX file replaces its rows, so the catalog always holds the latest extraction.
+# The database runs in WAL mode (readers don't block a writer), rows are inserted with executemany in one
+# transaction per save, and report, package, query subject, column and source table lookups are indexed.
+# Usage: python metadata_catalog.py summary [--catalog migration_catalog.db]
+#        python metadata_catalog.py query "select * from report_fm_items where report = 'Sales'" [--output out.csv]
+
+import argparse
+import json
+import re
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+DEFAULT_CATALOG = 'migration_catalog.db'
+
+# Catalog table -> columns (catalog column: tool output column), the key whose rows a save replaces, and indexes
+TABLES = {
+    'fm_query_items': {
+        'columns': {'package': None, 'namespace': 'namespace', 'query_subject': 'table', 'column_name': 'columnName',
+                    'external_column_name': 'externalColumnName', 'column_description': 'columnDescription',
+                    'data_type': 'dataType', 'expression': 'expression', 'aggregate': 'aggregate',
+                    'sql_query': 'sqlQuery'},
+        'key': 'package',
+        'indexes': [['package'], ['namespace', 'query_subject', 'column_name'], ['query_subject'], ['column_name']],
+    },
+    'report_columns': {
+        'columns': {'report': 'Report Name', 'page': 'Report Page Name', 'query': 'Query Name',
+                    'column_name': 'Column Name', 'expression': 'Expression', 'rollup_aggregate': 'Rollup Aggregate',
+                    'aggregate': 'Aggregate', 'used_in_page': 'Used in Report Page', 'source': 'Source',
+                    'source_namespace': None, 'source_query_subject': None, 'source_item': None},
+        'key': 'report',
+        'indexes': [['report'], ['column_name'], ['source_namespace', 'source_query_subject', 'source_item']],
+    },
+    'report_data_items': {
+        'columns': {'report': 'Report Name', 'package': 'Package Name', 'page': 'Page Name', 'query': 'Query Name',
+                    'data_item': 'Query Item Name', 'expression': 'Query Expression'},
+        'key': 'report',
+        'indexes': [['report'], ['package'], ['data_item']],
+    },
+    'report_efforts': {
+        'columns': {'report': 'Report Name', 'package': 'Package Name', 'total_pages': 'Total Pages',
+                    'distinct_data_items': 'Distinct Data Items', 'level_of_effort': 'Level of Effort',
+                    'effort_hours': 'Effort in Hours'},
+        'key': 'report',
+        'indexes': [['report'], ['package']],
+    },
+    'report_inventory': {
+        'columns': {'report': 'reportName', 'original_path': 'originalPath', 'levels': None,
+                    'report_group_id': 'reportGroupId', 'region': 'Region',
+                    'flag_for_decommission': 'Flag for Decommission',
+                    'reason_for_flag': 'reasonForFlagOfDecommission', 'business_unit': 'Business Unit'},
+        'key': None,
+        'indexes': [['report'], ['business_unit'], ['region']],
+    },
+    'vpax_source_tables': {
+        'columns': {'vpax_file': 'vpax_file_name', 'table_name': 'table_name', 'partition_name': 'partition_name',
+                    'source_table': 'source_table', 'source_table_name': None},
+        'key': 'vpax_file',
+        'indexes': [['vpax_file'], ['table_name'], ['source_table_name']],
+    },
+}
+
+# Cross-tool views
+VIEWS = {
+    # Report data items with the FM query items they reference
+    'report_fm_items': """
+        SELECT r.report, r.page, r.query, r.column_name, r.expression, f.package, f.namespace, f.query_subject,
+               f.column_name AS fm_column_name, f.data_type, f.sql_query
+        FROM report_columns r
+        JOIN fm_query_items f ON f.namespace = r.source_namespace AND f.query_subject = r.source_query_subject
+                             AND f.column_name = r.source_item""",
+    # Effort per package
+    'package_efforts': """
+        SELECT package, COUNT(*) AS reports, SUM(total_pages) AS pages, SUM(effort_hours) AS effort_hours
+        FROM report_efforts GROUP BY package""",
+}
+
+_COGNOS_REF = re.compile(r'\[([^\]]+)\]\.\[([^\]]+)\]\.\[([^\]]+)\]')
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+class MetadataCatalog:
+    def __init__(self, path=DEFAULT_CATALOG):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self._create_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def _create_schema(self):
+        with self.connection:
+            for table, spec in TABLES.items():
+                columns = ', '.join(f'"{column}"' for column in spec['columns'])
+                self.connection.execute(f'CREATE TABLE IF NOT EXISTS {table} ({columns}, loaded_at TEXT)')
+                for index_columns in spec['indexes']:
+                    name = f"ix_{table}_{'_'.join(index_columns)}"
+                    self.connection.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+                                            f'({", ".join(index_columns)})')
+            for view, sql in VIEWS.items():
+                self.connection.execute(f'CREATE VIEW IF NOT EXISTS {view} AS {sql}')
+
+    # Replace the rows of a catalog table: with keys, the rows of those key values; otherwise all rows.
+    # df holds the catalog columns (missing columns and values are stored as NULL). Returns the number of rows inserted.
+    def replace(self, table, df, keys=None):
+        spec = TABLES[table]
+        columns = list(spec['columns'])
+        values = df.reindex(columns=columns).astype(object)
+        values = values.where(values.notna(), None)
+        loaded_at = _now()
+        rows = [row + (loaded_at,) for row in values.itertuples(index=False, name=None)]
+        placeholders = ', '.join('?' * (len(columns) + 1))
+        with self.connection:
+            if keys is None:
+                self.connection.execute(f'DELETE FROM {table}')
+            else:
+                self.connection.executemany(f'DELETE FROM {table} WHERE {spec["key"]} = ?',
+                                            [(str(key),) for key in set(keys)])
+            self.connection.executemany(f'INSERT INTO {table} ({", ".join(columns)}, loaded_at) '
+                                        f'VALUES ({placeholders})', rows)
+        return len(rows)
+
+    def query(self, sql, params=None):
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def summary(self):
+        rows = [(table, self.connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]) for table in TABLES]
+        return pd.DataFrame(rows, columns=['table', 'rows'])
+
+# Tool output renamed to the catalog columns of table
+def _catalog_frame(df, table):
+    mapping = {source: column for column, source in TABLES[table]['columns'].items() if source in df.columns}
+    return df[list(mapping)].rename(columns=mapping)
+
+# ---------- Writers used by the accelerators ----------
+
+# FM extractor output (final_backend_data.csv) of one FM package; package names the project (such as the model
+# root name), not the exported file, which is model.xml for every project
+def save_fm_metadata(final_df, package, path=DEFAULT_CATALOG):
+    frame = _catalog_frame(final_df, 'fm_query_items').assign(package=package)
+    with MetadataCatalog(path) as catalog:
+        return catalog.replace('fm_query_items', frame, [package])
+
+# Report metadata extractor output (final_report_data.csv); the FM item each expression references is split out
+# so report columns can be joined to the FM query items
+def save_report_metadata(final_columns_df, path=DEFAULT_CATALOG):
+    frame = _catalog_frame(final_columns_df, 'report_columns')
+    refs = final_columns_df['Expression'].fillna('').astype(str).str.extract(_COGNOS_REF)
+    frame = frame.assign(source_namespace=refs[0], source_query_subject=refs[1], source_item=refs[2])
+    with MetadataCatalog(path) as catalog:
+        return catalog.replace('report_columns', frame, frame['report'].dropna().unique())
+
+# Effort estimator outputs: the data items and the per-report summary
+def save_effort_estimates(combined_df, summary_df, path=DEFAULT_CATALOG):
+    items = _catalog_frame(combined_df, 'report_data_items')
+    efforts = _catalog_frame(summary_df, 'report_efforts')
+    reports = set(items['report'].dropna()) | set(efforts['report'].dropna())
+    with MetadataCatalog(path) as catalog:
+        return catalog.replace('report_data_items', items, reports) + catalog.replace('report_efforts', efforts,
+                                                                                       reports)
+
+# Hierarchy builder output: the whole Cognos inventory (a new save replaces the previous inventory); the folder
+# levels (level1, level2, ...) are kept as one JSON list
+def save_report_inventory(extracted_df, path=DEFAULT_CATALOG):
+    level_columns = sorted((col for col in extracted_df.columns if re.fullmatch(r'level\d+', str(col))),
+                           key=lambda col: int(col[5:]))
+    levels = [json.dumps([value for value in row if isinstance(value, str) and value])
+              for row in extracted_df[level_columns].itertuples(index=False, name=None)]
+    frame = _catalog_frame(extracted_df, 'report_inventory').assign(levels=levels)
+    with MetadataCatalog(path) as catalog:
+        return catalog.replace('report_inventory', frame)
+
+# VPAX extractor rows; with vpax_files, only the rows of those files are replaced (incremental runs), otherwise all
+def save_vpax_source_tables(df, vpax_files=None, path=DEFAULT_CATALOG):
+    frame = _catalog_frame(df, 'vpax_source_tables')
+    frame = frame.assign(source_table_name=frame['source_table'].astype(str).str.split('.').str[-1].str.lower())
+    with MetadataCatalog(path) as catalog:
+        return catalog.replace('vpax_source_tables', frame, vpax_files)
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the migration metadata catalog")
+    # --catalog follows the command (summary --catalog x.db)
+    catalog_option = argparse.ArgumentParser(add_help=False)
+    catalog_option.add_argument('--catalog', default=DEFAULT_CATALOG)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('summary', parents=[catalog_option], help="Rows per catalog table")
+    query = commands.add_parser('query', parents=[catalog_option], help="Run a SQL query on the catalog")
+    query.add_argument('sql')
+    query.add_argument('--output', help="Save the result as CSV")
+    args = parser.parse_args()
+
+    with MetadataCatalog(args.catalog) as catalog:
+        if args.command == 'summary':
+            print(catalog.summary().to_string(index=False))
+            return
+        start = time.perf_counter()
+        result = catalog.query(args.sql)
+        elapsed = time.perf_counter() - start
+    if args.output:
+        result.to_csv(args.output, index=False)
+        print(f"{len(result)} rows saved to: {args.output} in {elapsed:.3f}s")
+    else:
+        print(result.to_string(index=False))
+        print(f"\n{len(result)} rows in {elapsed:.3f}s")
+
+if __name__ == "__main__":
+    main()
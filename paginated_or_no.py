@@ -1,49 +1,142 @@
 #Expects Input in following csv Name|Type|Location|JobName|ReportName|Recipient|SearchPath
 import streamlit as st
 import pandas as pd
-import re
-
-# Streamlit app title
-st.title("JobName and ReportName Extractor with Granular Report")
-
-# File uploader for CSV
-uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
-
-if uploaded_file is not None:
-    # Read the CSV file into a DataFrame
-    df = pd.read_csv(uploaded_file)
-    
-    # Add JobName and ReportName columns
-    df['JobName'] = df['Location'].apply(lambda x: x.split('>>')[-1].strip() if isinstance(x, str) and '>>' in x else '')
-    df['ReportName'] = df.apply(lambda row: row['Name'] if row['Type'] == 'Schedule' 
-                                else row['Name'].split('-')[-1] if row['Type'] == 'JobStepDefinition' 
-                                else '', axis=1)
-    
-    # Trim spaces from ReportName column
-    df['ReportName'] = df['ReportName'].str.strip()
+import numpy as np
+
+# Internal e-mail domains (subdomains included); several tenants can be configured in the app
+DEFAULT_INTERNAL_DOMAINS = ['goodyear.com']
+
+# Recipient e-mail addresses: local part (may be empty) and domain
+EMAIL_PATTERN = r'([^\s,;:<>()"@]*)@([\w.-]+)'
+
+# Classifies e-mail domains as internal or external with a trie of reversed domain labels:
+# "goodyear.com" matches goodyear.com and every subdomain (eu.goodyear.com), "*.goodyear.com" only the subdomains.
+# Lookups walk at most one node per label, however many domains are configured.
+class DomainClassifier:
+    _END = object()
+
+    def __init__(self, internal_domains):
+        self.trie = {}
+        for domain in internal_domains:
+            domain = domain.strip().lower().rstrip('.')
+            if not domain:
+                continue
+            subdomains_only = domain.startswith('*.')
+            node = self.trie
+            for label in reversed(domain[2:].split('.') if subdomains_only else domain.split('.')):
+                node = node.setdefault(label, {})
+            node[self._END] = node.get(self._END, False) or not subdomains_only
+
+    def is_internal(self, domain):
+        node = self.trie
+        labels = domain.lower().rstrip('.').split('.')
+        for depth, label in enumerate(reversed(labels)):
+            node = node.get(label)
+            if node is None:
+                return False
+            if self._END in node and (node[self._END] or depth < len(labels) - 1):
+                return True
+        return False
+
+    # Bulk classification: one trie lookup per distinct domain
+    def classify(self, domains):
+        codes, uniques = pd.factorize(domains)
+        internal = np.array([self.is_internal(domain) for domain in uniques], dtype=bool)
+        return np.append(internal, False)[codes]
+
+# Last part of each text after separator (stripped), computed once per distinct value.
+# Texts without the separator give their whole value, or empty_value when given; missing values give empty_value.
+def _last_part(values, separator, empty_value=np.nan, require_separator=False):
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype=object)
+    parts = uniques.str.split(separator, regex=False).str[-1].str.strip()
+    if require_separator:
+        parts = parts.where(uniques.str.contains(separator, regex=False), empty_value)
+    parts = np.append(parts.to_numpy(dtype=object), empty_value)
+    return parts[codes]
+
+# Add JobName (last part of Location after '>>') and ReportName (Schedule: Name,
+# JobStepDefinition: last part of Name after '-') columns
+def add_job_and_report_names(df):
+    location = df['Location'].where(df['Location'].map(lambda x: isinstance(x, str)), '')
+    df['JobName'] = _last_part(location, '>>', empty_value='', require_separator=True)
+    df['ReportName'] = np.select([df['Type'] == 'Schedule', df['Type'] == 'JobStepDefinition'],
+                                 [df['Name'].str.strip(), _last_part(df['Name'], '-')], default='')
 
     # Ensure all recipients are strings to avoid TypeError during concatenation
     df['Recipient'] = df['Recipient'].astype(str)
-
-    # Step 1: Create the 'Report Name' column with distinct values from 'ReportName'
-    distinct_reports = df['ReportName'].unique()
-
-    # Step 2: Aggregate Recipients for each report and Type
-    grouped = df.groupby(['ReportName', 'Type'])['Recipient'].apply(lambda x: ','.join(x.unique())).reset_index()
-
-    # Step 3: Pivot the grouped DataFrame to have separate columns for each Type
-    pivot = grouped.pivot(index='ReportName', columns='Type', values='Recipient').reset_index()
-
-    # Step 4: Create the 'JOBs' column
-    job_map = df[df['JobName'] != ''].groupby('ReportName')['JobName'].apply(lambda x: ','.join(x.unique())).to_dict()
-    pivot['JOBs'] = pivot['ReportName'].map(job_map)
-
-    # Step 5: Populate 'JobDefinition Recipients2' using the job names
-    pivot['JobDefinition Recipients2'] = pivot['JOBs'].apply(lambda x: ','.join(df[df['Name'].isin(x.split(','))]['Recipient'].unique()) if isinstance(x, str) else '')
-
-    # Step 6: Add 'SearchPath' (assuming it is the first non-null SearchPath for each ReportName)
-    search_path_map = df.groupby('ReportName')['SearchPath'].first().to_dict()
-    pivot['SearchPath'] = pivot['ReportName'].map(search_path_map)
+    return df
+
+# Distinct values of column per key, joined with ',' in order of first appearance (rows with a missing key dropped).
+# Keys are factorized to sorted integer codes, so de-duplication and grouping sort integers instead of strings,
+# and each group is joined from one slice instead of a Python call per group.
+def _join_unique(df, keys, column):
+    df = df.dropna(subset=keys)
+    group_codes = np.zeros(len(df), dtype=np.int64)
+    key_uniques = []
+    for key in keys:
+        codes, uniques = pd.factorize(df[key], sort=True)
+        group_codes = group_codes * len(uniques) + codes
+        key_uniques.append((codes, uniques))
+    value_codes, value_uniques = pd.factorize(df[column])
+
+    first = ~pd.Series(group_codes * (len(value_uniques) + 1) + value_codes).duplicated().to_numpy()
+    rows = np.flatnonzero(first)
+    rows = rows[np.argsort(group_codes[rows], kind='stable')]
+    starts = np.flatnonzero(np.diff(group_codes[rows], prepend=-1)).tolist()
+
+    values = value_uniques.take(value_codes[rows]).tolist()
+    joined = [','.join(values[start:end]) for start, end in zip(starts, starts[1:] + [len(values)])]
+    group_rows = rows[starts]
+    levels = [uniques.take(codes[group_rows]) for codes, uniques in key_uniques]
+    index = pd.MultiIndex.from_arrays(levels, names=keys) if len(keys) > 1 else pd.Index(levels[0], name=keys[0])
+    return pd.Series(joined, index=index, name=column, dtype=object)
+
+# Distinct (ReportName, Recipient) of the job definitions of each report: the report/job pairs are merged with the
+# distinct recipients of the rows named after the jobs (each kept at its first row), in the order they appear in the
+# export. De-duplicating before the merge keeps it from pairing every report with every repeated job row.
+def job_definition_recipients(df):
+    pairs = df.loc[df['JobName'] != '', ['ReportName', 'JobName']].dropna().drop_duplicates()
+    pairs = pairs.assign(Name=pairs['JobName'].str.split(',')).explode('Name')[['ReportName', 'Name']].drop_duplicates()
+    named_rows = df[['Name', 'Recipient']].reset_index(drop=True).reset_index(names='position')
+    named_rows = named_rows[named_rows['Name'].isin(pairs['Name'])].drop_duplicates(['Name', 'Recipient'])
+    matches = pairs.merge(named_rows, on='Name').sort_values('position', kind='stable')
+    return matches[['ReportName', 'Recipient']].drop_duplicates()
+
+# One row per distinct (ReportName, address) from the (ReportName, Recipient) pairs, with an 'internal' flag.
+# Each distinct recipient text is parsed once with str.extractall (a text can hold several addresses).
+def explode_recipient_addresses(report_recipients, classifier):
+    report_recipients = report_recipients.drop_duplicates()
+    texts = pd.Series(report_recipients['Recipient'].unique(), dtype=object, name='Recipient')
+    addresses = texts.str.extractall(EMAIL_PATTERN).reset_index(level='match', drop=True)
+    addresses.columns = ['local', 'domain']
+    addresses['address'] = (addresses['local'] + '@' + addresses['domain']).str.lower()
+    addresses['internal'] = classifier.classify(addresses['domain'].str.lower())
+    addresses = addresses.join(texts)[['Recipient', 'address', 'internal']]
+    exploded = report_recipients.merge(addresses, on='Recipient')
+    return exploded.drop_duplicates(['ReportName', 'address'])[['ReportName', 'address', 'internal']]
+
+# Per report: distinct internal and external recipient addresses
+def recipient_counts(addresses):
+    counts = addresses.groupby(['ReportName', 'internal']).size().unstack('internal', fill_value=0)
+    return pd.DataFrame({'internal recipients': counts.get(True, 0), 'external recipients': counts.get(False, 0)},
+                        index=counts.index)
+
+def build_granular_report(df, internal_domains=DEFAULT_INTERNAL_DOMAINS):
+    df = add_job_and_report_names(df)
+
+    # Aggregate Recipients for each report and Type, with separate columns for each Type
+    pivot = _join_unique(df, ['ReportName', 'Type'], 'Recipient').unstack('Type')
+
+    # 'JOBs' column and the recipients of those job definitions
+    pivot['JOBs'] = _join_unique(df[df['JobName'] != ''], ['ReportName'], 'JobName')
+    job_recipients = job_definition_recipients(df)
+    pivot['JobDefinition Recipients2'] = _join_unique(job_recipients, ['ReportName'], 'Recipient')
+    pivot['JobDefinition Recipients2'] = pivot['JobDefinition Recipients2'].where(pivot['JOBs'].notna(), '').fillna('')
+
+    # Add 'SearchPath' (the first non-null SearchPath for each ReportName)
+    pivot['SearchPath'] = df.groupby('ReportName')['SearchPath'].first()
+    pivot = pivot.reset_index()
 
     # Rename the columns to match the desired output
     pivot = pivot.rename(columns={
@@ -52,6 +145,9 @@ if uploaded_file is not None:
         'JobStepDefinition': 'JobStepDefinition Recipients',
         'JobDefinition': 'JobDefinition Recipients'
     })
+    for col in ['Schedule Recipients', 'JobStepDefinition Recipients']:
+        if col not in pivot.columns:
+            pivot[col] = np.nan
 
     # Remove rows where 'Report Name' is null or empty
     pivot = pivot[pivot['Report Name'].notna() & (pivot['Report Name'] != '')]
@@ -64,33 +160,65 @@ if uploaded_file is not None:
     # Remove any leading or trailing commas that might occur from empty values
     pivot['all recipients'] = pivot['all recipients'].str.strip(',')
 
-    # Add the 'paginated flag' column based on email domain logic
-    def check_paginated_flag(recipients):
-        # Regex to extract all email domains
-        email_domains = re.findall(r'@([\w.-]+)', recipients)
-        # Check if any domain is not 'goodyear.com'
-        for domain in email_domains:
-            if domain.lower() != 'goodyear.com':
-                return 'yes'
-        return 'no'
-
-    pivot['paginated flag'] = pivot['all recipients'].apply(check_paginated_flag)
-
-    # Display the final granular DataFrame
-    st.write("Granular Report DataFrame:")
-    
+    # Add the 'paginated flag' column based on email domain logic: the recipients of each report
+    # (its schedule and job step rows plus its job definitions' recipients), exploded once
+    report_recipients = pd.concat([df.loc[df['ReportName'].notna() & (df['ReportName'] != ''), ['ReportName', 'Recipient']],
+                                   job_recipients], ignore_index=True)
+    addresses = explode_recipient_addresses(report_recipients, DomainClassifier(internal_domains))
+    counts = recipient_counts(addresses).reindex(pivot['Report Name'], fill_value=0)
+    pivot['internal recipients'] = counts['internal recipients'].to_numpy()
+    pivot['external recipients'] = counts['external recipients'].to_numpy()
+    pivot['paginated flag'] = np.where(pivot['external recipients'] > 0, 'yes', 'no')
 
     #df cleaning
     pivot = pivot[~pivot['SearchPath'].str.contains('CAMID', na=True) & pivot['SearchPath'].notna()]
-
-    st.dataframe(pivot)
-
-    # Option to download the granular DataFrame as a CSV
-    st.download_button(
-        label="Download Granular Report Data",
-        data=pivot.to_csv(index=False).encode('utf-8'),
-        file_name='granular_report_data.csv',
-        mime='text/csv'
-    )
-else:
-    st.write("Please upload a CSV file.")
+    return pivot
+
+def main():
+    # Streamlit app title
+    st.title("JobName and ReportName Extractor with Granular Report")
+
+    # File uploader for CSV
+    uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
+
+    if uploaded_file is not None:
+        # Internal domains, e.g. one per tenant; recipients of any other domain make a report paginated
+        domains = st.text_input("Internal e-mail domains (comma separated, subdomains included)",
+                                value=', '.join(DEFAULT_INTERNAL_DOMAINS))
+        internal_domains = [domain for domain in domains.split(',') if domain.strip()]
+
+        # Read the CSV file into a DataFrame
+        df = pd.read_csv(uploaded_file)
+        pivot = build_granular_report(df, internal_domains)
+
+        # Display the final granular DataFrame
+        st.write("Granular Report DataFrame:")
+        st.dataframe(pivot)
+
+        # Option to download the granular DataFrame as a CSV
+        st.download_button(
+            label="Download Granular Report Data",
+            data=pivot.to_csv(index=False).encode('utf-8'),
+            file_name='granular_report_data.csv',
+            mime='text/csv'
+        )
+
+        # Schedule/job graph (imported here: schedule_graph builds on this module's helpers)
+        from schedule_graph import ScheduleGraph
+        graph = ScheduleGraph.from_export(df)
+        st.write("Schedule and Job Fan-out:")
+        st.write(graph.summary())
+        kind = st.radio("Fan-out per", ['schedule', 'job'], horizontal=True)
+        st.dataframe(graph.fan_out(kind))
+
+        jobs = graph.nodes('job')
+        if jobs:
+            job = st.selectbox("Reports and recipients of a job", [node.split(':', 1)[1] for node in jobs])
+            col1, col2 = st.columns(2)
+            col1.dataframe(pd.DataFrame({'Report': graph.reports_for_job(job)}))
+            col2.dataframe(pd.DataFrame({'Recipient': graph.recipients_reached(f"job:{job}")}))
+    else:
+        st.write("Please upload a CSV file.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+# Inventory of every Power BI workspace with its reports and datasets, from the Power BI REST API
+# Python replacement for powershell-migration.ps1: same kind of CSV, but all workspaces are fetched concurrently over a
+# pooled connection, with paging ($top/$skip, @odata.nextLink or continuationUri) and retries on throttling (429)
+# and server errors (5xx).
+# Access token: --token or the PBI_ACCESS_TOKEN environment variable, e.g.
+#   az account get-access-token --resource https://analysis.windows.net/powerbi/api --query accessToken -o tsv
+# Usage: python pbi_rest_inventory.py --output PBI_Metadata.csv [--admin] [--mirror pbi_mirror]
+#        python pbi_rest_inventory.py --stub --stub-workspaces 500   (runs against a local stub of the API, no tenant needed)
+# With --mirror the raw responses are also saved as {"value": [...]} JSON files, which PBI-links-extractor.py reads.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+import aiohttp
+import pandas as pd
+
+API_ROOT = "https://api.powerbi.com/v1.0/myorg"
+
+INVENTORY_COLUMNS = ['Workspace_Name', 'Workspace_ID', 'Dataset_ID', 'Dataset_Name', 'Report_Name', 'Report_ID',
+                     'Storage_Mode', 'webUrl']
+
+CONCURRENCY = 16
+WORKSPACE_PAGE_SIZE = 5000
+MAX_RETRIES = 6
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+REQUEST_TIMEOUT_SECONDS = 120
+
+class PowerBIApiError(Exception):
+    def __init__(self, status, url, message):
+        super().__init__(f"HTTP {status} for {url}: {message}")
+        self.status = status
+
+# Async Power BI REST client. One aiohttp session (connection pool) is shared by all requests and a semaphore
+# bounds the requests in flight; retries wait outside the semaphore so a throttled call doesn't hold a slot.
+class PowerBIClient:
+    def __init__(self, token, api_root=API_ROOT, concurrency=CONCURRENCY, max_retries=MAX_RETRIES,
+                 backoff_seconds=BACKOFF_SECONDS):
+        self.api_root = api_root.rstrip('/')
+        self.headers = {'Authorization': f"Bearer {token}"} if token else {}
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.requests = self.retries = 0
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+        self._session = aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                              timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS))
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._session.close()
+
+    def _url(self, path):
+        return path if path.startswith('http') else f"{self.api_root}/{path.lstrip('/')}"
+
+    # Seconds to wait before retry number attempt: Retry-After when the service sends it, otherwise
+    # exponential backoff with jitter
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), MAX_BACKOFF_SECONDS)
+            except ValueError:
+                pass
+        delay = min(self.backoff_seconds * 2 ** attempt, MAX_BACKOFF_SECONDS)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def get_json(self, path, params=None):
+        url = self._url(path)
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    self.requests += 1
+                    async with self._session.get(url, params=params) as response:
+                        if response.status == 200:
+                            return await response.json(content_type=None)
+                        message = (await response.text())[:200]
+                        if response.status != 429 and response.status < 500:
+                            raise PowerBIApiError(response.status, url, message)
+                        retry_after = response.headers.get('Retry-After')
+                        error = PowerBIApiError(response.status, url, message)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            if attempt == self.max_retries:
+                raise error
+            self.retries += 1
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+    # Items of a listing endpoint, page by page. Follows @odata.nextLink / continuationUri when the response has one,
+    # otherwise pages with $top/$skip when page_size is given (for endpoints such as groups and admin/groups).
+    async def iter_pages(self, path, params=None, page_size=None):
+        url, params, skip = path, dict(params or {}), 0
+        while True:
+            if page_size:
+                params.update({'$top': page_size, '$skip': skip})
+            data = await self.get_json(url, params)
+            items = data.get('value', data.get('activityEventEntities', []))
+            yield items
+
+            next_url = data.get('@odata.nextLink') or data.get('continuationUri')
+            if next_url and not data.get('lastResultSet', False):
+                # The link carries its own query string
+                url, params, page_size = next_url, None, None
+            elif page_size and len(items) == page_size:
+                skip += page_size
+            else:
+                return
+
+    async def list_all(self, path, params=None, page_size=None):
+        items = []
+        async for page in self.iter_pages(path, params, page_size):
+            items.extend(page)
+        return items
+
+# Inventory rows of one workspace: one row per dataset and one per report (with the dataset it is bound to)
+def workspace_rows(workspace, reports, datasets):
+    base = {'Workspace_Name': workspace.get('name'), 'Workspace_ID': workspace.get('id')}
+    dataset_names = {dataset.get('id'): dataset.get('name') for dataset in datasets}
+    rows = []
+    for dataset in datasets:
+        rows.append({**base, 'Dataset_ID': dataset.get('id'), 'Dataset_Name': dataset.get('name'),
+                     'Report_Name': 'N/A', 'Report_ID': 'N/A',
+                     'Storage_Mode': dataset.get('targetStorageMode', 'N/A'), 'webUrl': dataset.get('webUrl')})
+    for report in reports:
+        dataset_id = report.get('datasetId')
+        rows.append({**base, 'Dataset_ID': dataset_id or 'N/A', 'Dataset_Name': dataset_names.get(dataset_id, 'N/A'),
+                     'Report_Name': report.get('name'), 'Report_ID': report.get('id'),
+                     'Storage_Mode': 'N/A', 'webUrl': report.get('webUrl')})
+    return rows
+
+def _save_json(path, items):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'value': items}, f, indent=2)
+
+# Reports and datasets of every workspace. Workspaces are fetched page by page and the per-workspace
+# listings start as soon as their page arrives. With admin=True one paged admin/groups call with $expand returns
+# everything (needs a Fabric administrator token). Returns (rows, errors); a failing workspace doesn't stop the others.
+async def fetch_inventory(client, admin=False, mirror_dir=None, page_size=WORKSPACE_PAGE_SIZE):
+    rows, errors, workspaces = [], [], []
+
+    async def fetch_workspace(workspace):
+        try:
+            reports, datasets = await asyncio.gather(
+                client.list_all(f"groups/{workspace['id']}/reports"),
+                client.list_all(f"groups/{workspace['id']}/datasets"))
+        except (PowerBIApiError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            errors.append(f"{workspace.get('name')}: {e}")
+            return
+        rows.extend(workspace_rows(workspace, reports, datasets))
+        if mirror_dir:
+            _save_json(os.path.join(mirror_dir, workspace['id'], 'reports.json'), reports)
+            _save_json(os.path.join(mirror_dir, workspace['id'], 'datasets.json'), datasets)
+
+    if admin:
+        params = {'$expand': 'reports,datasets'}
+        async for page in client.iter_pages('admin/groups', params, page_size):
+            workspaces.extend(page)
+            for workspace in page:
+                rows.extend(workspace_rows(workspace, workspace.get('reports', []), workspace.get('datasets', [])))
+    else:
+        tasks = []
+        async for page in client.iter_pages('groups', page_size=page_size):
+            workspaces.extend(page)
+            tasks.extend(asyncio.create_task(fetch_workspace(workspace)) for workspace in page)
+        await asyncio.gather(*tasks)
+
+    if mirror_dir:
+        _save_json(os.path.join(mirror_dir, 'workspaces.json'), workspaces)
+    return rows, errors
+
+async def run_inventory(token, api_root=API_ROOT, concurrency=CONCURRENCY, admin=False, mirror_dir=None,
+                        page_size=WORKSPACE_PAGE_SIZE):
+    async with PowerBIClient(token, api_root, concurrency) as client:
+        rows, errors = await fetch_inventory(client, admin, mirror_dir, page_size)
+        return rows, errors, client
+
+def save_inventory(rows, output_path):
+    df = pd.DataFrame(rows, columns=INVENTORY_COLUMNS)
+    df = df.sort_values(['Workspace_Name', 'Report_ID', 'Dataset_ID'], ignore_index=True, kind='stable')
+    if output_path.lower().endswith('.parquet'):
+        df.to_parquet(output_path, index=False)
+    else:
+        df.to_csv(output_path, index=False)
+    return df
+
+# ---------- Local stub server ----------
+
+# Stand-in for the listing endpoints, for trying the inventory offline: workspaces honour $top/$skip, reports and
+# datasets are split in pages linked with @odata.nextLink, every response is delayed by latency seconds and a share
+# of them (failure_rate) fails with 429 or 503, so paging, concurrency and retries are all exercised.
+def stub_app(workspace_count=200, reports_per_workspace=40, datasets_per_workspace=10, page_size=25,
+             latency=0.02, failure_rate=0.05, seed=0):
+    from aiohttp import web
+
+    rng = random.Random(seed)
+    namespace = uuid.UUID(int=seed)
+    workspaces = [{'id': str(uuid.uuid5(namespace, f"workspace-{index}")), 'name': f"Workspace {index:04d}",
+                   'isReadOnly': False, 'isOnDedicatedCapacity': index % 3 == 0, 'type': 'Workspace'}
+                  for index in range(workspace_count)]
+    items = {}
+    for workspace in workspaces:
+        datasets = [{'id': str(uuid.uuid5(namespace, f"{workspace['id']}-dataset-{index}")),
+                     'name': f"Dataset {index:03d}",
+                     'targetStorageMode': rng.choice(['Abf', 'PremiumFiles']),
+                     'webUrl': f"https://app.powerbi.com/groups/{workspace['id']}/datasets/{index}"}
+                    for index in range(datasets_per_workspace)]
+        reports = []
+        for index in range(reports_per_workspace):
+            report_id = str(uuid.uuid5(namespace, f"{workspace['id']}-report-{index}"))
+            reports.append({'id': report_id, 'name': f"Report {index:03d}", 'reportType': 'PowerBIReport',
+                            'datasetId': rng.choice(datasets)['id'] if datasets else None,
+                            'webUrl': f"https://app.powerbi.com/groups/{workspace['id']}/reports/{report_id}"})
+        items[workspace['id']] = {'reports': reports, 'datasets': datasets}
+
+    async def respond(request, payload):
+        await asyncio.sleep(latency)
+        if rng.random() < failure_rate:
+            if rng.random() < 0.5:
+                return web.json_response({'error': {'code': 'TooManyRequests'}}, status=429,
+                                         headers={'Retry-After': '0'})
+            return web.json_response({'error': {'code': 'ServiceUnavailable'}}, status=503)
+        return web.json_response(payload)
+
+    def skip_top(request, values):
+        skip = int(request.query.get('$skip', 0))
+        top = int(request.query.get('$top', len(values)))
+        return values[skip:skip + top]
+
+    async def groups(request):
+        return await respond(request, {'value': skip_top(request, workspaces)})
+
+    async def admin_groups(request):
+        expand = request.query.get('$expand', '')
+        page = [{**workspace, **{key: value for key, value in items[workspace['id']].items() if key in expand}}
+                for workspace in skip_top(request, workspaces)]
+        return await respond(request, {'value': page})
+
+    async def group_items(request):
+        values = items.get(request.match_info['group'], {}).get(request.match_info['kind'])
+        if values is None:
+            return web.json_response({'error': {'code': 'ItemNotFound'}}, status=404)
+        start = int(request.query.get('continuationToken', 0))
+        payload = {'value': values[start:start + page_size]}
+        if start + page_size < len(values):
+            payload['@odata.nextLink'] = str(request.url.with_query({'continuationToken': start + page_size}))
+        return await respond(request, payload)
+
+    app = web.Application()
+    app.router.add_get('/v1.0/myorg/groups', groups)
+    app.router.add_get('/v1.0/myorg/admin/groups', admin_groups)
+    app.router.add_get('/v1.0/myorg/groups/{group}/{kind:reports|datasets}', group_items)
+    return app
+
+# Start the stub on a free local port and run the inventory against it
+async def run_stub_inventory(args):
+    from aiohttp import web
+
+    app = stub_app(args.stub_workspaces, failure_rate=args.stub_failure_rate)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    port = runner.addresses[0][1]
+    try:
+        return await run_inventory(None, f"http://127.0.0.1:{port}/v1.0/myorg", args.concurrency, args.admin,
+                                   args.mirror, args.page_size)
+    finally:
+        await runner.cleanup()
+
+def main():
+    parser = argparse.ArgumentParser(description="Inventory Power BI workspaces, reports and datasets")
+    parser.add_argument('--output', default='PBI_Metadata.csv', help="Output .csv or .parquet")
+    parser.add_argument('--token', default=os.environ.get('PBI_ACCESS_TOKEN'),
+                        help="Bearer token (default: PBI_ACCESS_TOKEN environment variable)")
+    parser.add_argument('--api-root', default=API_ROOT)
+    parser.add_argument('--admin', action='store_true', help="Use the admin API (all workspaces of the tenant)")
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY, help="Requests in flight")
+    parser.add_argument('--page-size', type=int, default=WORKSPACE_PAGE_SIZE, help="Workspaces per page ($top)")
+    parser.add_argument('--mirror', help="Folder to save the raw API responses in")
+    parser.add_argument('--stub', action='store_true', help="Run against a local stub of the API")
+    parser.add_argument('--stub-workspaces', type=int, default=200)
+    parser.add_argument('--stub-failure-rate', type=float, default=0.05)
+    args = parser.parse_args()
+
+    if not args.stub and not args.token:
+        parser.error("an access token is required: --token or PBI_ACCESS_TOKEN")
+
+    start = time.perf_counter()
+    if args.stub:
+        rows, errors, client = asyncio.run(run_stub_inventory(args))
+    else:
+        rows, errors, client = asyncio.run(run_inventory(args.token, args.api_root, args.concurrency, args.admin,
+                                                         args.mirror, args.page_size))
+    df = save_inventory(rows, args.output)
+
+    for error in errors:
+        print(f"Skipped workspace {error}")
+    print(f"{df['Workspace_ID'].nunique()} workspaces, {len(df)} rows saved to: {args.output}")
+    print(f"{client.requests} requests ({client.retries} retried) in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
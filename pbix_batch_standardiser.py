@@ -0,0 +1,192 @@
+# Headless batch mode for the PowerBI standardisation accelerator
+# Standardises every PBIX in a folder with a rules JSON, in parallel worker processes
+# Writes standardised copies, a change log per file and a run summary with timings to the output folder.
+# Files whose Layout hash is already known to be compliant with the same rules are skipped.
+# With --pbip the folder is searched for PBIP report folders (*.Report) instead, which are standardised in place:
+# only the visual files the rules change are rewritten; change logs and the summary go to the output folder.
+# Usage: python pbix_batch_standardiser.py <pbix folder> --output-dir standardised --rules standardisation_rules.json
+#        python pbix_batch_standardiser.py <pbip folder> --pbip --output-dir standardisation_logs
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from powerbi_standardisation_accelerator import RULE_SETS, StandardisationRules, apply_rules_to_pbir, rewrite_pbix
+
+# Layout hashes already compliant with a rules file, kept in the output folder between runs
+COMPLIANCE_CACHE = 'compliant_layouts.json'
+
+SUMMARY_COLUMNS = ['file', 'status', 'changes', 'layout_hash', 'seconds', 'output', 'error']
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+# Raw Report/Layout part (None when the file has no Layout)
+def _read_raw_layout(pbix_path):
+    with zipfile.ZipFile(pbix_path, 'r') as pbix:
+        if 'Report/Layout' not in pbix.namelist():
+            return None
+        return pbix.read('Report/Layout')
+
+# Write the PBIX with the standardised Layout; a partly written output is removed on error
+def _rewrite(pbix_path, output_path, layout_data):
+    try:
+        rewrite_pbix(pbix_path, output_path, layout_data=layout_data)
+    except Exception:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+
+def _load_cache(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_change_log(output_dir, name, changes):
+    log_path = os.path.join(output_dir, f"{name}_changes.csv")
+    with open(log_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['page', 'visual', 'rule', 'change'])
+        writer.writeheader()
+        writer.writerows(changes)
+
+# Standardise one PBIX. Runs in a worker process; the rules are compiled once per call from the spec.
+def standardise_file(pbix_path, output_dir, rules_spec, compliant_hashes):
+    file_name = os.path.basename(pbix_path)
+    summary = {'file': file_name}
+    start = time.perf_counter()
+    try:
+        raw_layout = _read_raw_layout(pbix_path)
+        source_hash = None if raw_layout is None else _sha256(raw_layout)
+        summary['layout_hash'] = source_hash
+        if source_hash is None:
+            summary.update({'status': 'ERROR', 'error': 'Report/Layout not found'})
+        elif source_hash in compliant_hashes:
+            summary.update({'status': 'SKIPPED (compliant)', 'changes': 0})
+        else:
+            rules = StandardisationRules(rules_spec)
+            # The Layout is decoded and standardised once: a compliant file is not rewritten at all, a changed one
+            # is rewritten with the standardised Layout
+            layout = json.loads(raw_layout.decode('utf-16 le'))
+            changes = rules.apply(layout)
+            if changes:
+                output_path = os.path.join(output_dir, file_name)
+                layout_data = json.dumps(layout).encode('utf-16 le')
+                _rewrite(pbix_path, output_path, layout_data)
+                _write_change_log(output_dir, os.path.splitext(file_name)[0], changes)
+                summary.update({'status': 'STANDARDISED', 'output': output_path})
+            else:
+                summary['status'] = 'COMPLIANT'
+
+            summary['changes'] = len(changes)
+            # The standardised Layout is compliant by construction, so re-runs over the outputs are skipped
+            summary['compliant_hash'] = _sha256(layout_data) if changes else source_hash
+    except Exception as e:
+        summary.update({'status': 'ERROR', 'error': str(e)})
+
+    summary['seconds'] = round(time.perf_counter() - start, 2)
+    return summary
+
+# Standardise one PBIP report folder in place. Runs in a worker process.
+# No compliance cache is needed: a compliant project is read but not a single file is written.
+def standardise_project(report_dir, output_dir, rules_spec):
+    name = os.path.basename(report_dir)
+    summary = {'file': name}
+    start = time.perf_counter()
+    try:
+        changes = apply_rules_to_pbir(report_dir, StandardisationRules(rules_spec))
+        if changes:
+            _write_change_log(output_dir, name, changes)
+        summary.update({'status': 'STANDARDISED' if changes else 'COMPLIANT', 'changes': len(changes),
+                        'output': report_dir if changes else None})
+    except Exception as e:
+        summary.update({'status': 'ERROR', 'error': str(e)})
+
+    summary['seconds'] = round(time.perf_counter() - start, 2)
+    return summary
+
+# Report folders (*.Report) of the PBIP projects anywhere under input_dir
+def find_pbip_reports(input_dir):
+    reports = []
+    for root, dirs, _ in os.walk(input_dir):
+        for folder in sorted(dirs):
+            if folder.endswith('.Report'):
+                reports.append(os.path.join(root, folder))
+        dirs[:] = [folder for folder in dirs if not folder.endswith(('.Report', '.SemanticModel', '.Dataset'))]
+    return sorted(reports)
+
+# Standardise every PBIP report folder under input_dir in place and return the summary rows (sorted by name)
+def run_pbip_batch(input_dir, output_dir, rules_spec, workers=None):
+    os.makedirs(output_dir, exist_ok=True)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(standardise_project, report_dir, output_dir, rules_spec)
+                   for report_dir in find_pbip_reports(input_dir)]
+        for future in as_completed(futures):
+            summary = future.result()
+            results.append(summary)
+            print(f"[{summary['status']}] {summary['file']} ({summary['seconds']}s)")
+    return sorted(results, key=lambda row: row['file'])
+
+# Standardise every .pbix in input_dir (or every PBIP report folder with pbip=True) and return the summary rows
+# (sorted by file name)
+def run_batch(input_dir, output_dir, rules_path, workers=None, pbip=False):
+    with open(rules_path, 'r', encoding='utf-8') as f:
+        rules_spec = json.load(f)
+    StandardisationRules(rules_spec)  # fail fast on an invalid rules file
+    if pbip:
+        return run_pbip_batch(input_dir, output_dir, rules_spec, workers)
+    rules_key = _sha256(json.dumps(rules_spec, sort_keys=True).encode('utf-8'))
+
+    if os.path.abspath(input_dir) == os.path.abspath(output_dir):
+        raise ValueError("The output folder must be different from the input folder")
+    os.makedirs(output_dir, exist_ok=True)
+    cache_path = os.path.join(output_dir, COMPLIANCE_CACHE)
+    cache = _load_cache(cache_path)
+    compliant_hashes = set(cache.get(rules_key, []))
+
+    pbix_files = sorted(file for file in os.listdir(input_dir) if file.lower().endswith('.pbix'))
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(standardise_file, os.path.join(input_dir, file), output_dir, rules_spec,
+                                   compliant_hashes) for file in pbix_files]
+        for future in as_completed(futures):
+            summary = future.result()
+            if summary.get('compliant_hash'):
+                compliant_hashes.add(summary.pop('compliant_hash'))
+            results.append(summary)
+            print(f"[{summary['status']}] {summary['file']} ({summary['seconds']}s)")
+
+    cache[rules_key] = sorted(compliant_hashes)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+
+    return sorted(results, key=lambda row: row['file'])
+
+def main():
+    parser = argparse.ArgumentParser(description="Standardise a folder of PBIX files with a rules JSON")
+    parser.add_argument('input_dir', help="Folder with the PBIX files (or PBIP projects with --pbip)")
+    parser.add_argument('--output-dir', default='standardised')
+    parser.add_argument('--rules', default=RULE_SETS['Add new Header'], help="Rules JSON (default: Add new Header)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--pbip', action='store_true', help="Standardise PBIP report folders in place")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_batch(args.input_dir, args.output_dir, args.rules, args.workers, args.pbip)
+
+    summary_path = os.path.join(args.output_dir, 'standardisation_summary.csv')
+    with open(summary_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
+
+    print(f"\n{len(results)} files in {time.perf_counter() - start:.1f}s. Summary saved to: {summary_path}")
+
+if __name__ == "__main__":
+    main()
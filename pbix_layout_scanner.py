@@ -0,0 +1,158 @@
+# Read-only PBIX layout compliance scanner
+# Extracts every page and visual container (type, position, title fonts and colours, table header style)
+# from a folder of PBIX files into one inventory table, indexed by report and visual type.
+# Usage: python pbix_layout_scanner.py <pbix folder> --output pbix_visual_inventory.parquet --workers 8
+# Query example (all tableEx visuals without bold headers):
+#   inventory = load_inventory('pbix_visual_inventory.parquet')
+#   query_inventory(inventory, visual_type='tableEx', header_bold=[False, None])
+
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from powerbi_standardisation_accelerator import VisualContainer, read_layout
+
+INVENTORY_COLUMNS = ['report', 'page', 'page_ordinal', 'visual_name', 'visual_type', 'x', 'y', 'z', 'width', 'height',
+                     'title_text', 'title_font_family', 'title_font_size', 'title_bold', 'title_font_color',
+                     'header_bold', 'header_font_family', 'colors']
+
+# Low-cardinality text columns stored as categories (small and fast to filter)
+CATEGORY_COLUMNS = ['report', 'page', 'visual_type', 'title_font_family', 'title_font_color', 'header_font_family']
+
+TITLE_PATH = ['singleVisual', 'vcObjects', 'title', 0, 'properties']
+HEADER_PATH = ['singleVisual', 'objects', 'columnHeaders', 0, 'properties']
+COLOR_PATTERN = re.compile(r"'(#[0-9A-Fa-f]{6})'")
+
+# Plain value of a formatting property: {"expr": {"Literal": {"Value": "'Segoe UI'"}}} -> 'Segoe UI',
+# "true" -> True, "16D" -> 16.0; solid colours are unwrapped first. None when the property is not set.
+def _literal(properties, name):
+    if not isinstance(properties, dict) or name not in properties:
+        return None
+    node = properties[name]
+    if isinstance(node, dict) and 'solid' in node:
+        node = node['solid'].get('color', {})
+    value = node.get('expr', {}).get('Literal', {}).get('Value') if isinstance(node, dict) else None
+    if not isinstance(value, str):
+        return value
+    if value in ('true', 'false'):
+        return value == 'true'
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1]
+    try:
+        return float(value.rstrip('DL'))
+    except ValueError:
+        return value
+
+# One inventory row per visual container of a PBIX
+def scan_pbix(pbix_path):
+    report = os.path.basename(pbix_path)
+    rows = []
+    for section in read_layout(pbix_path).get('sections', []):
+        page = section.get('displayName', section.get('name'))
+        for raw in section.get('visualContainers', []):
+            visual = VisualContainer(raw)
+            title = visual.get_path(TITLE_PATH)
+            header = visual.get_path(HEADER_PATH)
+            rows.append({
+                'report': report,
+                'page': page,
+                'page_ordinal': section.get('ordinal'),
+                'visual_name': visual.name,
+                'visual_type': visual.visual_type or ('group' if 'singleVisualGroup' in visual.config else None),
+                'x': raw.get('x'), 'y': raw.get('y'), 'z': raw.get('z'),
+                'width': raw.get('width'), 'height': raw.get('height'),
+                'title_text': _literal(title, 'text'),
+                'title_font_family': _literal(title, 'fontFamily'),
+                'title_font_size': _literal(title, 'fontSize'),
+                'title_bold': _literal(title, 'bold'),
+                'title_font_color': _literal(title, 'fontColor'),
+                'header_bold': _literal(header, 'bold'),
+                'header_font_family': _literal(header, 'fontFamily'),
+                'colors': ','.join(sorted(set(color.upper() for color in COLOR_PATTERN.findall(raw.get('config', ''))))),
+            })
+    return rows
+
+# Scan one file in a worker process; unreadable files are reported instead of stopping the scan
+def _scan_file(pbix_path):
+    try:
+        return scan_pbix(pbix_path), None
+    except Exception as e:
+        return [], f"{os.path.basename(pbix_path)}: {e}"
+
+# Columnar inventory: typed columns, categories for repeated text, sorted (report, visual_type) index
+def build_inventory(rows):
+    inventory = pd.DataFrame(rows, columns=INVENTORY_COLUMNS)
+    for col in CATEGORY_COLUMNS:
+        inventory[col] = inventory[col].astype('category')
+    for col in ['title_bold', 'header_bold']:
+        inventory[col] = inventory[col].astype('boolean')
+    for col in ['x', 'y', 'z', 'width', 'height', 'title_font_size', 'page_ordinal']:
+        inventory[col] = pd.to_numeric(inventory[col], errors='coerce')
+    return inventory.set_index(['report', 'visual_type']).sort_index()
+
+# Scan every .pbix in a folder in parallel and return (inventory, errors)
+def scan_directory(input_dir, workers=None):
+    pbix_files = sorted(os.path.join(input_dir, file) for file in os.listdir(input_dir) if file.lower().endswith('.pbix'))
+    rows, errors = [], []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for file_rows, error in executor.map(_scan_file, pbix_files, chunksize=8):
+            rows.extend(file_rows)
+            if error:
+                errors.append(error)
+    return build_inventory(rows), errors
+
+def save_inventory(inventory, path):
+    inventory.reset_index().to_parquet(path, index=False)
+
+def load_inventory(path):
+    return pd.read_parquet(path).set_index(['report', 'visual_type']).sort_index()
+
+# Filter the inventory. report/visual_type are looked up on the sorted index; every other keyword is a column
+# condition: a value (equality) or a list of accepted values, where None in the list also accepts missing values.
+def query_inventory(inventory, report=None, visual_type=None, **conditions):
+    result = inventory
+    try:
+        if report is not None and visual_type is not None:
+            result = result.loc[[(report, visual_type)]]
+        elif report is not None:
+            result = result.loc[[report]]
+        elif visual_type is not None:
+            result = result.xs(visual_type, level='visual_type', drop_level=False)
+    except KeyError:
+        return result.iloc[0:0]
+
+    mask = np.ones(len(result), dtype=bool)
+    for col, expected in conditions.items():
+        values = expected if isinstance(expected, list) else [expected]
+        accepted = result[col].isin([value for value in values if value is not None]).fillna(False).to_numpy(dtype=bool)
+        if None in values:
+            accepted |= result[col].isna().to_numpy()
+        mask &= accepted
+    return result[mask]
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a visual inventory from a folder of PBIX files")
+    parser.add_argument('input_dir', help="Folder with the PBIX files")
+    parser.add_argument('--output', default='pbix_visual_inventory.parquet')
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    inventory, errors = scan_directory(args.input_dir, args.workers)
+    save_inventory(inventory, args.output)
+
+    for error in errors:
+        print(f"Skipped {error}")
+    reports = inventory.index.get_level_values('report')
+    visual_types = inventory.index.get_level_values('visual_type')
+    print(f"\n{reports.nunique()} reports, {len(inventory)} visuals in {time.perf_counter() - start:.1f}s")
+    print(visual_types.value_counts().to_string())
+    print(f"\nInventory saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
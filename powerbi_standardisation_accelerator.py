@@ -2,383 +2,511 @@
 
 import streamlit as st
 import zipfile
-import io
 import json
-
-st.title('PowerBI Accelerator by Sigmoid')
-
-# Upload the Source zip file
-ss = st.file_uploader('Upload a PBIX file')
-
-# --------- Removing Streamlit's Hamburger and Footer starts ---------
-hide_st_style = """
-            <style>
-            #MainMenu {visibility: hidden;}
-            footer {visibility: hidden;}
-            header {visibility: hidden;}
-            a {text-decoration: none;}
-            .css-15tx938 {font-size: 18px !important;}
-            </style>
-            """
-st.markdown(hide_st_style, unsafe_allow_html=True)
-# --------- Removing Streamlit's Hamburger and Footer ends ------------
-new_vc1 = {
-    "id": 99999999,
-    "x": 0,
-    "y": 0,
-    "z": 15000,
-    "width": 1440.3516483516485,
-    "height": 65,
-    "config": "{\"name\":\"be03e83f8af4ed66720d\",\"layouts\":[{\"id\":0,\"position\":{\"x\":0,\"y\":0,\"z\":15000,\"width\":1440.3516483516485,\"height\":65,\"tabOrder\":15000}}],\"singleVisual\":{\"visualType\":\"shape\",\"drillFilterOtherVisuals\":true,\"objects\":{\"shape\":[{\"properties\":{\"tileShape\":{\"expr\":{\"Literal\":{\"Value\":\"'rectangle'\"}}},\"tabRoundCornerTop\":{\"expr\":{\"Literal\":{\"Value\":\"20L\"}}}}}],\"rotation\":[{\"properties\":{\"shapeAngle\":{\"expr\":{\"Literal\":{\"Value\":\"0L\"}}}}}],\"fill\":[{\"properties\":{\"fillColor\":{\"solid\":{\"color\":{\"expr\":{\"Literal\":{\"Value\":\"'#00519C'\"}}}}}},\"selector\":{\"id\":\"default\"}}]},\"vcObjects\":{\"title\":[{\"properties\":{\"text\":{\"expr\":{\"Literal\":{\"Value\":\"'Report title background'\"}}}}}]}}}",
-    "filters": "[]",
-    "tabOrder": 15000
-}
-
-new_vc2 = {
-                    "id": 2539326977,
-                    "x": 355,
-                    "y": 11,
-                    "z": 38000,
-                    "width": 768,
-                    "height": 64.71910112359551,
-                    "config": "{\"name\":\"1ee7ff6475ab1fbc89b7\",\"layouts\":[{\"id\":0,\"position\":{\"x\":355,\"y\":11,\"z\":38000,\"width\":768,\"height\":64.71910112359551,\"tabOrder\":38000}}],\"singleVisual\":{\"visualType\":\"textbox\",\"drillFilterOtherVisuals\":true,\"objects\":{\"general\":[{\"properties\":{\"paragraphs\":[{\"textRuns\":[{\"value\":\"TIC Code Consumer All Brands Gross Inv Report\",\"textStyle\":{\"fontWeight\":\"bold\",\"fontSize\":\"20pt\",\"color\":\"#ffffff\"}}]}]}}]},\"vcObjects\":{\"background\":[{\"properties\":{\"show\":{\"expr\":{\"Literal\":{\"Value\":\"false\"}}}}}]}}}",
-                    "filters": "[]",
-                    "tabOrder": 38000
-                }
-
-footer_text={
-    "x": 39.52191235059761,
-    "y": 657.8486055776892,
-    "z": 5000,
-    "width": 140.23904382470118,
-    "height": 36.972111553784856,
-    "config": "{\"name\":\"a145d8869e65ef7d44fd\",\"layouts\":[{\"id\":0,\"position\":{\"x\":39.52191235059761,\"y\":657.8486055776892,\"z\":5000,\"width\":140.23904382470118,\"height\":36.972111553784856,\"tabOrder\":5000}}],\"singleVisual\":{\"visualType\":\"textbox\",\"drillFilterOtherVisuals\":true,\"objects\":{\"general\":[{\"properties\":{\"paragraphs\":[{\"textRuns\":[{\"value\":\"Source: \",\"textStyle\":{\"fontWeight\":\"bold\",\"fontSize\":\"14pt\"}}]}]}}]}}}",
-    "filters": "[]",
-    "tabOrder": 5000
+import operator
+import os
+import shutil
+import tempfile
+
+# Unchanged PBIX members (DataModel etc.) are copied in chunks of this size instead of being read whole
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Rule sets shipped with the accelerator (same JSON format can be uploaded in the app)
+RULES_DIR = os.path.dirname(os.path.abspath(__file__))
+RULE_SETS = {
+    'Add new Header': os.path.join(RULES_DIR, 'standardisation_rules.json'),
+    'Update exisiting Header': os.path.join(RULES_DIR, 'standardisation_rules_update_header.json'),
 }
 
-ibutton={
-                    "x": 1216.2549800796812,
-                    "y": 11.47410358565737,
-                    "z": 1100000,
-                    "width": 43.34661354581673,
-                    "height": 39.52191235059761,
-                    "config": "{\"name\":\"88af22203e111f0690dd\",\"layouts\":[{\"id\":0,\"position\":{\"x\":1216.2549800796812,\"y\":11.47410358565737,\"z\":1100000,\"width\":43.34661354581673,\"height\":39.52191235059761,\"tabOrder\":1100000}}],\"singleVisual\":{\"visualType\":\"actionButton\",\"drillFilterOtherVisuals\":true,\"objects\":{\"icon\":[{\"properties\":{\"shapeType\":{\"expr\":{\"Literal\":{\"Value\":\"'information'\"}}},\"lineColor\":{\"solid\":{\"color\":{\"expr\":{\"ThemeDataColor\":{\"ColorId\":0,\"Percent\":0}}}}}},\"selector\":{\"id\":\"default\"}}]},\"vcObjects\":{\"visualLink\":[{\"properties\":{\"show\":{\"expr\":{\"Literal\":{\"Value\":\"true\"}}},\"type\":{\"expr\":{\"Literal\":{\"Value\":\"'WebUrl'\"}}},\"webUrl\":{\"expr\":{\"Literal\":{\"Value\":\"'https://www.sigmoid.com/'\"}}}}}],\"border\":[{\"properties\":{\"show\":{\"expr\":{\"Literal\":{\"Value\":\"false\"}}}}}]}},\"howCreated\":\"InsertVisualButton\"}",
-                    "filters": "[]",
-                    "tabOrder": 1100000
-                }
-
-footer_box={
-    "x": 19.123505976095615,
-    "y": 643.8247011952191,
-    "z": 4000,
-    "width": 1240.4780876494024,
-    "height": 62.470119521912345,
-    "config": "{\"name\":\"fa8e2fe72928be0b6366\",\"layouts\":[{\"id\":0,\"position\":{\"x\":19.123505976095615,\"y\":643.8247011952191,\"z\":4000,\"width\":1240.4780876494024,\"height\":62.470119521912345,\"tabOrder\":4000}}],\"singleVisual\":{\"visualType\":\"shape\",\"drillFilterOtherVisuals\":true,\"objects\":{\"shape\":[{\"properties\":{\"tileShape\":{\"expr\":{\"Literal\":{\"Value\":\"'rectangle'\"}}}}}],\"rotation\":[{\"properties\":{\"shapeAngle\":{\"expr\":{\"Literal\":{\"Value\":\"0L\"}}}}}],\"outline\":[{\"properties\":{\"show\":{\"expr\":{\"Literal\":{\"Value\":\"false\"}}}}}],\"fill\":[{\"properties\":{\"show\":{\"expr\":{\"Literal\":{\"Value\":\"true\"}}}}},{\"properties\":{\"fillColor\":{\"solid\":{\"color\":{\"expr\":{\"ThemeDataColor\":{\"ColorId\":0,\"Percent\":0}}}}}},\"selector\":{\"id\":\"default\"}}]},\"vcObjects\":{\"background\":[{\"properties\":{\"show\":{\"expr\":{\"Literal\":{\"Value\":\"true\"}}},\"transparency\":{\"expr\":{\"Literal\":{\"Value\":\"0D\"}}}}}],\"title\":[{\"properties\":{\"titleWrap\":{\"expr\":{\"Literal\":{\"Value\":\"true\"}}},\"fontColor\":{\"solid\":{\"color\":{\"expr\":{\"Literal\":{\"Value\":\"'#00519C'\"}}}}},\"background\":{\"solid\":{\"color\":{\"expr\":{\"Literal\":{\"Value\":\"'#FFFFFF'\"}}}}},\"alignment\":{\"expr\":{\"Literal\":{\"Value\":\"'left'\"}}},\"fontSize\":{\"expr\":{\"Literal\":{\"Value\":\"'16'\"}}},\"bold\":{\"expr\":{\"Literal\":{\"Value\":\"true\"}}},\"fontFamily\":{\"expr\":{\"Literal\":{\"Value\":\"'Segoe UI'\"}}}}}],\"border\":[{\"properties\":{\"show\":{\"expr\":{\"Literal\":{\"Value\":\"true\"}}},\"color\":{\"solid\":{\"color\":{\"expr\":{\"Literal\":{\"Value\":\"'#CCCCCC'\"}}}}},\"radius\":{\"expr\":{\"Literal\":{\"Value\":\"7D\"}}}}}],\"dropShadow\":[{\"properties\":{\"show\":{\"expr\":{\"Literal\":{\"Value\":\"true\"}}},\"preset\":{\"expr\":{\"Literal\":{\"Value\":\"'Center'\"}}},\"position\":{\"expr\":{\"Literal\":{\"Value\":\"'Outer'\"}}},\"color\":{\"solid\":{\"color\":{\"expr\":{\"Literal\":{\"Value\":\"'#808080'\"}}}}}}}]}},\"howCreated\":\"InsertVisualButton\"}",
-    "filters": "[]",
-    "tabOrder": 4000
+# A visual container of the Layout with its config JSON string decoded once.
+# Changes go through set_path/set_position, which mark the visual dirty only when a value really changes;
+# commit() then serialises the config back into the container, and only for dirty visuals.
+class VisualContainer:
+    def __init__(self, raw):
+        self.raw = raw
+        self._config = None
+        self.dirty = False
+
+    @property
+    def config(self):
+        if self._config is None:
+            self._config = json.loads(self.raw.get('config', '{}'))
+        return self._config
+
+    @property
+    def name(self):
+        return self.config.get('name')
+
+    @property
+    def visual_type(self):
+        return self.config.get('singleVisual', {}).get('visualType')
+
+    # Config text as loaded, for substring matches
+    @property
+    def config_text(self):
+        return self.raw.get('config', '')
+
+    # x/y/z/width/height of the container
+    def position_value(self, key):
+        return self.raw.get(key)
+
+    # Rules address config paths in the Layout format; other formats map them to their own structure
+    def _translate_path(self, path):
+        return path
+
+    def _walk(self, path):
+        node = self.config
+        for key in path:
+            try:
+                node = node[key]
+            except (KeyError, IndexError, TypeError):
+                return None
+        return node
+
+    # Value at a config path, or None when any part of the path is missing
+    def get_path(self, path):
+        return self._walk(self._translate_path(path))
+
+    # Set a value at an existing config path; missing paths are left alone. Returns True if the value changed.
+    def set_path(self, path, value):
+        path = self._translate_path(path)
+        parent = self._walk(path[:-1])
+        try:
+            if parent[path[-1]] == value:
+                return False
+        except (KeyError, IndexError, TypeError):
+            return False
+        parent[path[-1]] = value
+        self.dirty = True
+        return True
+
+    # Move/resize the container and every layout position in its config. Returns True if anything changed.
+    def set_position(self, **position):
+        changed = False
+        for key, value in position.items():
+            if self.raw.get(key) != value:
+                self.raw[key] = value
+                changed = True
+        for layout in self.config.get('layouts', []):
+            for key, value in position.items():
+                if layout['position'].get(key) != value:
+                    layout['position'][key] = value
+                    changed = True
+        self.dirty = self.dirty or changed
+        return changed
+
+    # Write the config back into the container if it was modified. Returns True if it was.
+    def commit(self):
+        if not self.dirty:
+            return False
+        self.raw['config'] = json.dumps(self.config)
+        self.dirty = False
+        return True
+
+# A visual of a PBIR report folder (definition/pages/<page>/visuals/<visual>/visual.json).
+# Rules keep using Layout config paths: singleVisual maps to visual, vcObjects to visualContainerObjects and
+# singleVisualGroup to visualGroup. commit() rewrites the visual.json file, only for dirty (or new) visuals.
+class PbirVisual(VisualContainer):
+    SCHEMA = 'https://developer.microsoft.com/json-schemas/fabric/item/report/definition/visualContainer/1.0.0/schema.json'
+    PATHS = {'singleVisual': 'visual', 'singleVisualGroup': 'visualGroup'}
+
+    def __init__(self, path, data, text=None):
+        super().__init__({})
+        self.path = path
+        self._config = data
+        self._text = text
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        return cls(path, json.loads(text), text)
+
+    # New visual.json in visuals_dir from a Layout visual container (page rule inserts)
+    @classmethod
+    def from_container(cls, raw, visuals_dir):
+        config = json.loads(raw['config'])
+        layout_position = config.get('layouts', [{}])[0].get('position', {})
+        position = {key: raw.get(key, layout_position.get(key)) for key in ('x', 'y', 'z', 'width', 'height')}
+        position['tabOrder'] = raw.get('tabOrder', layout_position.get('tabOrder', position['z']))
+
+        data = {'$schema': cls.SCHEMA, 'name': config['name'], 'position': position}
+        if 'singleVisual' in config:
+            visual = dict(config['singleVisual'])
+            if 'vcObjects' in visual:
+                visual['visualContainerObjects'] = visual.pop('vcObjects')
+            data['visual'] = visual
+        if 'singleVisualGroup' in config:
+            data['visualGroup'] = config['singleVisualGroup']
+
+        visual = cls(os.path.join(visuals_dir, config['name'], 'visual.json'), data)
+        visual.dirty = True
+        return visual
+
+    @property
+    def visual_type(self):
+        return self.config.get('visual', {}).get('visualType')
+
+    @property
+    def config_text(self):
+        return self._text if self._text is not None else json.dumps(self.config)
+
+    def position_value(self, key):
+        return self.config.get('position', {}).get(key)
+
+    def _translate_path(self, path):
+        if not path or path[0] not in self.PATHS:
+            return path
+        path = [self.PATHS[path[0]]] + list(path[1:])
+        if path[0] == 'visual' and len(path) > 1 and path[1] == 'vcObjects':
+            path[1] = 'visualContainerObjects'
+        return path
+
+    def set_position(self, **position):
+        current = self.config.setdefault('position', {})
+        changed = False
+        for key, value in position.items():
+            if current.get(key) != value:
+                current[key] = value
+                changed = True
+        self.dirty = self.dirty or changed
+        return changed
+
+    def commit(self):
+        if not self.dirty:
+            return False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.config, f, indent=2)
+        self.dirty = False
+        return True
+
+# Config paths in rules are dotted strings, list indexes as numbers: "singleVisual.vcObjects.title.0.properties"
+def _parse_path(path):
+    return [int(part) if part.isdigit() else part for part in path.split('.')]
+
+_OPERATORS = {
+    'eq': operator.eq, 'ne': operator.ne, 'gt': operator.gt, 'gte': operator.ge, 'lt': operator.lt, 'lte': operator.le,
+    'in': lambda value, expected: value in expected,
 }
 
-source_text={
-                    "x": 122.39043824701194,
-                    "y": 656.5737051792828,
-                    "z": 12001,
-                    "width": 140.23904382470118,
-                    "height": 36.972111553784856,
-                    "config": "{\"name\":\"a7ec1ed60550297610b7\",\"layouts\":[{\"id\":0,\"position\":{\"x\":122.39043824701194,\"y\":656.5737051792828,\"z\":12001,\"width\":140.23904382470118,\"height\":36.972111553784856,\"tabOrder\":12001}}],\"singleVisual\":{\"visualType\":\"textbox\",\"drillFilterOtherVisuals\":true,\"objects\":{\"general\":[{\"properties\":{\"paragraphs\":[{\"textRuns\":[{\"value\":\"Inventory Data \",\"textStyle\":{\"fontSize\":\"14pt\"}}]}]}}]}}}",
-                    "filters": "[]",
-                    "tabOrder": 12001
-                }
-
-bar={
-                    "x": 19,
-                    "y": 255,
-                    "z": 0,
-                    "width": 407,
-                    "height": 362,
-                    "config": "{\"name\": \"ec2b436d7f5655cb2ed8\", \"layouts\": [{\"id\": 0, \"position\": {\"x\": 19, \"y\": 255, \"z\": 0, \"width\": 407, \"height\": 362, \"tabOrder\": 0}}], \"singleVisual\": {\"visualType\": \"barChart\", \"projections\": {\"Category\": [{\"queryRef\": \"Orders.Category\", \"active\": true}], \"Y\": [{\"queryRef\": \"Sum(Orders.Sales)\"}]}, \"prototypeQuery\": {\"Version\": 2, \"From\": [{\"Name\": \"o\", \"Entity\": \"Orders\", \"Type\": 0}], \"Select\": [{\"Column\": {\"Expression\": {\"SourceRef\": {\"Source\": \"o\"}}, \"Property\": \"Category\"}, \"Name\": \"Orders.Category\", \"NativeReferenceName\": \"Category\"}, {\"Aggregation\": {\"Expression\": {\"Column\": {\"Expression\": {\"SourceRef\": {\"Source\": \"o\"}}, \"Property\": \"Sales\"}}, \"Function\": 0}, \"Name\": \"Sum(Orders.Sales)\", \"NativeReferenceName\": \"Sales\"}], \"OrderBy\": [{\"Direction\": 2, \"Expression\": {\"Aggregation\": {\"Expression\": {\"Column\": {\"Expression\": {\"SourceRef\": {\"Source\": \"o\"}}, \"Property\": \"Sales\"}}, \"Function\": 0}}}]}, \"columnProperties\": {\"Sum(Orders.Sales)\": {\"displayName\": \"Sales\"}}, \"drillFilterOtherVisuals\": true, \"hasDefaultSort\": true, \"vcObjects\": {\"border\": [{\"properties\": {\"color\": {\"solid\": {\"color\": {\"expr\": {\"Literal\": {\"Value\": \"'#CCCCCC'\"}}}}}}}], \"title\": [{\"properties\": {\"fontFamily\": {\"expr\": {\"Literal\": {\"Value\": \"'Segoe UI'\"}}}, \"fontSize\": {\"expr\": {\"Literal\": {\"Value\": 16}}}}}]}}}",
-                    "filters": "[]",
-                    "query": "{\"Commands\":[{\"SemanticQueryDataShapeCommand\":{\"Query\":{\"Version\":2,\"From\":[{\"Name\":\"o\",\"Entity\":\"Orders\",\"Type\":0}],\"Select\":[{\"Column\":{\"Expression\":{\"SourceRef\":{\"Source\":\"o\"}},\"Property\":\"Category\"},\"Name\":\"Orders.Category\",\"NativeReferenceName\":\"Category\"},{\"Aggregation\":{\"Expression\":{\"Column\":{\"Expression\":{\"SourceRef\":{\"Source\":\"o\"}},\"Property\":\"Sales\"}},\"Function\":0},\"Name\":\"Sum(Orders.Sales)\",\"NativeReferenceName\":\"Sales\"}],\"OrderBy\":[{\"Direction\":2,\"Expression\":{\"Aggregation\":{\"Expression\":{\"Column\":{\"Expression\":{\"SourceRef\":{\"Source\":\"o\"}},\"Property\":\"Sales\"}},\"Function\":0}}}]},\"Binding\":{\"Primary\":{\"Groupings\":[{\"Projections\":[0,1]}]},\"DataReduction\":{\"DataVolume\":4,\"Primary\":{\"Window\":{\"Count\":1000}}},\"Version\":1},\"ExecutionMetricsKind\":1}}]}",
-                    "dataTransforms": "{\"projectionOrdering\":{\"Category\":[0],\"Y\":[1]},\"projectionActiveItems\":{\"Category\":[{\"queryRef\":\"Orders.Category\",\"suppressConcat\":false}]},\"queryMetadata\":{\"Select\":[{\"Restatement\":\"Category\",\"Name\":\"Orders.Category\",\"Type\":2048},{\"Restatement\":\"Sales\",\"Name\":\"Sum(Orders.Sales)\",\"Type\":1}]},\"visualElements\":[{\"DataRoles\":[{\"Name\":\"Category\",\"Projection\":0,\"isActive\":true},{\"Name\":\"Y\",\"Projection\":1,\"isActive\":false}]}],\"selects\":[{\"displayName\":\"Category\",\"queryName\":\"Orders.Category\",\"roles\":{\"Category\":true},\"type\":{\"category\":null,\"underlyingType\":1},\"expr\":{\"Column\":{\"Expression\":{\"SourceRef\":{\"Entity\":\"Orders\"}},\"Property\":\"Category\"}}},{\"displayName\":\"Sales\",\"queryName\":\"Sum(Orders.Sales)\",\"roles\":{\"Y\":true},\"sort\":2,\"sortOrder\":0,\"type\":{\"category\":null,\"underlyingType\":259},\"expr\":{\"Aggregation\":{\"Expression\":{\"Column\":{\"Expression\":{\"SourceRef\":{\"Entity\":\"Orders\"}},\"Property\":\"Sales\"}},\"Function\":0}}}]}"
-                }
-
-simage=                            {
-                    "x": 30,
-                    "y": 5,
-                    "z": 11111000,
-                    "width": 183.375,
-                    "height": 51.75,
-                    "config": "{\"name\":\"08011354e84b647e1de6\",\"layouts\":[{\"id\":0,\"position\":{\"x\":30,\"y\":5,\"z\":11111000,\"width\":183.375,\"height\":51.75,\"tabOrder\":11000}}],\"singleVisual\":{\"visualType\":\"image\",\"drillFilterOtherVisuals\":true,\"objects\":{\"general\":[{\"properties\":{\"imageUrl\":{\"expr\":{\"ResourcePackageItem\":{\"PackageName\":\"RegisteredResources\",\"PackageType\":1,\"ItemName\":\"image_(10)09472004764938458.png\"}}}}}]}}}",
-                    "filters": "[]",
-                    "tabOrder": 11000
-                }
-
-if ss:
-    #st.info('Select one of the option')
-    #radio=st.radio(' ', ['Add new Header','Update exisiting Header'])
-
-    if 1==1:
-        # In-memory byte stream to hold the destination zip file data
-        zip_data = io.BytesIO()
-
-        # Extract the files from the source zip file and re-zip them into a destination zip file
-        with zipfile.ZipFile(ss, 'r') as source_zip:
-            with zipfile.ZipFile(zip_data, 'w') as destination_zip:
-                # Iterate over the files in the source zip file
-                for name in source_zip.namelist():
-
-                    # Skip the Security Binding file
-                    if name == 'SecurityBindings':
-                        continue
-
-                    # Manipulate the Layout file
-                    if name == 'Report/Layout':
-                        # Read the contents of the layout file
-                        data = source_zip.read(name).decode('utf-16 le')
-                        # Old layout file
+# A condition is either a plain value (equality) or operators such as {"gt": 500} or {"in": [0, 1]}
+def _compile_condition(condition):
+    if not isinstance(condition, dict):
+        return lambda value: value == condition
+    checks = [(_OPERATORS[op], expected) for op, expected in condition.items()]
+    return lambda value: value is not None and all(check(value, expected) for check, expected in checks)
+
+# Match section of a rule -> list of checks taking (visual, section).
+# page_ordinal: condition on the page ordinal; position: conditions on x/y/z/width/height of the container;
+# config_contains: text (or list, any of) in the config as loaded; config_path: {"path": ..., "exists"/"equals": ...}
+def _compile_match(match, scope):
+    checks = []
+    if 'page_ordinal' in match:
+        condition = _compile_condition(match['page_ordinal'])
+        checks.append(lambda visual, section: condition(section.get('ordinal')))
+    if scope == 'page':
+        return checks
+
+    for key, value in match.get('position', {}).items():
+        condition = _compile_condition(value)
+        checks.append(lambda visual, section, key=key, condition=condition: condition(visual.position_value(key)))
+
+    if 'config_contains' in match:
+        needles = match['config_contains']
+        needles = [needles] if isinstance(needles, str) else needles
+        checks.append(lambda visual, section: any(needle in visual.config_text for needle in needles))
+
+    if 'config_path' in match:
+        path = _parse_path(match['config_path']['path'])
+        if 'equals' in match['config_path']:
+            expected = match['config_path']['equals']
+            checks.append(lambda visual, section: visual.get_path(path) == expected)
+        else:
+            exists = match['config_path'].get('exists', True)
+            checks.append(lambda visual, section: (visual.get_path(path) is not None) == exists)
+    return checks
+
+# Actions of a visual rule -> list of (description, function(visual) returning True when something changed)
+def _compile_actions(actions):
+    compiled = []
+    for action in actions:
+        if action['op'] == 'set':
+            path, value = _parse_path(action['path']), action['value']
+            compiled.append((f"set {action['path']} = {value!r}",
+                             lambda visual, path=path, value=value: visual.set_path(path, value)))
+        elif action['op'] == 'set_position':
+            position = action['position']
+            compiled.append((f"set position {position}",
+                             lambda visual, position=position: visual.set_position(**position)))
+        else:
+            raise ValueError(f"Unknown visual rule action: {action['op']}")
+    return compiled
+
+# Standardisation rules loaded from JSON (see standardisation_rules.json) and compiled once.
+# Visual rules are grouped into a dispatch table by visual type (rules without visualType apply to every type),
+# keeping their order from the file; page rules insert visuals. apply() makes one pass over all sections.
+class StandardisationRules:
+    def __init__(self, spec):
+        self.name = spec.get('name', 'Custom rules')
+        self.page_rules = []
+        typed_rules = {}
+        wildcard_rules = []
+
+        for index, rule in enumerate(spec['rules']):
+            scope = rule.get('scope', 'visual')
+            match = rule.get('match', {})
+            compiled = {'name': rule.get('name', f'Rule {index + 1}'), 'checks': _compile_match(match, scope)}
+
+            if scope == 'page':
+                if any(action['op'] != 'insert' for action in rule['actions']):
+                    raise ValueError(f"Page rule '{compiled['name']}' only supports insert actions")
+                compiled['inserts'] = [action['visual'] for action in rule['actions']]
+                self.page_rules.append(compiled)
+                continue
+            if scope != 'visual':
+                raise ValueError(f"Unknown rule scope: {scope}")
+
+            compiled['remove'] = any(action['op'] == 'remove' for action in rule['actions'])
+            compiled['actions'] = _compile_actions([action for action in rule['actions'] if action['op'] != 'remove'])
+
+            visual_types = match.get('visualType')
+            if visual_types is None:
+                wildcard_rules.append((index, compiled))
+            else:
+                for visual_type in [visual_types] if isinstance(visual_types, str) else visual_types:
+                    typed_rules.setdefault(visual_type, []).append((index, compiled))
+
+        self.wildcard_rules = [rule for _, rule in wildcard_rules]
+        self.dispatch = {visual_type: [rule for _, rule in sorted(rules + wildcard_rules, key=lambda item: item[0])]
+                         for visual_type, rules in typed_rules.items()}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def rules_for(self, visual_type):
+        return self.dispatch.get(visual_type, self.wildcard_rules)
+
+    # Apply the rules to the visuals of one page (section: name, displayName, ordinal).
+    # new_visual(raw) wraps a container inserted by a page rule. Kept visuals are committed.
+    # Returns (kept visuals, removed visuals, change log).
+    def apply_page(self, section, visuals, new_visual):
+        page = section.get('displayName', section.get('name'))
+        changes = []
+
+        # Page rules: insert visuals, unless the page already has a visual with the same name
+        existing_names = {visual.name for visual in visuals}
+        for rule in self.page_rules:
+            if not all(check(None, section) for check in rule['checks']):
+                continue
+            for raw in rule['inserts']:
+                visual = new_visual(raw)
+                if visual.name in existing_names:
+                    continue
+                existing_names.add(visual.name)
+                visuals.append(visual)
+                changes.append({'page': page, 'visual': visual.name, 'rule': rule['name'], 'change': 'insert'})
+
+        kept, removed = [], []
+        for visual in visuals:
+            is_removed = False
+            for rule in self.rules_for(visual.visual_type):
+                if not all(check(visual, section) for check in rule['checks']):
+                    continue
+                if rule['remove']:
+                    is_removed = True
+                    changes.append({'page': page, 'visual': visual.name, 'rule': rule['name'], 'change': 'remove'})
+                    break
+                for description, action in rule['actions']:
+                    if action(visual):
+                        changes.append({'page': page, 'visual': visual.name, 'rule': rule['name'], 'change': description})
+            if is_removed:
+                removed.append(visual)
+            else:
+                visual.commit()
+                kept.append(visual)
+        return kept, removed, changes
+
+    # Apply the rules to a parsed Layout in place and return the change log
+    # (one dict per change: page, visual, rule, change)
+    def apply(self, data):
+        changes = []
+        for section in data['sections']:
+            visuals = [VisualContainer(raw) for raw in section['visualContainers']]
+            kept, _, page_changes = self.apply_page(section, visuals, lambda raw: VisualContainer(dict(raw)))
+            section['visualContainers'] = [visual.raw for visual in kept]
+            changes.extend(page_changes)
+        return changes
+
+# Parsed Report/Layout of a PBIX (path or file object), without touching the other members
+def read_layout(source):
+    with zipfile.ZipFile(source, 'r') as source_zip:
+        return json.loads(source_zip.read('Report/Layout').decode('utf-16 le'))
+
+# Fresh entry for the destination zip with the same name, timestamp, attributes and compression as the source member
+def _destination_info(info):
+    destination_info = zipfile.ZipInfo(info.filename, info.date_time)
+    destination_info.compress_type = info.compress_type
+    destination_info.external_attr = info.external_attr
+    destination_info.file_size = info.file_size
+    return destination_info
+
+# Rewrite a PBIX (path or file object) into destination (path or file object).
+# Only Report/Layout is decoded, passed to transform_layout and re-encoded; every other member is streamed
+# chunk by chunk with its original compression, so memory stays near the size of the Layout part.
+# SecurityBindings is dropped. With dump_layouts the Layout before/after is also saved as JSON for debugging.
+# Returns what transform_layout returned (the change log for StandardisationRules.apply); when transform_layout
+# raises, the error is re-raised and destination is left incomplete, so the caller must discard it.
+# With layout_data (a Layout already transformed and encoded as UTF-16 LE) the source Layout is not decoded at all:
+# layout_data is written in its place and transform_layout is not used.
+def rewrite_pbix(source, destination, transform_layout=None, dump_layouts=False, layout_data=None):
+    changes = None
+    with zipfile.ZipFile(source, 'r') as source_zip:
+        with zipfile.ZipFile(destination, 'w') as destination_zip:
+            for info in source_zip.infolist():
+
+                # Skip the Security Binding file
+                if info.filename == 'SecurityBindings':
+                    continue
+
+                # Already transformed Layout
+                if info.filename == 'Report/Layout' and layout_data is not None:
+                    destination_zip.writestr(_destination_info(info), layout_data)
+
+                # Manipulate the Layout file
+                elif info.filename == 'Report/Layout':
+                    data = json.loads(source_zip.read(info).decode('utf-16 le'))
+                    # Old layout file
+                    if dump_layouts:
                         with open('app-og.json', 'w') as f:
-                            a=json.loads(data)
-                            json.dump(a, f)
-                        try:
-                            data=json.loads(data)
-                            ##### Changing attributes of certain elements
-                            for section in data['sections']:
-                                # print(section,'section')
-                                section['visualContainers'].append(new_vc1)
-                                section['visualContainers'].append(new_vc2)
-                                section['visualContainers'].append(footer_text)
-                                section['visualContainers'].append(footer_box)
-                                section['visualContainers'].append(ibutton)
-                                section['visualContainers'].append(source_text)
-                                section['visualContainers'].append(simage)
-                                if section['ordinal'] == 0:  # Checking if it's the first page
-                                    for visual in section['visualContainers']:
-                                         # Load the config dictionary from the JSON string
-                                        config = json.loads(visual['config'])
-
-                                        try:
-                                            config['singleVisual']['vcObjects']['title'][0]['properties']['fontFamily']['expr']['Literal']['Value']="'Segoe UI'"
-                                            config['singleVisual']['vcObjects']['title'][0]['properties']['fontSize']['expr']['Literal']['Value']=16
-                                            visual['config']=json.dumps(config)
-                                            #st.write(visual['config'])
-                                        except:
-                                                print('tested')
-
-                                        # Application 2 - Changing position of line chart
-                                        if config['singleVisual']['visualType'] == 'lineChart':
-                                            #st.write('found line chart in page 1')
-                                        
-                                            # Update main dictionary values
-                                            visual['x'] = 886
-                                            visual['y'] = 255
-                                            visual['width'] = 373
-                                            visual['height'] = 363
-                                            for layout in config['layouts']:
-                                                # Update the values in the config dictionary
-                                                #st.write('inside config dict')
-                                                layout['position']['x'] = 886
-                                                layout['position']['y'] = 255
-                                                layout['position']['width'] = 373
-                                                layout['position']['height'] = 363
-                                                #st.write(layout['position']['x'],layout['position']['y'])
-                                        visual['config']=json.dumps(config)
-                                        #st.write(visual['config'])
-                                        
-                                        # Pie chart
-                                        if config['singleVisual']['visualType'] == 'tableEx':
-                                            #st.write('found pie chart in page 1')
-                                        
-                                            # Update main dictionary values
-                                            visual['x'] = 20
-                                            visual['y'] = 186
-                                            visual['width'] = 1239
-                                            visual['height'] = 453
-                                            for layout in config['layouts']:
-                                                # Update the values in the config dictionary
-                                                #st.write('inside config dict')
-                                                layout['position']['x'] = 20
-                                                layout['position']['y'] = 186
-                                                layout['position']['width'] = 1239
-                                                layout['position']['height'] = 453
-                                                #st.write(layout['position']['x'],layout['position']['y'])
-                                        visual['config']=json.dumps(config)
-                                        #st.write(visual['config'])
-
-                                        # Bar chart
-                                        if config['singleVisual']['visualType'] == 'barChart':
-                                            #st.write('found bar chart in page 1')
-                                        
-                                            # Update main dictionary values
-                                            visual['x'] = 19
-                                            visual['y'] = 255
-                                            visual['width'] = 407
-                                            visual['height'] = 362
-                                            for layout in config['layouts']:
-                                                # Update the values in the config dictionary
-                                                #st.write('inside config dict')
-                                                layout['position']['x'] = 19
-                                                layout['position']['y'] = 255
-                                                layout['position']['width'] = 407
-                                                layout['position']['height'] = 362
-                                                #st.write(layout['position']['x'],layout['position']['y'])
-                                        visual['config']=json.dumps(config)
-                                        #st.write(visual['config'])
-
-                                        # try:
-                                        #     st.write(config['singleVisual']['vcObjects']['title'][0]['properties']['fontFamily']['expr']['Literal']['Value'])
-                                        # except:
-                                        #     st.write('huh')
-                                        # if 'fontFamily' in config['singleVisual']['objects']['general'][0]['properties']:
-                                        #     st.write('hi')
-                                        #     visual['config']=json.dumps(config)
-                                        #     st.write('Diff font found')
-                                        #     st.write(config['singleVisual']['objects']['general'][0]['properties']['fontFamily']['expr']['Literal']['Value'])
-                                        #     # Update the config in the visual container
-                                        #     visual['config'] = json.dumps(config)
-                                        #     st.write(visual['config'])
-
-                                else:
-                                    for visual in section['visualContainers']:
-                                        config = json.loads(visual['config'])
-                                        try:
-                                            #st.write('inside second page')
-                                            config['singleVisual']['vcObjects']['title'][0]['properties']['fontFamily']['expr']['Literal']['Value']="'Segoe UI'"
-                                            config['singleVisual']['vcObjects']['title'][0]['properties']['fontSize']['expr']['Literal']['Value']=16
-                                            visual['config']=json.dumps(config)
-                                            #st.write(visual['config'])
-                                        except:
-                                            print('tested')
-                            # New Layout file
+                            json.dump(data, f)
+                    try:
+                        changes = transform_layout(data)
+                        # New Layout file
+                        if dump_layouts:
                             with open('app-generated.json', 'w') as f:
                                 json.dump(data, f)
-                        
-                        except:
-                            print('hi')
-                        # Add the manipulated layout data to the destination zip file
-                        data = json.dumps(data)
-                        destination_zip.writestr(name, data.encode('utf-16 le'))
-                    
-                    else:
-                        # Add the file to the destination zip file as-is
-                        binary_data = source_zip.read(name)
-                        destination_zip.writestr(name, binary_data)
-
-
-        # Download the destination file
-        st.download_button(
-            label='Download Destination PBIX File',
-            data=zip_data.getvalue(),
-            file_name='destination.pbix',
-            mime='application/pbix'
-        )
-    elif 1==2:
-        # In-memory byte stream to hold the destination zip file data
-        zip_data = io.BytesIO()
-
-        # Extract the files from the source zip file and re-zip them into a destination zip file
-        with zipfile.ZipFile(ss, 'r') as source_zip:
-            with zipfile.ZipFile(zip_data, 'w') as destination_zip:
-                # Iterate over the files in the source zip file
-                for name in source_zip.namelist():
-
-                    # Skip the Security Binding file
-                    if name == 'SecurityBindings':
-                        continue
-
-                    # Manipulate the Layout file
-                    if name == 'Report/Layout':
-                        # Read the contents of the layout file
-                        data = source_zip.read(name).decode('utf-16 le')
-
-                        # Old layout file
-                        with open('og_file.json', 'w') as f:
-                            a=json.loads(data)
-                            json.dump(a, f)
-                        try:
-                            ##### Removing certain elements
-                            data=json.loads(data)
-                            for section in data['sections']:
-                                print(section)
-
-                                # Create a new list of visual containers that don't meet the condition
-                                new_visual_containers = []
-                                for visualContainer in section['visualContainers']:
-                                    # Check if y is 0 and x is >500 and config contains "parallelogram" or "rectangle"
-                                    if visualContainer['y'] == 0 and visualContainer['x'] > 500 and ("parallelogram" in visualContainer['config'] or "rectangle" in visualContainer['config']):
-                                        continue
-                                    else:
-                                        new_visual_containers.append(visualContainer)
-
-                                # Replace the old list with the new list
-                                section['visualContainers'] = new_visual_containers
-                            
-                            ##### Changing attributes of certain elements
-                            for section in data['sections']:
-                                for visualContainer in section['visualContainers']:
-
-                                    # Changing Header rectangle
-                                    if visualContainer['y'] == 0 and "#004E90" in visualContainer['config'] :
-                                        # Change x, height, and width
-                                        visualContainer['x'] = 0
-                                        visualContainer['height'] = 65
-                                        visualContainer['width'] = 1280
-                                        # Change config
-                                        config = json.loads(visualContainer['config'])
-
-                                        # Parallelogram to Rectangle
-                                        # Replace "parallelogram" with "rectangle" in the "config" key's value
-                                        config["singleVisual"]["objects"]["shape"][0]["properties"]["tileShape"]["expr"]["Literal"]["Value"] = "'rectangle'"
-
-                                        for layout in config['layouts']:
-                                            layout['position']['x'] = 0
-                                            layout['position']['height'] = 65
-                                            layout['position']['width'] = 1280 
-                                        visualContainer['config'] = json.dumps(config)
-
-                                    # Changing z of logo
-                                    if visualContainer['y'] == 0 and "Pepsico_4659666136978873.png" in visualContainer['config']:
-                                        visualContainer['z'] = 50000
-                                        # Change config
-                                        config = json.loads(visualContainer['config'])
-                                        for layout in config['layouts']:
-                                            layout['position']['z'] = 50000
-                                        visualContainer['config'] = json.dumps(config)
-
-                                    # Changing attributes of groups
-                                    if visualContainer['y'] == 0 and "singleVisualGroup" in visualContainer['config']:
-                                        visualContainer['x'] = 0
-                                        visualContainer['height'] = 65
-                                        visualContainer['width'] = 1280
-                                        # Change config
-                                        config = json.loads(visualContainer['config'])
-                                        for layout in config['layouts']:
-                                            layout['position']['x'] = 0
-                                            layout['position']['height'] = 65
-                                            layout['position']['width'] = 1280
-                                        visualContainer['config'] = json.dumps(config)
-                            
-                            # New Layout file
-                            with open('updated_file.json', 'w') as f:
-                                json.dump(data, f)
-                        
-                        except:
-                            print('hi')
-                        # Add the manipulated layout data to the destination zip file
-                        data = json.dumps(data)
-                        destination_zip.writestr(name, data.encode('utf-16 le'))
-                    
-                    else:
-                        # Add the file to the destination zip file as-is
-                        binary_data = source_zip.read(name)
-                        destination_zip.writestr(name, binary_data)
-
+                    except Exception as e:
+                        print(f'Layout could not be standardised: {e}')
+                        raise
+                    # Add the manipulated layout data to the destination zip file
+                    destination_zip.writestr(_destination_info(info), json.dumps(data).encode('utf-16 le'))
+
+                else:
+                    # Stream the file to the destination zip file as-is
+                    with source_zip.open(info) as source_file, \
+                         destination_zip.open(_destination_info(info), 'w') as destination_file:
+                        shutil.copyfileobj(source_file, destination_file, COPY_CHUNK_SIZE)
+    return changes
+
+# Apply rules to a PBIP report folder (<name>.Report) in place and return the change log.
+# PBIR format (definition/pages): only the visual.json files that change are rewritten, new visuals get their own
+# folder and removed visuals' folders are deleted, so a run touches just the affected files and diffs stay small.
+# A PBIP saved without PBIR keeps a single report.json (the Layout as UTF-8), which is rewritten only when it changes.
+def apply_rules_to_pbir(report_dir, rules):
+    pages_dir = os.path.join(report_dir, 'definition', 'pages')
+    if not os.path.isdir(pages_dir):
+        report_path = os.path.join(report_dir, 'report.json')
+        with open(report_path, 'r', encoding='utf-8-sig') as f:
+            data = json.load(f)
+        changes = rules.apply(data)
+        if changes:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+        return changes
+
+    page_names = sorted(name for name in os.listdir(pages_dir) if os.path.isdir(os.path.join(pages_dir, name)))
+    pages_path = os.path.join(pages_dir, 'pages.json')
+    if os.path.exists(pages_path):
+        with open(pages_path, 'r', encoding='utf-8') as f:
+            page_order = json.load(f).get('pageOrder', [])
+        page_names = [name for name in page_order if name in page_names] + \
+                     [name for name in page_names if name not in page_order]
+
+    changes = []
+    for ordinal, page_name in enumerate(page_names):
+        page_dir = os.path.join(pages_dir, page_name)
+        with open(os.path.join(page_dir, 'page.json'), 'r', encoding='utf-8') as f:
+            page = json.load(f)
+        section = {'name': page_name, 'displayName': page.get('displayName', page_name), 'ordinal': ordinal}
+
+        visuals_dir = os.path.join(page_dir, 'visuals')
+        visuals = []
+        if os.path.isdir(visuals_dir):
+            for visual_name in sorted(os.listdir(visuals_dir)):
+                visual_path = os.path.join(visuals_dir, visual_name, 'visual.json')
+                if os.path.exists(visual_path):
+                    visuals.append(PbirVisual.load(visual_path))
+
+        _, removed, page_changes = rules.apply_page(section, visuals,
+                                                    lambda raw: PbirVisual.from_container(raw, visuals_dir))
+        for visual in removed:
+            if os.path.exists(visual.path):
+                shutil.rmtree(os.path.dirname(visual.path))
+        changes.extend(page_changes)
+    return changes
+
+# Rewrite a PBIX into a temp file on disk and return its path and the change log
+def standardise_pbix(source, transform_layout, dump_layouts=False):
+    with tempfile.NamedTemporaryFile(suffix='.pbix', delete=False) as tmp:
+        destination_path = tmp.name
+    try:
+        changes = rewrite_pbix(source, destination_path, transform_layout, dump_layouts)
+    except Exception:
+        os.remove(destination_path)
+        raise
+    return destination_path, changes
+
+def main():
+    st.title('PowerBI Accelerator by Sigmoid')
+
+    # Upload the Source zip file
+    ss = st.file_uploader('Upload a PBIX file')
+
+    # --------- Removing Streamlit's Hamburger and Footer starts ---------
+    hide_st_style = """
+                <style>
+                #MainMenu {visibility: hidden;}
+                footer {visibility: hidden;}
+                header {visibility: hidden;}
+                a {text-decoration: none;}
+                .css-15tx938 {font-size: 18px !important;}
+                </style>
+                """
+    st.markdown(hide_st_style, unsafe_allow_html=True)
+    # --------- Removing Streamlit's Hamburger and Footer ends ------------
+
+    if ss:
+        st.info('Select one of the option')
+        radio = st.radio(' ', list(RULE_SETS) + ['Custom rules (JSON)'])
+        if radio == 'Custom rules (JSON)':
+            rules_file = st.file_uploader('Upload a rules JSON file', type='json')
+            if rules_file is None:
+                return
+            rules = StandardisationRules(json.load(rules_file))
+        else:
+            rules = StandardisationRules.load(RULE_SETS[radio])
+
+        try:
+            destination_path, changes = standardise_pbix(ss, rules.apply, dump_layouts=True)
+        except Exception as e:
+            st.error(f'Layout could not be standardised: {e}')
+            return
+
+        with st.expander(f"Change log ({len(changes or [])} changes)"):
+            st.dataframe(changes or [])
 
         # Download the destination file
-        st.download_button(
-            label='Download Destination PBIX File',
-            data=zip_data.getvalue(),
-            file_name='destination.pbix',
-            mime='application/pbix'
-        )
-    else:
-        print('')
+        with open(destination_path, 'rb') as f:
+            st.download_button(
+                label='Download Destination PBIX File',
+                data=f,
+                file_name='destination.pbix',
+                mime='application/pbix'
+            )
+        os.remove(destination_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# Reconciliation of the Cognos report inventory with the published Power BI reports
+# Inputs: the hierarchy builder output (reportName, originalPath) and the PBI-links-extractor output (name, webUrl);
+# the pbi_rest_inventory.py output (Report_Name, webUrl) is accepted too. CSV (UTF-8 or UTF-16), Excel or Parquet.
+# Report names are normalised to lower-case tokens without noise words ("report", "rpt", "pbi", ...), blocked by
+# their first token and compared with cosine similarity on character n-gram TF-IDF vectors (sparse products, top-k
+# per report). Cognos reports whose best candidate in their block is below the threshold are searched against all
+# PBI reports, so renames that change the first word are still found. Links are one-to-one: candidates at the
+# threshold are assigned by descending score, so a PBI report is never the match of two Cognos reports.
+# Usage: streamlit run report_reconciler.py
+#        python report_reconciler.py extracted_levels.csv powerbi_reports.csv --output reconciliation.xlsx
+
+import streamlit as st
+from streamlit import runtime
+import pandas as pd
+import numpy as np
+import argparse
+import io
+import re
+import unicodedata
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+COGNOS_COLUMNS = ['reportName', 'originalPath']
+PBI_COLUMNS = ['name', 'webUrl']
+
+# Tokens that say nothing about which report it is
+NOISE_TOKENS = {'report', 'reports', 'rpt', 'pbi', 'powerbi', 'power', 'bi', 'cognos', 'dashboard', 'the', 'of',
+                'and', 'for', 'new', 'copy', 'final', 'v1', 'v2', 'pbix'}
+
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_TOP_K = 3
+# Largest score matrix block held densely (rows x PBI reports)
+MAX_DENSE_CELLS = 4_000_000
+
+_CAMEL = re.compile(r'(?<=[a-z])(?=[A-Z])')
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+# "Sales_Daily-Report (v2).pbix" -> "sales daily"
+def normalise_name(name):
+    if not isinstance(name, str):
+        return ''
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    tokens = _TOKEN.findall(_CAMEL.sub(' ', name).lower())
+    kept = [token for token in tokens if token not in NOISE_TOKENS]
+    return ' '.join(kept or tokens)
+
+# Normalised name of every value, computed once per distinct value; returns (codes, distinct normalised names)
+def _normalise(values):
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    normalised = np.array([normalise_name(value) for value in uniques], dtype=object)
+    name_codes, names = pd.factorize(np.append(normalised, '')[codes])
+    return name_codes, np.asarray(names, dtype=object)
+
+# Positions of the names per first token
+def _blocks(names):
+    keys = [name.split(' ', 1)[0] for name in names]
+    return pd.Series(keys, dtype=object).groupby(keys).indices
+
+# Top-k columns of B for every row of A by cosine similarity (rows are L2 normalised), as (indices, scores) arrays
+# of shape (rows of A, k). Score rows are computed in dense chunks of at most MAX_DENSE_CELLS cells.
+def _top_k(A, B, k):
+    k = min(k, B.shape[0])
+    indices = np.zeros((A.shape[0], k), dtype=np.int64)
+    scores = np.zeros((A.shape[0], k), dtype=np.float64)
+    if k == 0:
+        return indices, scores
+    BT = B.T.tocsr()
+    chunk = max(1, MAX_DENSE_CELLS // B.shape[0])
+    for start in range(0, A.shape[0], chunk):
+        block = (A[start:start + chunk] @ BT).toarray()
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k] if k < block.shape[1] else \
+            np.tile(np.arange(block.shape[1]), (block.shape[0], 1))
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        indices[start:start + chunk] = np.take_along_axis(top, order, axis=1)
+        scores[start:start + chunk] = np.take_along_axis(top_scores, order, axis=1)
+    return indices, scores
+
+# Candidate PBI names for each Cognos name: (cognos, pbi, score, rank) rows with score > 0, up to top_k per name
+def match_names(cognos_names, pbi_names, top_k=DEFAULT_TOP_K, threshold=DEFAULT_THRESHOLD):
+    if not len(cognos_names) or not len(pbi_names):
+        empty = np.zeros(0, dtype=np.int64)
+        return pd.DataFrame({'cognos': empty, 'pbi': empty, 'score': np.zeros(0), 'rank': empty})
+    vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=(3, 3), sublinear_tf=True, dtype=np.float32)
+    X = vectorizer.fit_transform(np.concatenate([cognos_names, pbi_names])).tocsr()
+    X_cognos, X_pbi = X[:len(cognos_names)], X[len(cognos_names):]
+
+    k = min(top_k, len(pbi_names))
+    indices = np.full((len(cognos_names), k), -1, dtype=np.int64)
+    scores = np.zeros((len(cognos_names), k), dtype=np.float64)
+
+    # Blocking: only names sharing their first token are compared
+    pbi_blocks = _blocks(pbi_names)
+    for key, rows in _blocks(cognos_names).items():
+        if key not in pbi_blocks:
+            continue
+        block_columns = pbi_blocks[key]
+        block_indices, block_scores = _top_k(X_cognos[rows], X_pbi[block_columns], k)
+        indices[rows, :block_indices.shape[1]] = block_columns[block_indices]
+        scores[rows, :block_scores.shape[1]] = block_scores
+
+    # Names without a good enough candidate in their block are compared with every PBI name
+    retry = np.flatnonzero(scores[:, 0] < threshold)
+    if len(retry):
+        global_indices, global_scores = _top_k(X_cognos[retry], X_pbi, k)
+        better = global_scores[:, 0] > scores[retry, 0]
+        indices[retry[better]] = global_indices[better]
+        scores[retry[better]] = global_scores[better]
+
+    candidates = pd.DataFrame({'cognos': np.repeat(np.arange(len(cognos_names)), k), 'pbi': indices.ravel(),
+                               'score': scores.ravel(), 'rank': np.tile(np.arange(1, k + 1), len(cognos_names))})
+    return candidates[(candidates['pbi'] >= 0) & (candidates['score'] > 0)].reset_index(drop=True)
+
+# PBI inventory with name / webUrl columns (pbi_rest_inventory.py rows are reduced to their reports)
+def _pbi_reports(pbi_df):
+    if 'name' not in pbi_df.columns and 'Report_Name' in pbi_df.columns:
+        pbi_df = pbi_df[pbi_df['Report_Name'].notna() & (pbi_df['Report_Name'] != 'N/A')]
+        pbi_df = pbi_df.rename(columns={'Report_Name': 'name'})
+    missing = [col for col in PBI_COLUMNS if col not in pbi_df.columns]
+    if missing:
+        raise ValueError(f"PBI inventory is missing columns: {missing}")
+    return pbi_df.reset_index(drop=True)
+
+# Greedy one-to-one assignment of candidate pairs (rows of the two inventories): highest score first (then rank, then
+# Cognos order), a pair is kept when neither report is linked yet. Returns a mask of the kept pairs.
+def _assign_one_to_one(cognos_rows, pbi_rows, scores, ranks):
+    keep = np.zeros(len(scores), dtype=bool)
+    linked_cognos, linked_pbi = set(), set()
+    for position in np.lexsort((cognos_rows, ranks, -scores)).tolist():
+        cognos_row, pbi_row = cognos_rows[position], pbi_rows[position]
+        if cognos_row in linked_cognos or pbi_row in linked_pbi:
+            continue
+        linked_cognos.add(cognos_row)
+        linked_pbi.add(pbi_row)
+        keep[position] = True
+    return keep
+
+# Link each Cognos report to its Power BI report. Returns a dict of DataFrames:
+#   Matched           one-to-one links scoring at least threshold (see _assign_one_to_one)
+#   Candidates        the top_k candidates of every Cognos report, for review of near misses and lost ties
+#   Unmatched Cognos  Cognos reports without a link
+#   Unmatched PBI     PBI reports without a link
+def reconcile(cognos_df, pbi_df, threshold=DEFAULT_THRESHOLD, top_k=DEFAULT_TOP_K):
+    if 'reportName' not in cognos_df.columns:
+        raise ValueError("Cognos inventory needs a reportName column")
+    cognos_df = cognos_df.reset_index(drop=True)
+    pbi_df = _pbi_reports(pbi_df)
+
+    cognos_codes, cognos_names = _normalise(cognos_df['reportName'])
+    pbi_codes, pbi_names = _normalise(pbi_df['name'])
+    candidates = match_names(cognos_names, pbi_names, top_k, threshold)
+
+    cognos_rows = cognos_df.assign(cognos=cognos_codes, cognos_row=np.arange(len(cognos_df)),
+                                   **{'Normalised Cognos Name': cognos_names[cognos_codes]})
+    pbi_rows = pbi_df[PBI_COLUMNS].rename(columns={'name': 'PBI Report', 'webUrl': 'PBI webUrl'})
+    pbi_rows = pbi_rows.assign(pbi=pbi_codes, pbi_row=np.arange(len(pbi_df)),
+                               **{'Normalised PBI Name': pbi_names[pbi_codes]})
+
+    candidates = cognos_rows.merge(candidates, on='cognos').merge(pbi_rows, on='pbi')
+    candidates = candidates.sort_values(['cognos_row', 'rank', 'pbi_row'], kind='stable')
+    eligible = candidates[candidates['score'] >= threshold]
+    keep = _assign_one_to_one(eligible['cognos_row'].to_numpy(), eligible['pbi_row'].to_numpy(),
+                              eligible['score'].to_numpy(), eligible['rank'].to_numpy())
+    candidates = candidates.rename(columns={'score': 'Score', 'rank': 'Rank'})
+    candidates['Score'] = candidates['Score'].round(3)
+    matched = candidates.loc[eligible.index[keep]]
+
+    unmatched_cognos = cognos_df[~np.isin(np.arange(len(cognos_df)), matched['cognos_row'])]
+    unmatched_pbi = pbi_df[~np.isin(np.arange(len(pbi_df)), matched['pbi_row'])]
+    drop = ['cognos', 'pbi', 'cognos_row', 'pbi_row']
+    return {
+        'Matched': matched.drop(columns=drop + ['Rank']).reset_index(drop=True),
+        'Candidates': candidates.drop(columns=drop).reset_index(drop=True),
+        'Unmatched Cognos': unmatched_cognos.reset_index(drop=True),
+        'Unmatched PBI': unmatched_pbi.reset_index(drop=True),
+    }
+
+# CSV (UTF-8, or UTF-16 as written by the hierarchy builder), Excel or Parquet, from a path or an uploaded file
+def read_inventory(source):
+    name = getattr(source, 'name', source).lower()
+    if name.endswith(('.xlsx', '.xls')):
+        return pd.read_excel(source)
+    if name.endswith('.parquet'):
+        return pd.read_parquet(source)
+    if hasattr(source, 'getvalue'):
+        data = source.getvalue()
+    else:
+        with open(source, 'rb') as f:
+            data = f.read()
+    encoding = 'utf-16' if data[:2] in (b'\xff\xfe', b'\xfe\xff') else 'utf-8-sig'
+    return pd.read_csv(io.BytesIO(data), encoding=encoding)
+
+def to_excel(results):
+    output = io.BytesIO()
+    with pd.ExcelWriter(output) as writer:
+        for sheet, df in results.items():
+            df.to_excel(writer, sheet_name=sheet, index=False)
+    return output.getvalue()
+
+def main():
+    st.title("Cognos to Power BI Report Reconciliation")
+    st.write("Upload the Cognos inventory (hierarchy builder output) and the Power BI report list (links extractor output).")
+
+    cognos_file = st.file_uploader("Cognos inventory (reportName, originalPath)", type=['csv', 'xlsx', 'parquet'])
+    pbi_file = st.file_uploader("Power BI reports (name, webUrl)", type=['csv', 'xlsx', 'parquet'])
+    threshold = st.slider("Minimum similarity", 0.0, 1.0, DEFAULT_THRESHOLD, 0.05)
+    top_k = st.number_input("Candidates per Cognos report", min_value=1, max_value=10, value=DEFAULT_TOP_K)
+
+    if cognos_file is not None and pbi_file is not None:
+        try:
+            results = reconcile(read_inventory(cognos_file), read_inventory(pbi_file), threshold, int(top_k))
+        except Exception as e:
+            st.error(f"Error reconciling inventories: {e}")
+            return
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Matches", len(results['Matched']))
+        col2.metric("Unmatched Cognos reports", len(results['Unmatched Cognos']))
+        col3.metric("Unmatched PBI reports", len(results['Unmatched PBI']))
+
+        for sheet, df in results.items():
+            st.write(f"{sheet}:")
+            st.dataframe(df)
+
+        st.download_button(
+            label="Download Reconciliation",
+            data=to_excel(results),
+            file_name="report_reconciliation.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+    else:
+        st.write("Please upload both inventories.")
+
+def cli():
+    parser = argparse.ArgumentParser(description="Reconcile Cognos reports with published Power BI reports")
+    parser.add_argument('cognos', help="Cognos inventory (reportName, originalPath)")
+    parser.add_argument('pbi', help="Power BI reports (name, webUrl)")
+    parser.add_argument('--output', default='report_reconciliation.xlsx')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K)
+    args = parser.parse_args()
+
+    results = reconcile(read_inventory(args.cognos), read_inventory(args.pbi), args.threshold, args.top_k)
+    with open(args.output, 'wb') as f:
+        f.write(to_excel(results))
+    print(f"{len(results['Matched'])} matches, {len(results['Unmatched Cognos'])} unmatched Cognos, "
+          f"{len(results['Unmatched PBI'])} unmatched PBI reports saved to: {args.output}")
+
+if __name__ == "__main__":
+    if runtime.exists():
+        main()
+    else:
+        cli()
@@ -0,0 +1,125 @@
+# Schedule / job dependency graph of a Cognos schedule export (same CSV as paginated_or_no.py)
+# Nodes are "<kind>:<name>" with kind job, step, schedule, report or recipient. Edges point the way a delivery runs:
+#   job -> step / schedule (rows whose Location ends in '>> <job>'), step -> report, schedule -> report,
+#   job / step / schedule -> recipient (addresses in the Recipient column of their rows)
+# Built in one pass over the export; queries walk the adjacency sets instead of re-scanning the export.
+
+import re
+from collections import defaultdict
+
+import pandas as pd
+
+from paginated_or_no import EMAIL_PATTERN, add_job_and_report_names
+
+_EMAIL = re.compile(EMAIL_PATTERN)
+
+KINDS = ('job', 'step', 'schedule', 'report', 'recipient')
+
+def _node(kind, name):
+    return f"{kind}:{name}"
+
+def _kind(node):
+    return node.split(':', 1)[0]
+
+def _name(node):
+    return node.split(':', 1)[1]
+
+class ScheduleGraph:
+    def __init__(self):
+        self.edges = defaultdict(set)
+        self.reverse = defaultdict(set)
+        self.kinds = defaultdict(set)
+        self._addresses = {}
+
+    def add_edge(self, source, target):
+        self.edges[source].add(target)
+        self.reverse[target].add(source)
+        self.kinds[_kind(source)].add(source)
+        self.kinds[_kind(target)].add(target)
+
+    # Distinct lower-case addresses of a Recipient text, parsed once per distinct text
+    def addresses(self, recipient):
+        if recipient not in self._addresses:
+            self._addresses[recipient] = sorted({f"{local}@{domain}".lower() for local, domain in _EMAIL.findall(recipient)})
+        return self._addresses[recipient]
+
+    @classmethod
+    def from_export(cls, df):
+        graph = cls()
+        df = add_job_and_report_names(df.copy())
+        columns = [df[col].tolist() for col in ['Name', 'Type', 'JobName', 'ReportName', 'Recipient', 'SearchPath']]
+        for name, row_type, job_name, report_name, recipient, search_path in zip(*columns):
+            if row_type == 'JobDefinition':
+                node = _node('job', name)
+            elif row_type == 'JobStepDefinition':
+                node = _node('step', name)
+            elif row_type == 'Schedule':
+                # Several schedules can deliver the same report; the search path tells them apart
+                node = _node('schedule', search_path if isinstance(search_path, str) else name)
+            else:
+                continue
+
+            if row_type != 'JobDefinition':
+                if isinstance(report_name, str) and report_name:
+                    graph.add_edge(node, _node('report', report_name))
+                if job_name:
+                    graph.add_edge(_node('job', job_name), node)
+            for address in graph.addresses(recipient):
+                graph.add_edge(node, _node('recipient', address))
+        return graph
+
+    def nodes(self, kind):
+        return sorted(self.kinds.get(kind, ()))
+
+    # Nodes reachable from start, following delivery edges (recipients are leaves and are not walked through)
+    def _reach(self, start, adjacency):
+        seen, stack = {start}, [start]
+        while stack:
+            node = stack.pop()
+            for next_node in adjacency.get(node, ()):
+                if next_node not in seen:
+                    seen.add(next_node)
+                    if _kind(next_node) != 'recipient':
+                        stack.append(next_node)
+        seen.discard(start)
+        return seen
+
+    def _select(self, nodes, kind):
+        return sorted(_name(node) for node in nodes if _kind(node) == kind)
+
+    # Reports triggered by a job (through its steps and schedules)
+    def reports_for_job(self, job):
+        return self._select(self._reach(_node('job', job), self.edges), 'report')
+
+    # Jobs, schedules and steps that deliver a report
+    def triggers_for_report(self, report):
+        upstream = self._reach(_node('report', report), self.reverse)
+        return {kind: self._select(upstream, kind) for kind in ('job', 'step', 'schedule')}
+
+    # Recipients reached by a job, step or schedule (its own recipients and those of everything it triggers),
+    # or by a report (the recipients of everything that delivers it)
+    def recipients_reached(self, node):
+        if _kind(node) == 'report':
+            senders = self._reach(node, self.reverse)
+        else:
+            senders = self._reach(node, self.edges) | {node}
+        recipients = set()
+        for sender in senders:
+            recipients.update(self._select(self.edges.get(sender, ()), 'recipient'))
+        return sorted(recipients)
+
+    # Fan-out of every job or schedule: reports triggered, distinct recipients reached and deliveries
+    # (report x recipient pairs per run), largest first, for sizing paginated capacity and subscription load
+    def fan_out(self, kind='schedule'):
+        rows = []
+        for node in self.nodes(kind):
+            reached = self._reach(node, self.edges)
+            reports = [item for item in reached if _kind(item) == 'report']
+            recipients = self.recipients_reached(node)
+            rows.append({kind: _name(node), 'reports': len(reports), 'recipients': len(recipients),
+                         'deliveries': len(reports) * len(recipients)})
+        fan_out = pd.DataFrame(rows, columns=[kind, 'reports', 'recipients', 'deliveries'])
+        return fan_out.sort_values(['deliveries', 'reports', kind], ascending=[False, False, True], ignore_index=True)
+
+    def summary(self):
+        return {kind: len(self.nodes(kind)) for kind in KINDS}
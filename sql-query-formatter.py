@@ -1,55 +1,149 @@
+# Cognos business layer SQL to PBI business layer SQL: underscores in quoted column aliases become spaces
+# (AS "Sales_Amount" -> AS "Sales Amount"). The query is lexed in one pass over comments, string literals and quoted
+# identifiers, so only a quoted alias directly after the AS keyword is changed; the same text inside string literals,
+# comments or other identifiers is kept.
+# Paste one query in the app, or rewrite a whole column (sqlQuery of the FM extractor output) from a CSV/Parquet file:
+#   python sql-query-formatter.py final_backend_data.csv --column sqlQuery --output final_backend_data_pbi.csv
+# Rewrites are memoised, as many query items share the SQL of their query subject.
+
 import streamlit as st
+from streamlit import runtime
+import pandas as pd
+import numpy as np
+import argparse
+import io
 import re
+from functools import lru_cache
+
+from sql_lineage import EXPRESSION_CACHE_SIZE
+
+DEFAULT_COLUMN = 'sqlQuery'
 
-st.set_page_config(layout="wide")
+# The AS keyword (not part of a longer word) with the comments/whitespace and the quoted alias after it; otherwise a
+# comment, string literal or quoted identifier, which is skipped whole. Other text is passed over by the regex engine
+# (the lookahead rejects positions that can't start a match before trying the alternatives).
+_ALIAS_PATTERN = re.compile(r"""(?=[AaNn'"\[`/-])(?:
+    (?P<keyword>(?<![\w@#$])AS(?![\w@#$])(?:\s|--[^\n]*\n|/\*.*?\*/)*)
+    (?P<alias>"(?:[^"]|"")*"|'(?:[^']|'')*'|\[(?:[^\]]|\]\])*\]|`[^`]*`)
+  | --[^\n]*|/\*.*?(?:\*/|\Z)
+  | [Nn]?'(?:[^']|'')*(?:'|\Z)
+  | "(?:[^"]|"")*"|\[(?:[^\]]|\]\])*\]|`[^`]*`)
+""", re.VERBOSE | re.DOTALL | re.IGNORECASE)
 
+def _replace_alias(match):
+    alias = match.group('alias')
+    if alias is None:
+        return match.group()
+    # Replace underscores with spaces in the alias
+    return match.group('keyword') + alias.replace('_', ' ')
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
 def process_sql_query(query):
-    # Regular expression to match AS clauses with quoted identifiers
-    pattern = r'(AS\s+)(["\'])(.+?)\2'
-    
-    def replace_underscore(match):
-        as_keyword = match.group(1)
-        quote = match.group(2)
-        alias = match.group(3)
-        # Replace underscores with spaces in the alias
-        alias = alias.replace('_', ' ')
-        return f"{as_keyword}{quote}{alias}{quote}"
-    
-    # Apply the transformation
-    processed_query = re.sub(pattern, replace_underscore, query, flags=re.IGNORECASE)
-    return processed_query
-
-# Streamlit app
-st.title("Cognos Biz Layer to PBI Biz Layer Query")
-
-# Instructions
-st.markdown("""
+    if '_' not in query:
+        return query
+    return _ALIAS_PATTERN.sub(_replace_alias, query)
+
+# Rewritten SQL of every value of a column: each distinct text is rewritten once, missing values are kept
+def process_sql_column(values):
+    values = pd.Series(values)
+    codes, uniques = pd.factorize(values)
+    rewritten = np.array([process_sql_query(value) if isinstance(value, str) else value for value in uniques] + [None],
+                         dtype=object)
+    result = rewritten[codes]
+    missing = codes == -1
+    result[missing] = values.to_numpy(dtype=object)[missing]
+    return pd.Series(result, index=values.index, name=values.name)
+
+def read_table(source):
+    name = getattr(source, 'name', source).lower()
+    if name.endswith('.parquet'):
+        return pd.read_parquet(source)
+    return pd.read_csv(source, dtype=str, keep_default_na=False)
+
+def process_table(df, column=DEFAULT_COLUMN):
+    if column not in df.columns:
+        raise ValueError(f"Column '{column}' not found; columns are: {list(df.columns)}")
+    df = df.copy()
+    df[column] = process_sql_column(df[column])
+    return df
+
+def main():
+    st.set_page_config(layout="wide")
+
+    # Streamlit app
+    st.title("Cognos Biz Layer to PBI Biz Layer Query")
+
+    # Instructions
+    st.markdown("""
 ### Instructions:
 1. Enter your business layer SQL query in the text area.
 2. Click the "Format Query" button.
 3. A side-by-side comparison of the original and formatted queries will be shown at the bottom.
+
+To format every query of a file (such as the FM extractor output), upload it below instead.
 """)
 
-# Input text area for SQL query
-input_query = st.text_area("Enter your SQL query:", height=200)
-
-if st.button("Format Query"):
-    if input_query:
-        # Process the query
-        formatted_query = process_sql_query(input_query)
-        
-        # Display the result
-        #st.subheader("Formatted Query:")
-        #st.code(formatted_query, language="sql")
-        
-        # Display side-by-side comparison
-        st.subheader("Side-by-Side Comparison:")
-        col1, col2 = st.columns(2)
-        with col1:
-            st.text("Original Query:")
-            st.code(input_query, language="sql")
-        with col2:
-            st.text("Formatted Query:")
-            st.code(formatted_query, language="sql")
+    # Input text area for SQL query
+    input_query = st.text_area("Enter your SQL query:", height=200)
+
+    if st.button("Format Query"):
+        if input_query:
+            # Process the query
+            formatted_query = process_sql_query(input_query)
+
+            # Display side-by-side comparison
+            st.subheader("Side-by-Side Comparison:")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.text("Original Query:")
+                st.code(input_query, language="sql")
+            with col2:
+                st.text("Formatted Query:")
+                st.code(formatted_query, language="sql")
+        else:
+            st.warning("Please enter a SQL query.")
+
+    # Batch mode: one column of a CSV/Parquet file
+    uploaded_file = st.file_uploader("Or format a column of queries", type=['csv', 'parquet'])
+    if uploaded_file is not None:
+        df = read_table(uploaded_file)
+        columns = list(df.columns)
+        column = st.selectbox("SQL column", columns,
+                              index=columns.index(DEFAULT_COLUMN) if DEFAULT_COLUMN in columns else 0)
+        formatted = process_table(df, column)
+        changed = int((formatted[column].fillna('') != df[column].fillna('')).sum())
+        st.success(f"{changed} of {len(df)} queries changed.")
+        st.dataframe(formatted)
+
+        output = io.BytesIO()
+        formatted.to_csv(output, index=False)
+        st.download_button(
+            label="Download Formatted Queries",
+            data=output.getvalue(),
+            file_name="formatted_queries.csv",
+            mime="text/csv"
+        )
+
+def cli():
+    parser = argparse.ArgumentParser(description="Rewrite business layer SQL aliases for Power BI")
+    parser.add_argument('input', help="CSV or Parquet file")
+    parser.add_argument('--column', default=DEFAULT_COLUMN, help="Column holding the SQL")
+    parser.add_argument('--output', help="Output file (default: <input>_pbi with the same extension)")
+    args = parser.parse_args()
+
+    df = read_table(args.input)
+    formatted = process_table(df, args.column)
+    stem, extension = (args.input.rsplit('.', 1) + [''])[:2]
+    output = args.output or f"{stem}_pbi.{extension or 'csv'}"
+    if output.lower().endswith('.parquet'):
+        formatted.to_parquet(output, index=False)
+    else:
+        formatted.to_csv(output, index=False)
+    changed = int((formatted[args.column].fillna('') != df[args.column].fillna('')).sum())
+    print(f"{changed} of {len(df)} queries changed, saved to: {output}")
+
+if __name__ == "__main__":
+    if runtime.exists():
+        main()
     else:
-        st.warning("Please enter a SQL query.")
+        cli()
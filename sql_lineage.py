@@ -0,0 +1,234 @@
+# Source-table lineage for SQL and Power Query (M) partition expressions
+# SQL is tokenized (comments, strings, "quoted"/[bracket]/`backtick` identifiers) and table references are read after
+# FROM / JOIN / APPLY, from comma-separated FROM lists and inside parenthesised join groups. CTE names, subqueries,
+# table functions, temp tables and FROM inside function calls (EXTRACT(YEAR FROM ...), IS DISTINCT FROM) are not
+# reported as tables.
+# M expressions are scanned for native SQL (Value.NativeQuery, Sql.Database(..., [Query="..."]) or any SQL text literal)
+# and for navigation steps such as Source{[Schema="dbo",Item="Sales"]}[Data].
+# Results are memoised per unique text, as many partitions share the same query.
+
+import re
+from functools import lru_cache
+
+EXPRESSION_CACHE_SIZE = 32768
+
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>[Nn]?'(?:[^']|'')*(?:'|\Z))
+  | (?P<quoted>"(?:[^"]|"")*"|\[(?:[^\]]|\]\])*\]|`[^`]*`)
+  | (?P<word>[^\W\d][\w@#$]*|[@#][\w@#$]*)
+  | (?P<number>\d+(?:\.\d*)?)
+  | (?P<symbol>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Words after which "(" opens a subquery or a list rather than a function call
+_KEYWORDS = {
+    'ALL', 'AND', 'ANY', 'APPLY', 'AS', 'BETWEEN', 'BY', 'CASE', 'CROSS', 'DISTINCT', 'ELSE', 'EXCEPT', 'EXISTS', 'FROM',
+    'FULL', 'GROUP', 'HAVING', 'IN', 'INNER', 'INTERSECT', 'INTO', 'IS', 'JOIN', 'LATERAL', 'LEFT', 'LIKE', 'MINUS',
+    'NOT', 'ON', 'OR', 'ORDER', 'OUTER', 'OVER', 'RECURSIVE', 'RIGHT', 'SELECT', 'SET', 'SOME', 'THEN', 'UNION',
+    'USING', 'VALUES', 'WHEN', 'WHERE', 'WITH',
+}
+
+# Keywords that end a FROM clause at the same nesting level
+_CLAUSE_END = {
+    'WHERE', 'GROUP', 'ORDER', 'HAVING', 'UNION', 'EXCEPT', 'INTERSECT', 'MINUS', 'LIMIT', 'WINDOW', 'QUALIFY', 'FETCH',
+    'OFFSET', 'FOR', 'OPTION', 'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'MERGE', 'PIVOT', 'UNPIVOT', 'RETURNING',
+}
+
+# Tokens as (kind, text, upper): kind is word, quoted, string, number or symbol; quoted identifiers are unquoted.
+# Whitespace and comments are dropped.
+def tokenize(sql):
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(sql):
+        kind = match.lastgroup
+        if kind in ('space', 'comment'):
+            continue
+        text = match.group()
+        if kind == 'quoted':
+            closing = {'"': '"', '[': ']', '`': '`'}[text[0]]
+            text = text[1:-1].replace(closing * 2, closing)
+        tokens.append((kind, text, text.upper() if kind == 'word' else text))
+    return tokens
+
+def _is_name(token):
+    return token[0] == 'quoted' or (token[0] == 'word' and token[2] not in _KEYWORDS)
+
+def _is_symbol(tokens, position, symbol):
+    return position < len(tokens) and tokens[position][0] == 'symbol' and tokens[position][1] == symbol
+
+# Index after the parenthesis that matches the one at position
+def _skip_parens(tokens, position):
+    depth = 0
+    for index in range(position, len(tokens)):
+        if tokens[index][0] == 'symbol':
+            if tokens[index][1] == '(':
+                depth += 1
+            elif tokens[index][1] == ')':
+                depth -= 1
+                if depth == 0:
+                    return index + 1
+    return len(tokens)
+
+# CTE names: a name after WITH / RECURSIVE / "," followed by an optional column list and AS (
+def _cte_names(tokens):
+    names = set()
+    for index, token in enumerate(tokens):
+        if not _is_name(token) or index == 0:
+            continue
+        previous = tokens[index - 1]
+        if previous[2] not in ('WITH', 'RECURSIVE') and not (previous[0] == 'symbol' and previous[1] == ','):
+            continue
+        position = index + 1
+        if _is_symbol(tokens, position, '('):
+            position = _skip_parens(tokens, position)
+        if position + 1 < len(tokens) and tokens[position][2] == 'AS' and _is_symbol(tokens, position + 1, '('):
+            names.add(token[1].lower())
+    return names
+
+# Qualified name starting at position ("db..table" keeps the empty part). Returns (parts, next position).
+def _read_name(tokens, position):
+    parts = []
+    while position < len(tokens):
+        if _is_name(tokens[position]):
+            parts.append(tokens[position][1])
+            position += 1
+        elif parts and _is_symbol(tokens, position, '.'):
+            parts.append('')
+        else:
+            break
+        if not _is_symbol(tokens, position, '.'):
+            break
+        position += 1
+    return parts, position
+
+# Tables referenced by a SQL query, sorted (first spelling kept when the same table appears in different case)
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def extract_tables(sql):
+    tokens = tokenize(sql)
+    ctes = _cte_names(tokens)
+    tables = {}
+
+    # One entry per open parenthesis: True when it belongs to a function call
+    function_parens = []
+    from_depths = set()
+    expect_table = False
+    position = 0
+    while position < len(tokens):
+        kind, text, upper = tokens[position]
+        depth = len(function_parens)
+
+        if expect_table:
+            expect_table = False
+            # Parenthesised join group, FROM (a JOIN b ON ...): its first table follows the parenthesis
+            if kind == 'symbol' and text == '(' and not (position + 1 < len(tokens)
+                                                         and tokens[position + 1][2] in ('SELECT', 'WITH')):
+                function_parens.append(False)
+                from_depths.add(depth + 1)
+                expect_table = True
+                position += 1
+                continue
+            if _is_name(tokens[position]):
+                parts, next_position = _read_name(tokens, position)
+                # A name followed by "(" is a table-valued function
+                if not _is_symbol(tokens, next_position, '('):
+                    name = '.'.join(parts)
+                    single = parts[-1].lower()
+                    if not (len(parts) == 1 and single in ctes) and parts[-1][:1] not in ('#', '@') and single != 'dual':
+                        tables.setdefault(name.lower(), name)
+                position = next_position
+                continue
+
+        if kind == 'symbol':
+            if text == '(':
+                previous = tokens[position - 1] if position else None
+                function_parens.append(previous is not None and _is_name(previous))
+            elif text == ')':
+                from_depths.discard(depth)
+                if function_parens:
+                    function_parens.pop()
+            elif text == ',' and depth in from_depths:
+                expect_table = True
+            elif text == ';':
+                from_depths.clear()
+        elif kind == 'word':
+            in_function = bool(function_parens) and function_parens[-1]
+            if upper == 'FROM' and not in_function:
+                before = [token[2] for token in tokens[max(0, position - 2):position]]
+                # a IS [NOT] DISTINCT FROM b
+                if not (before[-1:] == ['DISTINCT'] and before[:1] in (['IS'], ['NOT'])):
+                    from_depths.add(depth)
+                    expect_table = True
+            elif upper in ('JOIN', 'APPLY') and not in_function:
+                expect_table = True
+            elif upper in _CLAUSE_END:
+                from_depths.discard(depth)
+        position += 1
+
+    return tuple(sorted(tables.values(), key=str.lower))
+
+_M_STRING = re.compile(r'"((?:[^"]|"")*)"')
+_M_ESCAPE = re.compile(r'""|#\(([^)]*)\)')
+_M_ESCAPE_NAMES = {'lf': '\n', 'cr': '\r', 'tab': '\t', '#': '#('}
+_M_RECORD = re.compile(r'\{\s*\[([^\]]*)\]\s*\}')
+_M_FIELD = re.compile(r'(\w+)\s*=\s*"((?:[^"]|"")*)"')
+_M_QUERY_OPTION = re.compile(r'Query\s*=\s*', re.IGNORECASE)
+_SQL_TEXT = re.compile(r'\bSELECT\b.*?\bFROM\b', re.IGNORECASE | re.DOTALL)
+
+def _decode_m_escape(match):
+    if match.group() == '""':
+        return '"'
+    decoded = []
+    for item in match.group(1).split(','):
+        item = item.strip()
+        if item in _M_ESCAPE_NAMES:
+            decoded.append(_M_ESCAPE_NAMES[item])
+        elif len(item) in (4, 8) and all(char in '0123456789abcdefABCDEF' for char in item):
+            decoded.append(chr(int(item, 16)))
+        else:
+            return match.group()
+    return ''.join(decoded)
+
+# Text of an M string literal body: "" -> ", #(lf) / #(cr) / #(tab) / #(cr,lf) / #(000A) / #(#) escapes decoded
+def decode_m_string(literal):
+    return _M_ESCAPE.sub(_decode_m_escape, literal)
+
+# SQL texts of an M expression: [Query="..."] options and any literal containing SELECT ... FROM
+# (Value.NativeQuery arguments, query steps kept in variables)
+def m_sql_strings(expression):
+    queries = []
+    # Positions right after each Query= option, found in one pass: a literal starting there is the option's value
+    query_values = {option.end() for option in _M_QUERY_OPTION.finditer(expression)}
+    for match in _M_STRING.finditer(expression):
+        text = decode_m_string(match.group(1))
+        if match.start() in query_values or _SQL_TEXT.search(text):
+            queries.append(text)
+    return queries
+
+# Tables reached by navigation steps: {[Schema="dbo",Item="Sales"]} or a chain of {[Name=..., Kind=...]} steps
+def m_navigation_tables(expression):
+    tables = []
+    database = schema = None
+    for record in _M_RECORD.finditer(expression):
+        fields = {key.lower(): decode_m_string(value) for key, value in _M_FIELD.findall(record.group(1))}
+        kind = fields.get('kind', '').lower()
+        if 'item' in fields:
+            tables.append('.'.join(part for part in (fields.get('schema'), fields['item']) if part))
+        elif kind == 'database':
+            database, schema = fields.get('name'), None
+        elif kind == 'schema':
+            schema = fields.get('name')
+        elif kind in ('table', 'view') and 'name' in fields:
+            tables.append('.'.join(part for part in (database, schema, fields['name']) if part))
+    return tables
+
+# Every source table of an M partition expression (native SQL and navigation), sorted and de-duplicated
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def extract_m_tables(expression):
+    tables = {}
+    for sql in m_sql_strings(expression):
+        for table in extract_tables(sql):
+            tables.setdefault(table.lower(), table)
+    for table in m_navigation_tables(expression):
+        tables.setdefault(table.lower(), table)
+    return tuple(sorted(tables.values(), key=str.lower))
@@ -0,0 +1,13 @@
+# Checks of the friendly column alias rewrite of cognos_sql_translator.py
+# Run with: python -m pytest test_cognos_sql_translator.py
+
+from cognos_sql_translator import SqlTranslator
+
+def test_table_alias_is_kept():
+    sql = 'SELECT "T_1".ORD_ID AS "Order_Id" FROM [Prd DS].ORDERS AS "T_1" ORDER BY "Order_Id"'
+    assert SqlTranslator().translate(sql)['nativeSql'] == \
+        'SELECT "T_1".ORD_ID AS "Order Id" FROM "Prd DS".ORDERS AS "T_1" ORDER BY "Order Id"'
+
+def test_subquery_alias_is_kept():
+    sql = 'SELECT x."Net_Sales" FROM (SELECT a AS "Net_Sales" FROM t) x'
+    assert SqlTranslator().translate(sql)['nativeSql'] == sql
@@ -0,0 +1,322 @@
+# Power BI semantic model scaffolding from the FM extractor output (final_backend_data.csv)
+# Every Cognos query subject becomes a table: its query items become columns (data type from datatype, default
+# summarization from regularAggregate), aggregated items get a measure (sum -> SUM, count -> COUNTA, ...) and the
+# query subject SQL becomes an M Value.NativeQuery partition (cognos_sql_translator.py). Query subjects without SQL
+# (model query subjects) get an empty typed table as a placeholder source.
+# Output is a TMDL folder (definition/tables/<table>.tmdl, model.tmdl, expressions.tmdl, database.tmdl) or a model.bim;
+# tables are written one at a time as they are generated, so memory stays flat however large the model is.
+# Usage: python tmdl_generator.py final_backend_data.csv --output Model.SemanticModel/definition
+#            [--format bim --output model.bim] [--namespace "Database Layer"] [--connector teradata]
+#            [--server myserver --database EDW] [--no-measures]
+
+import argparse
+import json
+import os
+import re
+import time
+import uuid
+
+import pandas as pd
+
+from cognos_sql_translator import CONNECTORS, DEFAULT_CACHE, SqlTranslator, parse_schema_map
+
+COMPATIBILITY_LEVEL = 1567
+_LINEAGE_NAMESPACE = uuid.UUID('6f1c2a4e-5b0d-4c8e-9a57-0d3c1f2e8b61')
+
+# Cognos datatype -> (TMDL dataType, M type, format string)
+DATA_TYPES = {
+    'character': ('string', 'text', None), 'characterlength16': ('string', 'text', None),
+    'characterlength32': ('string', 'text', None), 'nchar': ('string', 'text', None),
+    'varchar': ('string', 'text', None), 'nvarchar': ('string', 'text', None), 'text': ('string', 'text', None),
+    'int16': ('int64', 'Int64.Type', '#,0'), 'int32': ('int64', 'Int64.Type', '#,0'),
+    'int64': ('int64', 'Int64.Type', '#,0'), 'integer': ('int64', 'Int64.Type', '#,0'),
+    'decimal': ('decimal', 'Currency.Type', '#,0.00'), 'numeric': ('decimal', 'Currency.Type', '#,0.00'),
+    'float32': ('double', 'number', '#,0.00'), 'float64': ('double', 'number', '#,0.00'),
+    'float': ('double', 'number', '#,0.00'), 'double': ('double', 'number', '#,0.00'),
+    'date': ('dateTime', 'date', 'Short Date'), 'datetime': ('dateTime', 'datetime', 'General Date'),
+    'timestamp': ('dateTime', 'datetime', 'General Date'), 'time': ('dateTime', 'time', 'Long Time'),
+    'boolean': ('boolean', 'logical', None),
+}
+DEFAULT_DATA_TYPE = ('string', 'text', None)
+
+# Cognos regularAggregate -> (summarizeBy, DAX function, measure name prefix)
+AGGREGATES = {
+    'sum': ('sum', 'SUM', 'Total'), 'total': ('sum', 'SUM', 'Total'),
+    'count': ('count', 'COUNTA', 'Count of'), 'countdistinct': ('distinctCount', 'DISTINCTCOUNT', 'Distinct Count of'),
+    'average': ('average', 'AVERAGE', 'Average'), 'maximum': ('max', 'MAX', 'Max'), 'minimum': ('min', 'MIN', 'Min'),
+}
+
+_PLAIN_NAME = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+def _is_missing(value):
+    return not isinstance(value, str) or value.strip() in ('', 'N/A')
+
+def _lineage_tag(*names):
+    return str(uuid.uuid5(_LINEAGE_NAMESPACE, '\0'.join(names)))
+
+# TMDL object name, quoted when it isn't a plain identifier
+def tmdl_name(name):
+    return name if _PLAIN_NAME.fullmatch(name) else "'" + name.replace("'", "''") + "'"
+
+# DAX table reference
+def dax_table(name):
+    return "'" + name.replace("'", "''") + "'"
+
+def _m_identifier(name):
+    return name if _PLAIN_NAME.fullmatch(name) else '#"' + name.replace('"', '""') + '"'
+
+# ---------- Model building ----------
+
+# Tables of the FM extractor output, one dict per query subject, yielded one by one
+def iter_tables(fm_df, translator, namespaces=None, measures=True):
+    items = fm_df[~fm_df['columnName'].map(_is_missing)]
+    if namespaces:
+        items = items[items['namespace'].isin(namespaces)]
+    # Tabular object names are case-insensitive, so names are compared case-folded
+    subject_counts = items.drop_duplicates(['namespace', 'table'])['table'].str.casefold().value_counts()
+    measure_names, table_names = set(), set()
+
+    for (namespace, subject), rows in items.groupby(['namespace', 'table'], sort=False):
+        # Query subjects with the same name in several namespaces are told apart by their namespace, and names
+        # that still clash (FACILITY / Facility in one namespace) by a number
+        base_name = subject if subject_counts[subject.casefold()] == 1 else f"{subject} ({namespace})"
+        name, number = base_name, 2
+        while name.casefold() in table_names:
+            name, number = f"{base_name} {number}", number + 1
+        table_names.add(name.casefold())
+        table = {'name': name, 'namespace': namespace, 'columns': [], 'measures': [], 'parameters': [],
+                 'warnings': []}
+        column_names = set(rows['columnName'].str.lower())
+        seen = set()
+        for row in rows.itertuples(index=False):
+            if row.columnName.lower() in seen:
+                continue
+            seen.add(row.columnName.lower())
+            data_type, m_type, format_string = DATA_TYPES.get(str(row.dataType).lower(), DEFAULT_DATA_TYPE)
+            summarize_by, dax_function, prefix = AGGREGATES.get(str(row.aggregate).lower(), ('none', None, None))
+            if data_type == 'string' and summarize_by != 'count':
+                summarize_by, dax_function = 'none', None
+            table['columns'].append({
+                'name': row.columnName,
+                'sourceColumn': row.columnName if _is_missing(row.externalColumnName) else row.externalColumnName,
+                'dataType': data_type, 'mType': m_type, 'formatString': format_string, 'summarizeBy': summarize_by,
+                'description': None if _is_missing(row.columnDescription) or
+                row.columnDescription == 'No description available' else row.columnDescription,
+            })
+            if measures and dax_function:
+                measure_name = f"{prefix} {row.columnName}"
+                if measure_name.lower() in measure_names or measure_name.lower() in column_names:
+                    measure_name = f"{measure_name} ({name})"
+                measure_names.add(measure_name.lower())
+                table['measures'].append({
+                    'name': measure_name,
+                    'expression': f"{dax_function}({dax_table(name)}[{row.columnName.replace(']', ']]')}])",
+                    'formatString': '#,0' if dax_function in ('COUNTA', 'DISTINCTCOUNT') else format_string,
+                })
+
+        sql = rows['sqlQuery'].iloc[0]
+        if _is_missing(sql):
+            table['source'] = _placeholder_source(table['columns'])
+            table['warnings'].append("No SQL in the FM model: placeholder source")
+        else:
+            translation = translator.translate(sql)
+            table['source'] = translation['mExpression']
+            table['parameters'] = translation['parameters']
+            table['warnings'].extend(translation['warnings'])
+        yield table
+
+def _placeholder_source(columns):
+    fields = ', '.join(f"{_m_identifier(column['name'])} = {column['mType']}" for column in columns)
+    return f"let\n    Source = #table(type table [{fields}], {{}})\nin\n    Source"
+
+# ---------- TMDL ----------
+
+def _description_lines(description, indent):
+    return [f"{indent}/// {line}" for line in description.splitlines()] if description else []
+
+def _expression_lines(expression, indent):
+    return [f"{indent}{line}" for line in expression.splitlines()]
+
+def table_tmdl(table):
+    name = table['name']
+    lines = [f"table {tmdl_name(name)}", f"\tlineageTag: {_lineage_tag(name)}", ""]
+    for measure in table['measures']:
+        lines.append(f"\tmeasure {tmdl_name(measure['name'])} = {measure['expression']}")
+        if measure['formatString']:
+            lines.append(f"\t\tformatString: {measure['formatString']}")
+        lines += [f"\t\tlineageTag: {_lineage_tag(name, 'measure', measure['name'])}", ""]
+    for column in table['columns']:
+        lines += _description_lines(column['description'], '\t')
+        lines += [f"\tcolumn {tmdl_name(column['name'])}", f"\t\tdataType: {column['dataType']}"]
+        if column['formatString']:
+            lines.append(f"\t\tformatString: {column['formatString']}")
+        lines += [f"\t\tlineageTag: {_lineage_tag(name, 'column', column['name'])}",
+                  f"\t\tsummarizeBy: {column['summarizeBy']}",
+                  f"\t\tsourceColumn: {column['sourceColumn']}", "",
+                  "\t\tannotation SummarizationSetBy = Automatic", ""]
+    lines += [f"\tpartition {tmdl_name(name)} = m", "\t\tmode: import", "\t\tsource ="]
+    lines += _expression_lines(table['source'], '\t\t\t\t')
+    lines.append("")
+    if table['warnings']:
+        lines.append(f"\tannotation CognosMigrationWarnings = {' | '.join(table['warnings'])}")
+        lines.append("")
+    return '\n'.join(lines)
+
+def _parameter_value(parameter):
+    default = parameter.get('default')
+    if parameter['type'] == 'number':
+        try:
+            return str(float(default)).removesuffix('.0'), 'Number'
+        except (TypeError, ValueError):
+            return '0', 'Number'
+    return json.dumps(default or ''), 'Text'
+
+# M parameters: Server and Database plus the prompt parameters of the translated queries
+def _parameters(server, database, prompt_parameters):
+    parameters = [('Server', json.dumps(server), 'Text'), ('Database', json.dumps(database), 'Text')]
+    for parameter in prompt_parameters.values():
+        value, m_type = _parameter_value(parameter)
+        parameters.append((parameter['name'], value, m_type))
+    return parameters
+
+def expressions_tmdl(parameters):
+    lines = []
+    for name, value, m_type in parameters:
+        lines += [f"expression {tmdl_name(name)} = {value} meta [IsParameterQuery=true, Type=\"{m_type}\", "
+                  f"IsParameterQueryRequired=true]",
+                  f"\tlineageTag: {_lineage_tag('expression', name)}", ""]
+    return '\n'.join(lines)
+
+def _write(path, text):
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(text)
+
+class TmdlWriter:
+    def __init__(self, folder):
+        self.folder = folder
+        self.table_names = []
+        self.file_names = set()
+        os.makedirs(os.path.join(folder, 'tables'), exist_ok=True)
+
+    # File names are kept unique case-insensitively too (Windows and macOS file systems), after replacing the
+    # characters file names can't hold
+    def add_table(self, table):
+        stem = re.sub(r'[\\/:*?"<>|]', '_', table['name'])
+        file_name, number = f"{stem}.tmdl", 2
+        while file_name.casefold() in self.file_names:
+            file_name, number = f"{stem}_{number}.tmdl", number + 1
+        self.file_names.add(file_name.casefold())
+        _write(os.path.join(self.folder, 'tables', file_name), table_tmdl(table))
+        self.table_names.append(table['name'])
+
+    def close(self, parameters):
+        _write(os.path.join(self.folder, 'database.tmdl'), f"database\n\tcompatibilityLevel: {COMPATIBILITY_LEVEL}\n")
+        _write(os.path.join(self.folder, 'expressions.tmdl'), expressions_tmdl(parameters))
+        lines = ["model Model", "\tculture: en-US", "\tdefaultPowerBIDataSourceVersion: powerBI_V3",
+                 "\tsourceQueryCulture: en-US", "\tdataAccessOptions", "\t\tlegacyRedirects",
+                 "\t\treturnErrorValuesAsNull", ""]
+        lines += [f"ref table {tmdl_name(name)}" for name in self.table_names]
+        lines += [f"ref expression {tmdl_name(name)}" for name, _, _ in parameters]
+        _write(os.path.join(self.folder, 'model.tmdl'), '\n'.join(lines) + '\n')
+
+# ---------- model.bim ----------
+
+def table_bim(table):
+    name = table['name']
+    columns = []
+    for column in table['columns']:
+        item = {'name': column['name'], 'dataType': column['dataType'], 'sourceColumn': column['sourceColumn'],
+                'lineageTag': _lineage_tag(name, 'column', column['name']), 'summarizeBy': column['summarizeBy'],
+                'annotations': [{'name': 'SummarizationSetBy', 'value': 'Automatic'}]}
+        if column['formatString']:
+            item['formatString'] = column['formatString']
+        if column['description']:
+            item['description'] = column['description']
+        columns.append(item)
+    measures = [{'name': measure['name'], 'expression': measure['expression'],
+                 'lineageTag': _lineage_tag(name, 'measure', measure['name']),
+                 **({'formatString': measure['formatString']} if measure['formatString'] else {})}
+                for measure in table['measures']]
+    result = {'name': name, 'lineageTag': _lineage_tag(name), 'columns': columns,
+              'partitions': [{'name': name, 'mode': 'import',
+                              'source': {'type': 'm', 'expression': table['source'].splitlines()}}]}
+    if measures:
+        result['measures'] = measures
+    if table['warnings']:
+        result['annotations'] = [{'name': 'CognosMigrationWarnings', 'value': ' | '.join(table['warnings'])}]
+    return result
+
+# model.bim written as a stream: the header, then each table as it comes, then the parameters
+class BimWriter:
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write('{\n  "name": "SemanticModel",\n  "compatibilityLevel": %d,\n  "model": {\n'
+                        '    "culture": "en-US",\n'
+                        '    "dataAccessOptions": {"legacyRedirects": true, "returnErrorValuesAsNull": true},\n'
+                        '    "defaultPowerBIDataSourceVersion": "powerBI_V3",\n'
+                        '    "tables": [' % COMPATIBILITY_LEVEL)
+        self.table_count = 0
+
+    def add_table(self, table):
+        self.file.write(',\n' if self.table_count else '\n')
+        self.file.write(json.dumps(table_bim(table), indent=2))
+        self.table_count += 1
+
+    def close(self, parameters):
+        expressions = [{'name': name, 'kind': 'm', 'lineageTag': _lineage_tag('expression', name),
+                        'expression': f"{value} meta [IsParameterQuery=true, Type=\"{m_type}\", "
+                                      f"IsParameterQueryRequired=true]"}
+                       for name, value, m_type in parameters]
+        self.file.write('\n    ],\n    "expressions": ' + json.dumps(expressions, indent=2) + '\n  }\n}\n')
+        self.file.close()
+
+# Write the semantic model of an FM extractor output. Returns counts of tables, columns, measures and warnings.
+def generate_model(fm_df, output, output_format='tmdl', translator=None, namespaces=None, measures=True,
+                   server='server', database='database'):
+    translator = translator or SqlTranslator(friendly_aliases=False)
+    writer = BimWriter(output) if output_format == 'bim' else TmdlWriter(output)
+    counts = {'tables': 0, 'columns': 0, 'measures': 0, 'warnings': 0}
+    prompt_parameters = {}
+    try:
+        for table in iter_tables(fm_df, translator, namespaces, measures):
+            writer.add_table(table)
+            for parameter in table['parameters']:
+                prompt_parameters.setdefault(parameter['name'], parameter)
+            counts['tables'] += 1
+            counts['columns'] += len(table['columns'])
+            counts['measures'] += len(table['measures'])
+            counts['warnings'] += bool(table['warnings'])
+    finally:
+        writer.close(_parameters(server, database, prompt_parameters))
+        translator.save()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a Power BI semantic model (TMDL or model.bim) from the "
+                                                 "FM extractor output")
+    parser.add_argument('input', help="FM extractor output (final_backend_data.csv)")
+    parser.add_argument('--output', default='Model.SemanticModel/definition',
+                        help="TMDL definition folder, or the model.bim file with --format bim")
+    parser.add_argument('--format', default='tmdl', choices=['tmdl', 'bim'])
+    parser.add_argument('--namespace', action='append', help="Only query subjects of this namespace (repeatable)")
+    parser.add_argument('--connector', default='sql', choices=sorted(CONNECTORS))
+    parser.add_argument('--schema-map', help="Data source to schema names: 'Data source=schema,...'")
+    parser.add_argument('--server', default='server', help="Value of the Server parameter")
+    parser.add_argument('--database', default='database', help="Value of the Database parameter")
+    parser.add_argument('--no-measures', action='store_true', help="Only tables and columns")
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help="SQL translation cache file ('' to disable)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    # Aliases are kept as they are, so the sourceColumn of each column matches the query output
+    translator = SqlTranslator(args.connector, parse_schema_map(args.schema_map), friendly_aliases=False,
+                               cache_path=args.cache or None)
+    fm_df = pd.read_csv(args.input, dtype=str, keep_default_na=False)
+    counts = generate_model(fm_df, args.output, args.format, translator, args.namespace, not args.no_measures,
+                            args.server, args.database)
+    print(f"{counts['tables']} tables, {counts['columns']} columns, {counts['measures']} measures "
+          f"({counts['warnings']} tables with warnings) written to: {args.output} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
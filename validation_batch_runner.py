@@ -0,0 +1,159 @@
+# Headless batch mode for the validation report generator
+# Expects a CSV manifest with columns model|report|workbook (workbook = path to the xlsx with "Cognos" and "PBI" sheets,
+# relative paths are resolved against the manifest folder)
+# Usage: python validation_batch_runner.py manifest.csv --output-dir validation_output --workers 8
+
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+from validation_report import (DEFAULT_ABS_TOL, DEFAULT_REL_TOL, build_mismatch_index, checklist_df, column_checklist,
+                               convert_possible_numeric, generate_diff_checker, generate_validation_report,
+                               mismatch_mask, read_columns, read_table, standardize_text_columns,
+                               write_report_workbook)
+
+SUMMARY_COLUMNS = ['model', 'report', 'workbook', 'status', 'cognos_rows', 'pbi_rows', 'report_rows',
+                   'mismatched_rows', 'measures', 'read_seconds', 'validate_seconds', 'write_seconds',
+                   'total_seconds', 'output', 'error']
+
+_UNSAFE_NAME_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+# Manifest value made safe for a file name (path separators and characters Windows rejects become "_")
+def _safe_name(value):
+    return _UNSAFE_NAME_CHARS.sub('_', str(value)).strip(' .') or '_'
+
+# Report file name of each manifest row; rows with the same model/report get their manifest row number appended,
+# so no report overwrites another
+def output_file_names(manifest, today_date):
+    names, taken = [], set()
+    for position, row in enumerate(manifest.itertuples(index=False)):
+        stem = f"{_safe_name(row.model)}_{_safe_name(row.report)}_ValidationReport_{today_date}"
+        if stem.lower() in taken:
+            stem = f"{stem}_{position + 1}"
+        taken.add(stem.lower())
+        names.append(f"{stem}.xlsx")
+    return names
+
+# Validate one (model, report, workbook) row of the manifest and write its Excel report to output_path.
+# Runs in a worker process; errors are returned in the summary row instead of stopping the batch.
+def validate_workbook(model, report, workbook, output_path, abs_tol, rel_tol, mismatches_only):
+    summary = {'model': model, 'report': report, 'workbook': workbook}
+    start = time.perf_counter()
+    try:
+        cognos_columns = read_columns(workbook, 'Cognos')
+        pbi_columns = read_columns(workbook, 'PBI')
+        usecols = [col for col in cognos_columns if col in pbi_columns]
+        cognos_df = read_table(workbook, 'Cognos', usecols=usecols)
+        pbi_df = read_table(workbook, 'PBI', usecols=usecols)
+        read_done = time.perf_counter()
+
+        cognos_df, _ = convert_possible_numeric(cognos_df)
+        pbi_df, _ = convert_possible_numeric(pbi_df)
+        cognos_df = standardize_text_columns(cognos_df)
+        pbi_df = standardize_text_columns(pbi_df)
+
+        validation_report, cognos_agg, pbi_agg = generate_validation_report(cognos_df, pbi_df, abs_tol, rel_tol)
+        diff_checker_df = generate_diff_checker(validation_report)
+        column_checklist_df = column_checklist(pd.DataFrame(columns=cognos_columns), pd.DataFrame(columns=pbi_columns))
+        mask = mismatch_mask(validation_report)
+        validate_done = time.perf_counter()
+
+        if mismatches_only:
+            mismatched = validation_report[mask]
+            cognos_agg = cognos_agg[cognos_agg['unique_key'].isin(mismatched['unique_key'])]
+            pbi_agg = pbi_agg[pbi_agg['unique_key'].isin(mismatched['unique_key'])]
+            validation_report = mismatched
+
+        write_report_workbook([
+            ('Checklist', checklist_df),
+            ('Cognos', cognos_agg),
+            ('PBI', pbi_agg),
+            ('Validation_Report', validation_report),
+            ('Column Checklist', column_checklist_df),
+            ('Diff Checker', diff_checker_df),
+            ('Mismatch Index', build_mismatch_index(validation_report)),
+        ], output_path)
+        write_done = time.perf_counter()
+
+        summary.update({
+            'status': 'PASS' if not mask.any() else 'FAIL',
+            'cognos_rows': len(cognos_df),
+            'pbi_rows': len(pbi_df),
+            'report_rows': len(mask),
+            'mismatched_rows': int(mask.sum()),
+            'measures': sum(col.endswith('_Diff') for col in validation_report.columns),
+            'read_seconds': round(read_done - start, 2),
+            'validate_seconds': round(validate_done - read_done, 2),
+            'write_seconds': round(write_done - validate_done, 2),
+            'output': output_path,
+        })
+    except Exception as e:
+        summary.update({'status': 'ERROR', 'error': str(e)})
+
+    summary['total_seconds'] = round(time.perf_counter() - start, 2)
+    return summary
+
+# Run every manifest row in a process pool and return the summary table (in manifest order)
+def run_batch(manifest_path, output_dir, workers=None, abs_tol=DEFAULT_ABS_TOL, rel_tol=DEFAULT_REL_TOL,
+              mismatches_only=False):
+    manifest = pd.read_csv(manifest_path)
+    missing_cols = [col for col in ['model', 'report', 'workbook'] if col not in manifest.columns]
+    if missing_cols:
+        raise ValueError(f"Manifest is missing required columns: {missing_cols}")
+
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    os.makedirs(output_dir, exist_ok=True)
+
+    today_date = datetime.today().strftime('%Y-%m-%d')
+    file_names = output_file_names(manifest, today_date)
+
+    results = [None] * len(manifest)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for position, row in enumerate(manifest.itertuples(index=False)):
+            workbook = os.path.join(manifest_dir, str(row.workbook))
+            future = executor.submit(validate_workbook, str(row.model), str(row.report), workbook,
+                                     os.path.join(output_dir, file_names[position]), abs_tol, rel_tol,
+                                     mismatches_only)
+            futures[future] = position
+
+        for future in as_completed(futures):
+            summary = future.result()
+            results[futures[future]] = summary
+            print(f"[{summary['status']}] {summary['model']} / {summary['report']} ({summary['total_seconds']}s)")
+
+    summary_df = pd.DataFrame(results, columns=SUMMARY_COLUMNS)
+    # Counts stay integers even when some rows errored
+    count_columns = ['cognos_rows', 'pbi_rows', 'report_rows', 'mismatched_rows', 'measures']
+    summary_df[count_columns] = summary_df[count_columns].astype('Int64')
+    return summary_df
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate many Cognos/PBI report pairs from a manifest")
+    parser.add_argument('manifest', help="CSV with columns model, report, workbook")
+    parser.add_argument('--output-dir', default='validation_output')
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--abs-tol', type=float, default=DEFAULT_ABS_TOL)
+    parser.add_argument('--rel-tol', type=float, default=DEFAULT_REL_TOL)
+    parser.add_argument('--mismatches-only', action='store_true', help="Only write mismatching rows to each report")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary_df = run_batch(args.manifest, args.output_dir, args.workers, args.abs_tol, args.rel_tol,
+                           args.mismatches_only)
+
+    summary_path = os.path.join(args.output_dir, 'validation_batch_summary.csv')
+    summary_df.to_csv(summary_path, index=False)
+
+    counts = summary_df['status'].value_counts()
+    print(f"\n{len(summary_df)} reports in {time.perf_counter() - start:.1f}s: "
+          f"{counts.get('PASS', 0)} passed, {counts.get('FAIL', 0)} failed, {counts.get('ERROR', 0)} errors")
+    print(f"Summary saved to: {summary_path}")
+
+if __name__ == "__main__":
+    main()
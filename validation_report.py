@@ -1,32 +1,153 @@
-
 import streamlit as st
 import pandas as pd
-import io
+import os
+import tempfile
 import numpy as np
+import openpyxl
 from datetime import datetime
 
-# Function to strip leading zeros and convert to numeric if applicable
-def strip_leading_zeros(val):
-    try:
-        if isinstance(val, str):
-            val = val.strip().replace(',', '')
-            if val.replace('.', '', 1).isdigit() or \
-               (val.startswith('-') and val[1:].replace('.', '', 1).isdigit()):
-                return float(val)
-        return val
-    except:
-        return val
-
-# Apply numeric cleaning only on likely numeric columns
-def convert_possible_numeric(df):
+# Optional fast Excel backend (pip install python-calamine), used by pandas when available
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+# Optional constant-memory Excel writer (pip install xlsxwriter), openpyxl write-only mode otherwise
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# Numeric-looking text: optional sign, digits with at most one decimal point (commas stripped first)
+NUMERIC_PATTERN = r'^-?(?:\d+\.?\d*|\.\d+)$'
+
+# Clean a text column so it can be parsed as numbers (trim spaces, drop thousand separators)
+def _clean_numeric_text(series):
+    return series.astype(str).str.strip().str.replace(',', '', regex=False)
+
+# Apply numeric cleaning only on likely numeric columns.
+# Each text column is first checked on a sample of its non-null values; only columns whose
+# sample looks fully numeric are converted, column-wise, with to_numeric(errors='coerce').
+# If the full column then has values that could not be parsed, the original text is kept.
+# Returns the converted frame and a per-column report of what was done.
+def convert_possible_numeric(df, sample_size=1000):
+    report = []
     for col in df.columns:
-        df[col] = df[col].apply(strip_leading_zeros)
-        try:
-            df[col] = pd.to_numeric(df[col], errors='ignore')
-        except:
-            pass
+        series = df[col]
+        if series.dtype != 'object':
+            report.append({'Column': col, 'Action': 'already typed', 'Dtype': str(series.dtype), 'Converted Values': 0})
+            continue
+
+        non_null = series.dropna()
+        if non_null.empty:
+            report.append({'Column': col, 'Action': 'empty', 'Dtype': str(series.dtype), 'Converted Values': 0})
+            continue
+
+        sample = non_null.sample(sample_size, random_state=0) if len(non_null) > sample_size else non_null
+        if not _clean_numeric_text(sample).str.match(NUMERIC_PATTERN).all():
+            report.append({'Column': col, 'Action': 'kept as text', 'Dtype': str(series.dtype), 'Converted Values': 0})
+            continue
+
+        converted = pd.to_numeric(_clean_numeric_text(non_null), errors='coerce')
+        failed = int(converted.isna().sum())
+        if failed:
+            # Sample looked numeric but the full column does not: fall back to the original text
+            report.append({'Column': col, 'Action': f'kept as text ({failed} non-numeric values)',
+                           'Dtype': str(series.dtype), 'Converted Values': 0})
+            continue
+
+        df[col] = converted.reindex(series.index)
+        report.append({'Column': col, 'Action': 'converted to numeric', 'Dtype': str(df[col].dtype),
+                       'Converted Values': len(converted)})
+
+    return df, pd.DataFrame(report, columns=['Column', 'Action', 'Dtype', 'Converted Values'])
+
+# Standardize text columns (upper case, trimmed) in one pass over the remaining object columns only
+def standardize_text_columns(df):
+    text_columns = df.columns[df.dtypes == 'object']
+    for col in text_columns:
+        df[col] = df[col].str.upper().str.strip()
     return df
 
+# Work out the input type from the file name (path or uploaded file)
+def _source_kind(source):
+    name = source if isinstance(source, str) else getattr(source, 'name', '')
+    extension = os.path.splitext(name)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.parquet', '.pq'):
+        return 'parquet'
+    return 'excel'
+
+# Uploaded files are read several times (header first, then data), so rewind them before each read
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return source
+
+# Fastest Excel engine installed: calamine when available, otherwise openpyxl in read-only mode
+def default_excel_engine():
+    return 'calamine' if python_calamine is not None else 'openpyxl-readonly'
+
+# Column names of one input without loading its data
+def read_columns(source, sheet_name=None):
+    kind = _source_kind(source)
+    if kind == 'csv':
+        return pd.read_csv(_rewind(source), nrows=0).columns.tolist()
+    if kind == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_schema(_rewind(source)).names
+
+    workbook = openpyxl.load_workbook(_rewind(source), read_only=True, data_only=True)
+    try:
+        header = next(workbook[sheet_name].iter_rows(max_row=1, values_only=True), ())
+    finally:
+        workbook.close()
+    return [col if col is not None else f'Unnamed: {i}' for i, col in enumerate(header)]
+
+# Stream a sheet row by row with openpyxl's read-only mode, keeping only the requested columns
+def _read_excel_readonly(source, sheet_name, usecols=None):
+    workbook = openpyxl.load_workbook(_rewind(source), read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        header = [col if col is not None else f'Unnamed: {i}' for i, col in enumerate(header)]
+        positions = [i for i, col in enumerate(header) if usecols is None or col in usecols]
+        width = len(header)
+
+        data = []
+        for row in rows:
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            data.append([row[i] for i in positions])
+    finally:
+        workbook.close()
+
+    # Drop trailing blank rows, as read_excel does
+    while data and all(value is None for value in data[-1]):
+        data.pop()
+    return pd.DataFrame(data, columns=[header[i] for i in positions])
+
+# Read one input table (an Excel sheet, a CSV or a Parquet file), optionally only some columns.
+# engine: 'calamine', 'openpyxl-readonly' or 'openpyxl' (pandas default); defaults to the fastest installed.
+# Only empty cells are missing values, so text such as the "NA" region is kept on every backend.
+def read_table(source, sheet_name=None, usecols=None, engine=None):
+    kind = _source_kind(source)
+    if kind == 'csv':
+        return pd.read_csv(_rewind(source), usecols=(lambda col: col in usecols) if usecols else None,
+                           keep_default_na=False, na_values=[''])
+    if kind == 'parquet':
+        return pd.read_parquet(_rewind(source), columns=list(usecols) if usecols else None)
+
+    engine = engine or default_excel_engine()
+    if engine == 'openpyxl-readonly':
+        return _read_excel_readonly(source, sheet_name, usecols)
+    return pd.read_excel(_rewind(source), sheet_name=sheet_name, engine=engine,
+                         usecols=(lambda col: col in usecols) if usecols else None,
+                         keep_default_na=False, na_values=[''])
+
 # Define the checklist data as a DataFrame
 checklist_data = {
     "S.No": range(1, 27),
@@ -63,7 +184,19 @@ checklist_data = {
 }
 checklist_df = pd.DataFrame(checklist_data)
 
-def generate_validation_report(cognos_df, pbi_df):
+# Default tolerance for treating PBI and Cognos values as equal (absorbs floating-point noise)
+DEFAULT_ABS_TOL = 1e-9
+DEFAULT_REL_TOL = 1e-9
+
+# Vectorised tolerance check: |PBI - Cognos| > max(abs_tol, rel_tol * max(|Cognos|, |PBI|))
+def measure_mismatch(cognos_values, pbi_values, abs_tol=DEFAULT_ABS_TOL, rel_tol=DEFAULT_REL_TOL):
+    cognos_values = np.nan_to_num(np.asarray(cognos_values, dtype=float))
+    pbi_values = np.nan_to_num(np.asarray(pbi_values, dtype=float))
+    allowed = np.maximum(abs_tol, rel_tol * np.maximum(np.abs(cognos_values), np.abs(pbi_values)))
+    return np.abs(pbi_values - cognos_values) > allowed
+
+# tolerances optionally overrides the tolerance per measure: {measure: (abs_tol, rel_tol)}
+def generate_validation_report(cognos_df, pbi_df, abs_tol=DEFAULT_ABS_TOL, rel_tol=DEFAULT_REL_TOL, tolerances=None):
     dims = [col for col in cognos_df.columns if col in pbi_df.columns and 
             (cognos_df[col].dtype == 'object' or '_id' in col.lower() or '_key' in col.lower() or
              '_ID' in col or '_KEY' in col)]
@@ -90,11 +223,10 @@ def generate_validation_report(cognos_df, pbi_df):
         validation_report[dim] = validation_report['unique_key'].map(dict(zip(cognos_agg['unique_key'], cognos_agg[dim])))
         validation_report[dim].fillna(validation_report['unique_key'].map(dict(zip(pbi_agg['unique_key'], pbi_agg[dim]))), inplace=True)
 
-    validation_report['presence'] = validation_report['unique_key'].apply(
-        lambda key: 'Present in Both' if key in cognos_agg['unique_key'].values and key in pbi_agg['unique_key'].values
-        else ('Present in Cognos' if key in cognos_agg['unique_key'].values
-              else 'Present in PBI')
-    )
+    in_cognos = validation_report['unique_key'].isin(cognos_agg['unique_key'])
+    in_pbi = validation_report['unique_key'].isin(pbi_agg['unique_key'])
+    validation_report['presence'] = np.select([in_cognos & in_pbi, in_cognos],
+                                              ['Present in Both', 'Present in Cognos'], 'Present in PBI')
 
     for measure in all_measures:
         validation_report[f'{measure}_Cognos'] = validation_report['unique_key'].map(dict(zip(cognos_agg['unique_key'], cognos_agg[measure])))
@@ -102,8 +234,12 @@ def generate_validation_report(cognos_df, pbi_df):
 
         validation_report[f'{measure}_Diff'] = validation_report[f'{measure}_PBI'].fillna(0) - validation_report[f'{measure}_Cognos'].fillna(0)
 
+        measure_abs_tol, measure_rel_tol = (tolerances or {}).get(measure, (abs_tol, rel_tol))
+        validation_report[f'{measure}_Mismatch'] = measure_mismatch(
+            validation_report[f'{measure}_Cognos'], validation_report[f'{measure}_PBI'], measure_abs_tol, measure_rel_tol)
+
     column_order = ['unique_key'] + dims + ['presence'] +                    [col for measure in all_measures for col in 
-                    [f'{measure}_Cognos', f'{measure}_PBI', f'{measure}_Diff']]
+                    [f'{measure}_Cognos', f'{measure}_PBI', f'{measure}_Diff', f'{measure}_Mismatch']]
     validation_report = validation_report[column_order]
 
     return validation_report, cognos_agg, pbi_agg
@@ -121,22 +257,122 @@ def column_checklist(cognos_df, pbi_df):
     
     return checklist_df
 
-def generate_diff_checker(validation_report):
+# Mismatch flags of one measure: the tolerance check when present, otherwise any non-zero difference
+def _measure_mismatches(validation_report, measure):
+    if f'{measure}_Mismatch' in validation_report.columns:
+        return validation_report[f'{measure}_Mismatch'].to_numpy(dtype=bool)
+    return validation_report[f'{measure}_Diff'].to_numpy() != 0
+
+# Positions of the top_n largest values in candidates, largest first, without sorting everything
+def _top_n_positions(values, candidates, top_n):
+    if top_n <= 0 or len(candidates) == 0:
+        return candidates[:0]
+    if len(candidates) > top_n:
+        candidates = candidates[np.argpartition(-values[candidates], top_n - 1)[:top_n]]
+    return candidates[np.argsort(-values[candidates], kind='stable')]
+
+def generate_diff_checker(validation_report, top_n=5):
     diff_columns = [col for col in validation_report.columns if col.endswith('_Diff')]
-
-    diff_checker = pd.DataFrame({
-        'Diff Column Name': diff_columns,
-        'Sum of Difference': [validation_report[col].sum() for col in diff_columns]
-    })
+    keys = validation_report['unique_key'].to_numpy()
+
+    rows = []
+    for col in diff_columns:
+        measure = col[:-len('_Diff')]
+        abs_diff = np.nan_to_num(validation_report[col].abs().to_numpy(dtype=float))
+        mismatches = np.flatnonzero(_measure_mismatches(validation_report, measure))
+        worst = _top_n_positions(abs_diff, mismatches, top_n)
+        rows.append({
+            'Diff Column Name': col,
+            'Sum of Difference': validation_report[col].sum(),
+            'Sum of Absolute Difference': abs_diff.sum(),
+            'Max Absolute Difference': abs_diff.max() if len(abs_diff) else 0,
+            'Mismatch Count': len(mismatches),
+            f'Top {top_n} Mismatch Keys': ', '.join(str(key) for key in keys[worst])
+        })
+    diff_checker = pd.DataFrame(rows, columns=['Diff Column Name', 'Sum of Difference', 'Sum of Absolute Difference',
+                                               'Max Absolute Difference', 'Mismatch Count', f'Top {top_n} Mismatch Keys'])
 
     presence_summary = {
         'Diff Column Name': 'All rows present in both',
-        'Sum of Difference': 'Yes' if all(validation_report['presence'] == 'Present in Both') else 'No'
+        'Sum of Difference': 'Yes' if all(validation_report['presence'] == 'Present in Both') else 'No',
+        'Mismatch Count': int((validation_report['presence'] != 'Present in Both').sum())
     }
     diff_checker = pd.concat([diff_checker, pd.DataFrame([presence_summary])], ignore_index=True)
 
     return diff_checker
 
+# Compact list of the rows to review: their row number in the Validation_Report sheet (header is row 1),
+# key, presence and the measures outside tolerance
+def build_mismatch_index(validation_report):
+    measures = [col[:-len('_Diff')] for col in validation_report.columns if col.endswith('_Diff')]
+    positions = np.flatnonzero(mismatch_mask(validation_report).to_numpy())
+    mismatched = validation_report.iloc[positions]
+
+    failing = pd.Series('', index=mismatched.index)
+    for measure in measures:
+        flags = _measure_mismatches(mismatched, measure)
+        failing = failing.where(~flags, failing + measure + ', ')
+
+    return pd.DataFrame({
+        'Excel Row': positions + 2,
+        'unique_key': mismatched['unique_key'].to_numpy(),
+        'presence': mismatched['presence'].to_numpy(),
+        'Failing Measures': failing.str.rstrip(', ').to_numpy()
+    })
+
+# Rows of a sheet as plain tuples, header first, converted chunk by chunk (NaN/NaT become blank cells)
+def _iter_sheet_rows(df, chunk_size=50000):
+    yield [str(col) for col in df.columns]
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        yield from chunk.itertuples(index=False, name=None)
+
+# Write the report sheets row by row to an .xlsx file on disk instead of building it in memory.
+# sheets is a list of (sheet name, DataFrame). Uses xlsxwriter's constant_memory mode when installed,
+# otherwise openpyxl's write-only mode. Returns the path of the written file (a temp file by default).
+def write_report_workbook(sheets, path=None):
+    if path is None:
+        with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as tmp:
+            path = tmp.name
+
+    if xlsxwriter is not None:
+        workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'nan_inf_to_errors': True,
+                                              'default_date_format': 'yyyy-mm-dd hh:mm:ss'})
+        for sheet_name, df in sheets:
+            worksheet = workbook.add_worksheet(sheet_name)
+            for row_number, row in enumerate(_iter_sheet_rows(df)):
+                worksheet.write_row(row_number, 0, row)
+        workbook.close()
+    else:
+        workbook = openpyxl.Workbook(write_only=True)
+        for sheet_name, df in sheets:
+            worksheet = workbook.create_sheet(sheet_name)
+            for row in _iter_sheet_rows(df):
+                worksheet.append(row)
+        workbook.save(path)
+
+    return path
+
+# Offer a written report for download and remove the temp file once Streamlit has taken the bytes
+def download_report_file(path, label, file_name):
+    with open(path, 'rb') as f:
+        st.download_button(
+            label=label,
+            data=f,
+            file_name=file_name,
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+    os.remove(path)
+
+# Rows of the validation report that need review: missing on one side or with a measure outside tolerance
+def mismatch_mask(validation_report):
+    mask = validation_report['presence'] != 'Present in Both'
+    for col in validation_report.columns:
+        if col.endswith('_Diff'):
+            mask |= _measure_mismatches(validation_report, col[:-len('_Diff')])
+    return mask
+
 def main():
     st.title("Validation Report Generator")
 
@@ -150,23 +386,42 @@ def main():
     model_name = st.text_input("Enter the model name:")
     report_name = st.text_input("Enter the report name:")
 
-    uploaded_file = st.file_uploader("Upload Excel file", type="xlsx")
+    input_format = st.radio("Input format", ["Excel workbook", "Separate CSV/Parquet files"])
+    if input_format == "Excel workbook":
+        uploaded_file = st.file_uploader("Upload Excel file", type="xlsx")
+        cognos_source, pbi_source = uploaded_file, uploaded_file
+    else:
+        cognos_source = st.file_uploader("Upload Cognos file", type=["csv", "parquet"])
+        pbi_source = st.file_uploader("Upload PBI file", type=["csv", "parquet"])
 
-    if uploaded_file is not None:
+    if cognos_source is not None and pbi_source is not None:
         try:
-            xls = pd.ExcelFile(uploaded_file)
-            cognos_df = pd.read_excel(xls, 'Cognos')
-            pbi_df = pd.read_excel(xls, 'PBI')
+            cognos_columns = read_columns(cognos_source, 'Cognos')
+            pbi_columns = read_columns(pbi_source, 'PBI')
+
+            option = st.radio("Select Option", ["Data Present", "Only Column Names Present"])
+
+            # Only the columns present on both sides take part in the validation
+            usecols = None
+            if option == "Data Present":
+                usecols = [col for col in cognos_columns if col in pbi_columns]
+
+            cognos_df = read_table(cognos_source, 'Cognos', usecols=usecols)
+            pbi_df = read_table(pbi_source, 'PBI', usecols=usecols)
 
             # Convert numeric-like strings
-            cognos_df = convert_possible_numeric(cognos_df)
-            pbi_df = convert_possible_numeric(pbi_df)
+            cognos_df, cognos_conversion = convert_possible_numeric(cognos_df)
+            pbi_df, pbi_conversion = convert_possible_numeric(pbi_df)
 
             # Standardize text columns
-            cognos_df = cognos_df.apply(lambda x: x.str.upper().str.strip() if x.dtype == "object" else x)
-            pbi_df = pbi_df.apply(lambda x: x.str.upper().str.strip() if x.dtype == "object" else x)
+            cognos_df = standardize_text_columns(cognos_df)
+            pbi_df = standardize_text_columns(pbi_df)
 
-            option = st.radio("Select Option", ["Data Present", "Only Column Names Present"])
+            with st.expander("Numeric Conversion Report"):
+                st.write("Cognos")
+                st.dataframe(cognos_conversion)
+                st.write("PBI")
+                st.dataframe(pbi_conversion)
 
             if option == "Only Column Names Present":
                 column_checklist_df = column_checklist(cognos_df, pbi_df)
@@ -174,51 +429,60 @@ def main():
                 st.subheader("Column Checklist Preview")
                 st.dataframe(column_checklist_df)
 
-                output = io.BytesIO()
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    checklist_df.to_excel(writer, sheet_name='Checklist', index=False)
-                    cognos_df.to_excel(writer, sheet_name='Cognos', index=False)
-                    pbi_df.to_excel(writer, sheet_name='PBI', index=False)
-                    column_checklist_df.to_excel(writer, sheet_name='Column Checklist', index=False)
+                report_path = write_report_workbook([
+                    ('Checklist', checklist_df),
+                    ('Cognos', cognos_df),
+                    ('PBI', pbi_df),
+                    ('Column Checklist', column_checklist_df),
+                ])
 
-                output.seek(0)
                 today_date = datetime.today().strftime('%Y-%m-%d')
                 dynamic_filename = f"{model_name}_{report_name}_ColumnCheck_Report_{today_date}.xlsx" if model_name and report_name else f"ColumnCheck_Report_{today_date}.xlsx"
 
-                st.download_button(
-                    label="Download Column Check Excel Report",
-                    data=output,
-                    file_name=dynamic_filename,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+                download_report_file(report_path, "Download Column Check Excel Report", dynamic_filename)
 
             elif option == "Data Present":
-                validation_report, cognos_agg, pbi_agg = generate_validation_report(cognos_df, pbi_df)
-                column_checklist_df = column_checklist(cognos_df, pbi_df)
+                col1, col2 = st.columns(2)
+                with col1:
+                    abs_tol = st.number_input("Absolute tolerance", min_value=0.0, value=DEFAULT_ABS_TOL, format="%.9f")
+                with col2:
+                    rel_tol = st.number_input("Relative tolerance", min_value=0.0, value=DEFAULT_REL_TOL, format="%.9f")
+
+                validation_report, cognos_agg, pbi_agg = generate_validation_report(cognos_df, pbi_df, abs_tol, rel_tol)
+                column_checklist_df = column_checklist(pd.DataFrame(columns=cognos_columns), pd.DataFrame(columns=pbi_columns))
                 diff_checker_df = generate_diff_checker(validation_report)
 
                 st.subheader("Validation Report Preview")
                 st.dataframe(validation_report)
 
-                output = io.BytesIO()
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    checklist_df.to_excel(writer, sheet_name='Checklist', index=False)
-                    cognos_agg.to_excel(writer, sheet_name='Cognos', index=False)
-                    pbi_agg.to_excel(writer, sheet_name='PBI', index=False)
-                    validation_report.to_excel(writer, sheet_name='Validation_Report', index=False)
-                    column_checklist_df.to_excel(writer, sheet_name='Column Checklist', index=False)
-                    diff_checker_df.to_excel(writer, sheet_name='Diff Checker', index=False)
+                st.subheader("Diff Checker")
+                st.dataframe(diff_checker_df)
+
+                mismatches_only = st.checkbox("Only include mismatching rows in the Excel report")
+                if mismatches_only:
+                    # Keep only the rows to review, and the aggregated rows behind them
+                    mismatched = validation_report[mismatch_mask(validation_report)]
+                    cognos_agg = cognos_agg[cognos_agg['unique_key'].isin(mismatched['unique_key'])]
+                    pbi_agg = pbi_agg[pbi_agg['unique_key'].isin(mismatched['unique_key'])]
+                    validation_report = mismatched
+
+                # Built on the rows actually written so the Excel row numbers line up
+                mismatch_index_df = build_mismatch_index(validation_report)
+
+                report_path = write_report_workbook([
+                    ('Checklist', checklist_df),
+                    ('Cognos', cognos_agg),
+                    ('PBI', pbi_agg),
+                    ('Validation_Report', validation_report),
+                    ('Column Checklist', column_checklist_df),
+                    ('Diff Checker', diff_checker_df),
+                    ('Mismatch Index', mismatch_index_df),
+                ])
 
-                output.seek(0)
                 today_date = datetime.today().strftime('%Y-%m-%d')
                 dynamic_filename = f"{model_name}_{report_name}_ValidationReport_{today_date}.xlsx" if model_name and report_name else f"ValidationReport_{today_date}.xlsx"
 
-                st.download_button(
-                    label="Download Excel Report",
-                    data=output,
-                    file_name=dynamic_filename,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+                download_report_file(report_path, "Download Excel Report", dynamic_filename)
 
         except Exception as e:
             st.error(f"An error occurred: {str(e)}")